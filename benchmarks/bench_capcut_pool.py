@@ -0,0 +1,136 @@
+"""
+Request latency of the shared keep-alive CapcutClient against one
+requests.post per line (the path before the client), on a local stub of the
+Capcut TTS endpoint.
+
+The stub answers every POST with a Capcut-shaped JSON body carrying
+--audio-bytes of base64 audio after --latency seconds, and counts the TCP
+connections it accepts. Each client is run sequentially and from
+CAPCUT_MAX_CONCURRENCY threads, like the SRT and folder workers. Pass a
+certificate to serve HTTPS, where reusing connections also saves the TLS
+handshake:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -keyout /tmp/key.pem -out /tmp/cert.pem \\
+        -days 1 -subj /CN=localhost -addext subjectAltName=DNS:localhost
+    python -m benchmarks.bench_capcut_pool --certfile /tmp/cert.pem --keyfile /tmp/key.pem
+
+Usage (from the repository root):
+    python -m benchmarks.bench_capcut_pool
+    python -m benchmarks.bench_capcut_pool --requests 500 --latency 0.02
+"""
+
+import argparse
+import base64
+import concurrent.futures
+import json
+import os
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import main as studio
+from capcutvoice.tts import USER_AGENT, CapcutClient, prepare_text
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, audio_bytes):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        audio = base64.b64encode(os.urandom(audio_bytes)).decode()
+        self.body = json.dumps({"status_code": 0, "status_msg": "", "data": {"v_str": audio}}).encode()
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def get_request(self):
+        request = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return request
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def post_per_call(base_url, verify):
+    """The old path: a new connection for every line."""
+    def invoke(req_text, voice_id, session_id):
+        url = f"{base_url}/?text_speaker={voice_id}&req_text={req_text}&speaker_map_type=0&aid=1233"
+        headers = {"User-Agent": USER_AGENT, "Cookie": f"sessionid={session_id}"}
+        return requests.post(url, headers=headers, timeout=5, verify=verify)
+    return invoke
+
+
+def pooled(base_url, verify, pool_size):
+    client = CapcutClient(pool_size=pool_size, base_url=base_url)
+    client.session.verify = verify
+    client.session.trust_env = False  # otherwise REQUESTS_CA_BUNDLE overrides session.verify
+    return lambda req_text, voice_id, session_id: client.invoke(req_text, voice_id, session_id)
+
+
+def run(server, invoke, n_requests, threads):
+    req_text = prepare_text("Xin chào các bạn, đây là một dòng phụ đề")
+
+    def one(_):
+        response = invoke(req_text, "vi_female_huong", "session")
+        base64.b64decode(response.json()["data"]["v_str"])
+
+    server.connections = 0
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(n_requests)))
+    return time.perf_counter() - start, server.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server think time per request, in seconds")
+    parser.add_argument("--audio-bytes", type=int, default=24000, help="decoded audio per response")
+    parser.add_argument("--certfile", help="serve HTTPS with this certificate")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+
+    server = StubServer(args.latency, args.audio_bytes)
+    scheme, verify = "http", True
+    if args.certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(args.certfile, args.keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme, verify = "https", args.certfile
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"{scheme}://localhost:{server.server_address[1]}/invoke"
+
+    clients = [
+        ("requests.post per line", lambda: post_per_call(base_url, verify)),
+        (f"CapcutClient (pool {studio.CAPCUT_POOL_SIZE})", lambda: pooled(base_url, verify, studio.CAPCUT_POOL_SIZE)),
+    ]
+    print(f"{args.requests} requests to a local {scheme.upper()} stub, latency {args.latency * 1000:.0f} ms")
+    for threads in (1, studio.CAPCUT_MAX_CONCURRENCY):
+        for label, make_client in clients:
+            elapsed, connections = run(server, make_client(), args.requests, threads)
+            print(f"{threads} thread(s)  {label:26s} {elapsed / args.requests * 1000:7.2f} ms/request  "
+                  f"{connections:4d} connections")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
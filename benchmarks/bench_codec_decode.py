@@ -0,0 +1,86 @@
+"""
+CPU benchmark of batched codec decoding (FastVieNeuTTS._decode_batch).
+
+Decodes `batch size` code sequences of mixed lengths, drawn uniformly from
+--min-frames..--max-frames like the output of infer_batch, three ways:
+
+    batched      _decode_batch: length buckets padded into one forward each
+    threads      the pre-batching path: every sequence decoded alone on a
+                 thread pool (_decode_singles)
+    one-by-one   _decode on each sequence in turn
+
+Codec weights are downloaded from Hugging Face on first run.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_codec_decode
+    python -m benchmarks.bench_codec_decode --codec neuphonic/neucodec-onnx-decoder --max-frames 400
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from vntts.vieneu_tts.vieneu_tts import DECODE_MAX_PAD_FRAMES, FastVieNeuTTS
+
+BATCH_SIZES = (1, 4, 8, 16)
+
+
+def load_codec_only(codec_repo: str) -> FastVieNeuTTS:
+    """FastVieNeuTTS with only the codec loaded (no LMDeploy backbone, no GPU)."""
+    tts = object.__new__(FastVieNeuTTS)
+    tts.hop_length = 480
+    tts._is_onnx_codec = False
+    tts._triton_enabled = False
+    tts._load_codec(codec_repo, "cpu", enable_triton=False)
+    return tts
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def decode_threads(tts: FastVieNeuTTS, codes_list: list[str]) -> list:
+    speech_ids_list = [tts._extract_speech_ids(codes) for codes in codes_list]
+    results = [None] * len(speech_ids_list)
+    tts._decode_singles(list(range(len(speech_ids_list))), speech_ids_list, results)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--codec", default="neuphonic/distill-neucodec")
+    parser.add_argument("--min-frames", type=int, default=50, help="shortest sequence in codes (50 codes = 1 s)")
+    parser.add_argument("--max-frames", type=int, default=250, help="longest sequence in codes")
+    parser.add_argument("--max-pad-frames", type=int, default=DECODE_MAX_PAD_FRAMES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tts = load_codec_only(args.codec)
+    rng = np.random.default_rng(0)
+    print(f"codec={args.codec} frames={args.min_frames}..{args.max_frames} max_pad_frames={args.max_pad_frames}")
+
+    for batch_size in BATCH_SIZES:
+        lengths = rng.integers(args.min_frames, args.max_frames + 1, batch_size)
+        codes_list = [
+            "".join(f"<|speech_{code}|>" for code in rng.integers(0, 65536, n))
+            for n in lengths
+        ]
+        decode_batch = lambda: tts._decode_batch(codes_list, max_pad_frames=args.max_pad_frames)
+        decode_batch()  # warm up
+        batched = best_of(args.repeat, decode_batch)
+        threads = best_of(args.repeat, lambda: decode_threads(tts, codes_list))
+        single = best_of(args.repeat, lambda: [tts._decode(codes) for codes in codes_list])
+        print(
+            f"batch {batch_size:2d}: batched {batched * 1000:8.1f} ms  threads {threads * 1000:8.1f} ms  "
+            f"one-by-one {single * 1000:8.1f} ms  speedup {threads / batched:5.2f}x vs threads"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Disk I/O, wall time and peak memory of EdgeBatchEngine.run_to_sink against
+the chunk-then-merge path it replaced.
+
+Synthesis is faked (no network): every chunk sleeps for a random latency and
+returns MPEG frames of the Edge output format, and every --slow-every'th chunk
+takes --slow-factor times longer, so later chunks finish ahead of a slow head
+chunk. Three runs are compared:
+
+    chunk-then-merge   engine.run() saves one file per chunk, merge_mp3_files_ffmpeg
+                       reads them back into the output, the chunk files are deleted
+    sink, unbounded    run_to_sink with every chunk allowed ahead of the write cursor
+    sink, max_ahead    run_to_sink with the default cap (4 x concurrency)
+
+The sink is an FFmpegSink when ffmpeg is found (or given with --ffmpeg),
+otherwise a FileSink, the same fallback the Edge tab uses. Disk bytes are the
+file bytes each path writes and reads; peak memory is traced with tracemalloc.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_edge_sink
+    python -m benchmarks.bench_edge_sink --chunks 500 --seconds 60 --ffmpeg /usr/bin/ffmpeg
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import main as studio
+from edge.sinks import FFmpegSink, FileSink
+
+# audio-24khz-48kbitrate-mono-mp3: MPEG-2 layer III, 24 kHz, 48 kbps, mono -> 144-byte frames of 24 ms
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + bytes(140)
+FRAME_SECONDS = 0.024
+
+
+class FakeEdgeEngine(studio.EdgeBatchEngine):
+    """EdgeBatchEngine whose synthesis sleeps instead of calling the service."""
+
+    def __init__(self, seconds, latency, slow_every, slow_factor, **kwargs):
+        super().__init__("vi-VN-HoaiMyNeural", **kwargs)
+        self.frames = int(seconds / FRAME_SECONDS)
+        self.latency = latency
+        self.slow_every = slow_every
+        self.slow_factor = slow_factor
+
+    async def _synthesize_once(self, text, output_file):
+        index = int(text.split()[0])
+        delay = random.Random(index).uniform(0.5, 1.5) * self.latency
+        if self.slow_every and index % self.slow_every == 0:
+            delay *= self.slow_factor
+        await asyncio.sleep(delay)
+        audio = FRAME * self.frames  # a new object per chunk, like a real response
+        if output_file is None:
+            return audio
+        with open(output_file, "wb") as f:
+            f.write(audio)
+        return output_file
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    disk_bytes = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, disk_bytes, peak
+
+
+def chunk_then_merge(engine, texts, tmp, ffmpeg_path):
+    chunk_dir = os.path.join(tmp, "chunks")
+    os.makedirs(chunk_dir, exist_ok=True)
+    jobs = [(i, text, os.path.join(chunk_dir, f"chunk_{i:05d}.mp3")) for i, text in enumerate(texts)]
+    results = engine.run(jobs)
+    chunk_files = [results[i] for i in sorted(results)]
+    chunk_bytes = sum(os.path.getsize(f) for f in chunk_files)
+
+    output_file = os.path.join(tmp, "merged.mp3")
+    if not studio.merge_mp3_files_ffmpeg(chunk_files, output_file, ffmpeg_path or "ffmpeg"):
+        raise RuntimeError("merge failed")
+    shutil.rmtree(chunk_dir)
+    # chunks written, chunks read back, merged output written
+    return 2 * chunk_bytes + os.path.getsize(output_file)
+
+
+def to_sink(engine, texts, tmp, ffmpeg_path):
+    output_file = os.path.join(tmp, "streamed.mp3")
+    sink = FFmpegSink(output_file, ffmpeg_path) if ffmpeg_path else FileSink(output_file)
+    with sink:
+        engine.run_to_sink(list(enumerate(texts)), sink)
+    return os.path.getsize(output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio per chunk (a 1000-char chunk is about a minute)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean synthesis time per chunk, in seconds")
+    parser.add_argument("--slow-every", type=int, default=25)
+    parser.add_argument("--slow-factor", type=float, default=10.0)
+    parser.add_argument("--ffmpeg", default=shutil.which("ffmpeg"), help="ffmpeg binary (default: from PATH)")
+    args = parser.parse_args()
+
+    texts = [f"{i} " + "xin chào " * 100 for i in range(args.chunks)]
+    options = dict(seconds=args.seconds, latency=args.latency, slow_every=args.slow_every,
+                   slow_factor=args.slow_factor, concurrency=args.concurrency)
+    runs = [
+        ("chunk-then-merge", chunk_then_merge, {}),
+        ("sink, unbounded", to_sink, {"max_ahead": args.chunks}),
+        ("sink, max_ahead", to_sink, {}),
+    ]
+
+    print(f"{args.chunks} chunks x {args.seconds:.0f}s audio ({len(FRAME) * int(args.seconds / FRAME_SECONDS) / 1e6:.2f} MB each), "
+          f"concurrency {args.concurrency}, sink: {'FFmpegSink' if args.ffmpeg else 'FileSink (no ffmpeg)'}")
+    for label, run, engine_options in runs:
+        with tempfile.TemporaryDirectory() as tmp, FakeEdgeEngine(**options, **engine_options) as engine:
+            elapsed, disk_bytes, peak = measure(lambda: run(engine, texts, tmp, args.ffmpeg))
+        print(f"{label:18s} {elapsed:7.2f} s  disk {disk_bytes / 1e6:8.1f} MB  peak memory {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
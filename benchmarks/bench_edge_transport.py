@@ -0,0 +1,230 @@
+"""
+Wall time and connection count of a shared edge.Transport against a private
+connection per Communicate (the path before the pooled transport), on a local
+mock of the websocket endpoint.
+
+The mock replays recorded frames: for every SSML request it sends back the
+frames of one recorded turn (turn.start, audio, audio.metadata, turn.end) with
+their original timing. Opening a websocket waits --connect-delay seconds first,
+standing in for the TCP, TLS and upgrade round trips to the real service.
+Without --replay a synthetic recording in the same wire format is used
+(--words word boundaries of MP3 frames); record a real turn once with
+
+    python -m benchmarks.bench_edge_transport --record turn.jsonl
+
+(needs network access) and replay it with --replay turn.jsonl. Pass a
+certificate to serve wss:// so the TLS handshake is paid for real:
+
+    python -m benchmarks.bench_edge_transport --certfile /tmp/cert.pem --keyfile /tmp/key.pem
+
+Usage (from the repository root):
+    python -m benchmarks.bench_edge_transport
+    python -m benchmarks.bench_edge_transport --chunks 100 --connect-delay 0.2
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import ssl
+import time
+import types
+
+import aiohttp
+from aiohttp import web
+
+import edge.transport
+from edge import Communicate, MemorySink, Transport
+
+VOICE = "vi-VN-HoaiMyNeural"
+# audio-24khz-48kbitrate-mono-mp3: 144-byte frames of 24 ms
+MP3_FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + bytes(140)
+AUDIO_HEADERS = "X-RequestId:{rid}\r\nContent-Type:audio/mpeg\r\nX-StreamId:{sid}\r\nPath:audio\r\n"
+END_HEADERS = "X-RequestId:{rid}\r\nX-StreamId:{sid}\r\nPath:audio\r\n"
+
+
+def binary_frame(headers, audio=b""):
+    header_bytes = headers.encode("ascii")
+    return len(header_bytes).to_bytes(2, "big") + header_bytes + audio
+
+
+def text_frame(rid, path, body):
+    return f"X-RequestId:{rid}\r\nContent-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
+
+
+def synthetic_recording(words, first_byte, frames_per_word=12, speedup=30.0):
+    """One turn in the service's wire format: (seconds after the SSML request, kind, data)."""
+    rid, sid = "0" * 32, "1" * 32
+    word_seconds = frames_per_word * 0.024
+    recording = [
+        (first_byte, "text", text_frame(rid, "turn.start", '{"context":{"serviceTag":"0"}}')),
+        (first_byte, "text", text_frame(rid, "response", '{"context":{"serviceTag":"0"},"audio":{"type":"inline"}}')),
+    ]
+    for i in range(words):
+        t = first_byte + i * word_seconds / speedup
+        metadata = {"Metadata": [{"Type": "WordBoundary", "Data": {
+            "Offset": int(i * word_seconds * 1e7), "Duration": int(word_seconds * 1e7),
+            "text": {"Text": f"từ{i}", "Length": 3, "BoxType": "Word"}}}]}
+        recording.append((t, "text", text_frame(rid, "audio.metadata", json.dumps(metadata, ensure_ascii=False))))
+        recording.append((t, "binary", binary_frame(AUDIO_HEADERS.format(rid=rid, sid=sid), MP3_FRAME * frames_per_word)))
+    end = first_byte + words * word_seconds / speedup
+    recording.append((end, "binary", binary_frame(END_HEADERS.format(rid=rid, sid=sid))))
+    recording.append((end, "text", text_frame(rid, "turn.end", '{"context":{"serviceTag":"0"}}')))
+    return recording
+
+
+def load_recording(path):
+    recording = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            frame = json.loads(line)
+            data = base64.b64decode(frame["data"]) if frame["kind"] == "binary" else frame["data"]
+            recording.append((frame["t"], frame["kind"], data))
+    return recording
+
+
+async def record(path, text):
+    """Capture the frames of one real turn, timed from the SSML request."""
+    loop = asyncio.get_running_loop()
+    frames = []
+    sent = []
+
+    class RecordingTransport(Transport):
+        async def _open(self):
+            conn = await super()._open()
+            websocket = conn.websocket
+            send_str, receive = websocket.send_str, websocket.receive
+
+            async def recording_send_str(data, *args, **kwargs):
+                if "Path:ssml" in data:
+                    sent.append(loop.time())
+                return await send_str(data, *args, **kwargs)
+
+            async def recording_receive(*args, **kwargs):
+                message = await receive(*args, **kwargs)
+                if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    frames.append((loop.time() - sent[-1], message))
+                return message
+
+            websocket.send_str, websocket.receive = recording_send_str, recording_receive
+            return conn
+
+    async with RecordingTransport() as transport:
+        await Communicate(text, VOICE, transport=transport).stream_to(MemorySink())
+    with open(path, "w", encoding="utf-8") as f:
+        for t, message in frames:
+            binary = message.type == aiohttp.WSMsgType.BINARY
+            data = base64.b64encode(message.data).decode("ascii") if binary else message.data
+            f.write(json.dumps({"t": t, "kind": "binary" if binary else "text", "data": data}) + "\n")
+    print(f"recorded {len(frames)} frames to {path}")
+
+
+class MockService:
+    def __init__(self, recording, connect_delay):
+        self.recording = recording
+        self.connect_delay = connect_delay
+        self.connections = 0
+
+    async def handle(self, request):
+        await asyncio.sleep(self.connect_delay)
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.connections += 1
+        loop = asyncio.get_running_loop()
+        async for message in websocket:
+            if message.type != aiohttp.WSMsgType.TEXT or "Path:ssml" not in message.data:
+                continue  # speech.config
+            start = loop.time()
+            for t, kind, data in self.recording:
+                delay = start + t - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if kind == "text":
+                    await websocket.send_str(data)
+                else:
+                    await websocket.send_bytes(data)
+        return websocket
+
+
+async def synthesize(texts, concurrency, shared):
+    semaphore = asyncio.Semaphore(concurrency)
+    first_audio = []
+    transport = Transport(max_idle=concurrency) if shared else None
+
+    async def one(text):
+        async with semaphore:
+            start = time.perf_counter()
+            got_audio = False
+            async for message in Communicate(text, VOICE, transport=transport).stream():
+                if message["type"] == "audio" and not got_audio:
+                    got_audio = True
+                    first_audio.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(text) for text in texts))
+    finally:
+        if transport is not None:
+            await transport.close()
+    return time.perf_counter() - start, sum(first_audio) / len(first_audio)
+
+
+async def run_benchmark(args):
+    if args.replay:
+        recording = load_recording(args.replay)
+    else:
+        recording = synthetic_recording(args.words, args.first_byte)
+    service = MockService(recording, args.connect_delay)
+    app = web.Application()
+    app.router.add_get("/edge/v1", service.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+
+    scheme, server_ssl = "ws", None
+    if args.certfile:
+        server_ssl = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_ssl.load_cert_chain(args.certfile, args.keyfile)
+        scheme = "wss"
+        # Transport builds its SSL context from certifi; trust the test certificate instead
+        edge.transport.certifi = types.SimpleNamespace(where=lambda: args.certfile)
+    site = web.TCPSite(runner, "localhost", 0, ssl_context=server_ssl)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    edge.transport.WSS_URL = f"{scheme}://localhost:{port}/edge/v1?TrustedClientToken=0"
+
+    texts = [f"Đây là đoạn văn bản số {i}." for i in range(args.chunks)]
+    print(f"{args.chunks} chunks, {len(recording)} frames per turn, "
+          f"connect delay {args.connect_delay * 1000:.0f} ms, {scheme}://")
+    try:
+        for concurrency in (1, args.concurrency):
+            for label, shared in (("private per chunk", False), ("shared Transport", True)):
+                service.connections = 0
+                elapsed, first_audio = await synthesize(texts, concurrency, shared)
+                print(f"concurrency {concurrency:2d}  {label:18s} {elapsed:7.2f} s  "
+                      f"first audio {first_audio * 1000:6.1f} ms  {service.connections:4d} connections")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--connect-delay", type=float, default=0.1, help="seconds to open a websocket")
+    parser.add_argument("--first-byte", type=float, default=0.05, help="synthetic turn: seconds before the first frame")
+    parser.add_argument("--words", type=int, default=40, help="synthetic turn: word boundaries per turn")
+    parser.add_argument("--replay", help="JSON lines file written by --record")
+    parser.add_argument("--record", help="record one real turn to this file and exit")
+    parser.add_argument("--text", default="Xin chào, đây là một đoạn văn bản để ghi lại phản hồi của dịch vụ.")
+    parser.add_argument("--certfile", help="serve wss:// with this certificate")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.text))
+    else:
+        asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
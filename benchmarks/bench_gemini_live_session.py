@@ -0,0 +1,203 @@
+"""
+Connect latency, turn throughput and reconnect behaviour of
+TruePersistentSession, on a local fake of the Gemini Live API websocket.
+
+The fake speaks the wire format the google-genai SDK expects: it answers the
+setup message with setupComplete, and every clientContent turn with --chunks
+serverContent messages of base64 24 kHz PCM (--chunk-delay seconds apart)
+followed by turnComplete. The audio is derived from the turn's text, so a
+turn only counts as ok if the caller got its own audio back, with nothing
+left over from an interrupted turn. With --drop-every N the fake closes the
+socket halfway through every Nth turn, like the ~10 minute session expiry.
+
+Each session is driven by --callers concurrent generate_audio() callers
+until --turns turns were requested, once on a steady connection and once
+with drops. The SDK always connects with wss://, so the fake serves TLS:
+pass --certfile/--keyfile, or a throwaway self-signed certificate is made
+with the openssl command. --compare REV also runs the TruePersistentSession
+of main.py at a git revision on the same fake, e.g. the commit before the
+event-driven session:
+
+    python -m benchmarks.bench_gemini_live_session --compare dfabaff^
+
+Usage (from the repository root):
+    python -m benchmarks.bench_gemini_live_session
+    python -m benchmarks.bench_gemini_live_session --turns 300 --callers 4 --drop-every 25
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+import types as pytypes
+
+import websockets
+from google import genai
+
+import main as studio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def turn_audio(text, n_bytes):
+    """PCM the fake sends for `text`: a digest of the text, repeated"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return (digest * (n_bytes // len(digest) + 1))[:n_bytes]
+
+
+def turn_text(request):
+    content = request.get("clientContent") or request.get("client_content")
+    if not content:
+        return None
+    return "".join(part.get("text", "") for turn in content["turns"] for part in turn["parts"])
+
+
+class FakeLiveService:
+    def __init__(self, chunks, chunk_bytes, chunk_delay, connect_delay):
+        self.chunks = chunks
+        self.chunk_bytes = chunk_bytes
+        self.chunk_delay = chunk_delay
+        self.connect_delay = connect_delay
+        self.drop_every = 0
+        self.connections = 0
+        self.turns = 0
+
+    async def handle(self, websocket):
+        self.connections += 1
+        await websocket.recv()  # setup
+        await asyncio.sleep(self.connect_delay)
+        await websocket.send(json.dumps({"setupComplete": {}}))
+        async for message in websocket:
+            text = turn_text(json.loads(message))
+            if text is None:
+                continue
+            self.turns += 1
+            drop = self.drop_every and self.turns % self.drop_every == 0
+            audio = turn_audio(text, self.chunks * self.chunk_bytes)
+            for i in range(self.chunks):
+                if drop and i == self.chunks // 2:
+                    await websocket.close(1011, "simulated drop")
+                    return
+                chunk = audio[i * self.chunk_bytes:(i + 1) * self.chunk_bytes]
+                await websocket.send(json.dumps({"serverContent": {"modelTurn": {"parts": [{"inlineData": {
+                    "mimeType": "audio/pcm;rate=24000", "data": base64.b64encode(chunk).decode("ascii")}}]}}}))
+                await asyncio.sleep(self.chunk_delay)
+            await websocket.send(json.dumps({"serverContent": {"turnComplete": True}}))
+
+
+def self_signed_certificate(directory):
+    certfile, keyfile = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", keyfile, "-out", certfile,
+         "-days", "1", "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def session_class_at(revision):
+    """TruePersistentSession from main.py at a git revision"""
+    source = subprocess.run(["git", "show", f"{revision}:main.py"], cwd=ROOT, check=True, capture_output=True).stdout
+    module = pytypes.ModuleType(f"main_at_{revision}")
+    module.__file__ = os.path.join(ROOT, "main.py")
+    exec(compile(source, f"main.py@{revision}", "exec"), module.__dict__)
+    return module.TruePersistentSession
+
+
+def local_session_class(session_class, base_url, client_ssl):
+    """session_class with its genai client pointed at the fake service"""
+    class LocalSession(session_class):
+        def _setup_client(self, api_version="v1beta"):
+            self.client = genai.Client(
+                api_key="local",
+                http_options={"api_version": api_version, "base_url": base_url, "async_client_args": {"ssl": client_ssl}},
+            )
+    return LocalSession
+
+
+async def drive(session_class, service, args):
+    session = session_class("local", studio.TTSConfig(), log_callback=lambda *_: None)
+    expected_bytes = args.chunks * args.chunk_bytes
+    texts = iter(range(args.turns))
+    ok = 0
+
+    async def caller():
+        nonlocal ok
+        for i in texts:
+            text = f"Câu số {i} của bài đọc."
+            try:
+                audio = await asyncio.wait_for(session.generate_audio(text), args.turn_timeout)
+            except asyncio.TimeoutError:
+                audio = None
+            ok += audio == turn_audio(text, expected_bytes)
+
+    service.connections = service.turns = 0
+    start = time.perf_counter()
+    connected = await session.connect()
+    connect_time = time.perf_counter() - start
+    if not connected:
+        raise SystemExit("session did not connect to the fake service")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(args.callers)))
+    elapsed = time.perf_counter() - start
+    await session.disconnect()
+    return connect_time, ok, elapsed, service.connections
+
+
+async def run_benchmark(args, certfile, keyfile):
+    server_ssl = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_ssl.load_cert_chain(certfile, keyfile)
+    client_ssl = ssl.create_default_context(cafile=certfile)
+
+    service = FakeLiveService(args.chunks, args.chunk_bytes, args.chunk_delay, args.connect_delay)
+    async with websockets.serve(service.handle, "localhost", 0, ssl=server_ssl) as server:
+        port = server.sockets[0].getsockname()[1]
+        base_url = f"https://localhost:{port}"
+
+        sessions = [("current", studio.TruePersistentSession)]
+        if args.compare:
+            sessions.append((args.compare, session_class_at(args.compare)))
+
+        print(f"{args.turns} turns from {args.callers} callers, {args.chunks} chunks of "
+              f"{args.chunk_bytes} bytes per turn, chunk delay {args.chunk_delay * 1000:.1f} ms")
+        for label, session_class in sessions:
+            local_class = local_session_class(session_class, base_url, client_ssl)
+            for drop_every in (0, args.drop_every):
+                service.drop_every = drop_every
+                connect_time, ok, elapsed, connections = await drive(local_class, service, args)
+                scenario = f"drop every {drop_every}" if drop_every else "steady"
+                print(f"{label:12s} {scenario:14s} connect {connect_time * 1000:7.1f} ms  "
+                      f"{ok:4d}/{args.turns} ok  {ok / elapsed:7.1f} turns/s  {connections:3d} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--callers", type=int, default=4, help="concurrent generate_audio() callers")
+    parser.add_argument("--chunks", type=int, default=4, help="audio messages per turn")
+    parser.add_argument("--chunk-bytes", type=int, default=9600, help="PCM bytes per message (9600 = 200 ms)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0005, help="seconds between audio messages")
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="seconds before setupComplete")
+    parser.add_argument("--drop-every", type=int, default=25, help="close the socket mid-turn every N turns")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="give up on a turn after this many seconds")
+    parser.add_argument("--compare", metavar="REV", help="also run TruePersistentSession from main.py at this git revision")
+    parser.add_argument("--certfile", help="serve wss:// with this certificate (default: a throwaway self-signed one)")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+
+    if args.certfile:
+        asyncio.run(run_benchmark(args, args.certfile, args.keyfile))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_benchmark(args, *self_signed_certificate(directory)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Throughput benchmark (MB/s of UTF-8 input) for VietnameseTTSNormalizer.
+
+Two corpora are timed. "prose" is the reference texts of the bundled voices,
+mostly words with few numbers. "dense" is the golden test inputs, packed with
+numbers, units, dates and currencies. Pass --baseline with the path of another
+normalize_text.py to time it on the same corpora, e.g. the version before the
+precompiled rewrite:
+
+    git show b034c71~1:vntts/utils/normalize_text.py > /tmp/normalize_text_old.py
+    python -m benchmarks.bench_normalize_text --baseline /tmp/normalize_text_old.py
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_normalizer(path):
+    # Loaded by path: importing the vntts package pulls in torch for the TTS engine
+    spec = importlib.util.spec_from_file_location(f"normalize_text_{abs(hash(path))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.VietnameseTTSNormalizer()
+
+
+def load_corpora():
+    prose = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "vntts", "sample", "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            prose += [line.strip() for line in f if line.strip()]
+    with open(os.path.join(ROOT, "tests", "data", "normalize_text_golden.jsonl"), encoding="utf-8") as f:
+        dense = [json.loads(line)["input"] for line in f]
+    return {"prose": prose, "dense": dense}
+
+
+def throughput(normalizer, lines, min_seconds):
+    size = sum(len(line.encode("utf-8")) for line in lines)
+    rounds = 0
+    start = time.perf_counter()
+    while True:
+        for line in lines:
+            normalizer.normalize(line)
+        rounds += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return size * rounds / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="path of another normalize_text.py to compare against")
+    parser.add_argument("--seconds", type=float, default=2.0, help="minimum time per measurement")
+    args = parser.parse_args()
+
+    normalizers = {"current": load_normalizer(os.path.join(ROOT, "vntts", "utils", "normalize_text.py"))}
+    if args.baseline:
+        normalizers["baseline"] = load_normalizer(args.baseline)
+
+    for corpus, lines in load_corpora().items():
+        size_kb = sum(len(line.encode("utf-8")) for line in lines) / 1e3
+        results = {name: throughput(normalizer, lines, args.seconds) for name, normalizer in normalizers.items()}
+        line = f"{corpus:6s} ({len(lines)} lines, {size_kb:.0f} kB): " + "  ".join(
+            f"{name} {mb_s:6.2f} MB/s" for name, mb_s in results.items())
+        if "baseline" in results:
+            line += f"  speedup {results['current'] / results['baseline']:.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
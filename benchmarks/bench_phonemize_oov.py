@@ -0,0 +1,133 @@
+"""
+Micro-benchmark of the espeak fallback in phonemize_with_dict on a synthetic
+corpus heavy in out-of-vocabulary words.
+
+The corpus mixes dictionary words from the bundled reference texts with
+made-up loanword-like tokens (two random syllables run together, and
+Latin-script words) that are checked to be missing from the phoneme
+dictionary, at --oov-ratio. Three paths are timed on the same sentences:
+
+    per word     the pre-batch loop: one phonemize() call per OOV word
+    batched      _phonemize_words: one phonemize() call per sentence
+    with store   phonemize_with_dict as shipped, with a fresh in-memory
+                 learned-phoneme store (so the first occurrence still misses)
+
+phonemize() calls are counted, since each pays the espeak backend setup.
+Needs phonemizer and the espeak-ng library, like the TTS itself.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_phonemize_oov
+    python -m benchmarks.bench_phonemize_oov --sentences 200 --oov-ratio 0.5
+"""
+
+import argparse
+import glob
+import importlib
+import os
+import random
+import time
+import unicodedata
+
+from vntts.utils.phoneme_store import LearnedPhonemeStore
+
+# vntts.utils re-exports a phonemize_text function that shadows the module attribute
+pt = importlib.import_module("vntts.utils.phonemize_text")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ONSETS = ["", "b", "c", "ch", "d", "đ", "g", "gi", "h", "kh", "l", "m", "n", "ng", "nh", "ph", "qu", "r", "s", "t", "th", "tr", "v", "x"]
+RHYMES = ["a", "ai", "am", "an", "ang", "anh", "ao", "e", "en", "eo", "i", "im", "in", "o", "oi", "om", "on", "ong", "u", "ui", "um", "un", "ung", "uy", "ươ", "ương"]
+TONES = ["", "̀", "́", "̃", "̉", "̣"]
+LATIN = ["blockchain", "smartphone", "streamer", "marketing", "workshop", "freelancer", "podcast", "startup"]
+
+
+class CountingPhonemize:
+    """Wraps phonemizer.phonemize to count backend calls."""
+
+    def __init__(self, phonemize):
+        self.phonemize = phonemize
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.phonemize(*args, **kwargs)
+
+
+def make_corpus(n_sentences, words_per_sentence, oov_ratio, seed=0):
+    rng = random.Random(seed)
+    known = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "vntts", "sample", "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            known += [word for word in pt.normalizer.normalize(f.read()).split() if word in pt.phoneme_dict]
+    if not known:
+        raise SystemExit("no dictionary words found in vntts/sample/*.txt")
+
+    def oov_word():
+        while True:
+            if rng.random() < 0.2:
+                word = rng.choice(LATIN) + rng.choice(["", "s", "er"])
+            else:
+                # Two made-up syllables run together, like a transliterated name
+                word = "".join(
+                    rng.choice(ONSETS) + unicodedata.normalize("NFC", rhyme[0] + rng.choice(TONES)) + rhyme[1:]
+                    for rhyme in (rng.choice(RHYMES), rng.choice(RHYMES))
+                )
+            if word not in pt.phoneme_dict:
+                return word
+
+    return [
+        " ".join(oov_word() if rng.random() < oov_ratio else rng.choice(known) for _ in range(words_per_sentence))
+        for _ in range(n_sentences)
+    ]
+
+
+def per_word(sentences):
+    """The loop phonemize_with_dict ran before the batched fallback."""
+    learned = {}
+    for text in sentences:
+        for word in pt.normalizer.normalize(text).split():
+            if word in pt.phoneme_dict or word in learned:
+                continue
+            learned[word] = pt._phonemize_words([word])[0]
+
+
+def batched(sentences):
+    learned = {}
+    for text in sentences:
+        oov_words = list(dict.fromkeys(
+            word for word in pt.normalizer.normalize(text).split()
+            if word not in pt.phoneme_dict and word not in learned
+        ))
+        if oov_words:
+            learned.update(zip(oov_words, pt._phonemize_words(oov_words)))
+
+
+def with_store(sentences):
+    for text in sentences:
+        pt.phonemize_with_dict(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=100)
+    parser.add_argument("--words", type=int, default=20, help="words per sentence")
+    parser.add_argument("--oov-ratio", type=float, default=0.4)
+    args = parser.parse_args()
+
+    sentences = make_corpus(args.sentences, args.words, args.oov_ratio)
+    n_words = sum(len(pt.normalizer.normalize(text).split()) for text in sentences)
+    print(f"{args.sentences} sentences, {n_words} words, ~{args.oov_ratio:.0%} out of vocabulary")
+
+    counter = CountingPhonemize(pt.phonemize)
+    pt.phonemize = counter
+    for label, run in (("per word", per_word), ("batched", batched), ("with store", with_store)):
+        # Every run starts with nothing learned, so each pays for its OOV words
+        pt.learned_phonemes = LearnedPhonemeStore(None)
+        counter.calls = 0
+        start = time.perf_counter()
+        run(sentences)
+        elapsed = time.perf_counter() - start
+        print(f"{label:10s} {elapsed:7.2f} s  {n_words / elapsed:9.0f} words/s  {counter.calls:5d} phonemize() calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Peak-memory benchmark of the VieNeu merge path on a long document.
+
+Runs StudioGUI._vieneu_iter_chunk_audio with a fake TTS backend (no model is
+loaded) and appends every chunk to a StreamingWavWriter, the way the VieNeu
+tab builds the merged file. The document is synthesized twice: cold, then
+again with every chunk in the synthesis cache. Both are compared against the
+old path, which kept every chunk in a list and concatenated at the end.
+Peak Python allocations are measured with tracemalloc.
+
+With batching, audio finished ahead of the write cursor is bounded by one
+window (max_batch_size * VIENEU_SORT_WINDOW_BATCHES chunks), so the streaming
+peak stays flat as --chunks grows while the in-memory peak grows with it.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_vieneu_stream_memory
+    python -m benchmarks.bench_vieneu_stream_memory --chunks 2000 --batch-size 1
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import types
+
+import numpy as np
+
+import main as studio
+
+
+class FakeTTS:
+    """Returns about `seconds` of noise per chunk, scaled a little by text length."""
+
+    def __init__(self, seconds: float, max_batch_size: int = 1):
+        self.samples = int(seconds * studio.VIENEU_SAMPLE_RATE)
+        self.max_batch_size = max_batch_size
+
+    def infer(self, text, ref_codes, ref_text):
+        n = self.samples + 10 * len(text)
+        return np.random.default_rng(len(text)).uniform(-0.5, 0.5, n).astype(np.float32)
+
+
+class FakeBatchTTS(FakeTTS):
+    """FakeTTS with infer_batch, like FastVieNeuTTS."""
+
+    def infer_batch(self, texts, ref_codes, ref_text, max_batch_size=None):
+        return [self.infer(text, ref_codes, ref_text) for text in texts]
+
+
+def make_document(n_chunks: int):
+    rng = np.random.default_rng(0)
+    return [f"Câu số {i} " + "xin chào " * int(rng.integers(3, 60)) for i in range(n_chunks)]
+
+
+def fake_gui(tts):
+    return types.SimpleNamespace(
+        vieneu_tts_instance=tts,
+        vieneu_processing=True,
+        vieneu_model_id="bench",
+        after=lambda delay, fn: None,
+        _vieneu_log=lambda msg: None,
+    )
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def run_streaming(gui, texts, output_file):
+    ref_codes = np.arange(16)
+    with studio.StreamingWavWriter(output_file, rate=studio.VIENEU_SAMPLE_RATE) as writer:
+        for i, wav in studio.StudioGUI._vieneu_iter_chunk_audio(gui, texts, ref_codes, "ref"):
+            if wav is not None and len(wav) > 0:
+                writer.write(wav)
+                if i < len(texts) - 1:
+                    writer.write_silence(0.2)
+
+
+def run_in_memory(tts, texts):
+    wavs = []
+    for text in texts:
+        wavs.append(tts.infer(text, None, None))
+        wavs.append(np.zeros(int(0.2 * studio.VIENEU_SAMPLE_RATE), dtype=np.float32))
+    return np.concatenate(wavs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=0.25, help="audio per chunk")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--skip-in-memory", action="store_true", help="skip the concatenate-at-the-end baseline")
+    args = parser.parse_args()
+
+    texts = make_document(args.chunks)
+    tts = FakeBatchTTS(args.seconds, args.batch_size) if args.batch_size > 1 else FakeTTS(args.seconds)
+    gui = fake_gui(tts)
+    chunk_mb = args.seconds * studio.VIENEU_SAMPLE_RATE * 4 / 1e6
+    print(f"{args.chunks} chunks x ~{args.seconds}s ({chunk_mb:.2f} MB float32 each), batch size {args.batch_size}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        studio._synthesis_cache = studio.SynthesisCache(os.path.join(tmp, "cache"), max_bytes=1 << 40)
+        output_file = os.path.join(tmp, "out.wav")
+        for label in ("streaming, cold cache", "streaming, warm cache"):
+            peak, elapsed = measure(lambda: run_streaming(gui, texts, output_file))
+            print(f"{label:24s} peak {peak / 1e6:9.1f} MB  {elapsed:7.2f} s  "
+                  f"({os.path.getsize(output_file) / 1e6:.0f} MB written)")
+        if not args.skip_in_memory:
+            peak, elapsed = measure(lambda: run_in_memory(tts, texts))
+            print(f"{'in memory (old)':24s} peak {peak / 1e6:9.1f} MB  {elapsed:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ Chạy sau khi build với PyInstaller.
 Usage:
     python build_helper.py --copy-libs
     python build_helper.py --check-libs
+    python build_helper.py --compile-phoneme-dict
 """
 
 import os
@@ -169,12 +170,26 @@ def copy_all_libs(dest_dir, verbose=True):
     return success, failed
 
 
+def compile_phoneme_dict(verbose=True):
+    """Compile vntts/utils/phoneme_dict.json into its memory-mapped form"""
+    utils_dir = Path(__file__).parent / 'vntts' / 'utils'
+    sys.path.insert(0, str(utils_dir))
+    from phoneme_dict_compiled import compile_phoneme_dict as _compile
+    
+    out_path = _compile(str(utils_dir / 'phoneme_dict.json'))
+    if verbose:
+        print(f"  ✓ Compiled phoneme dictionary: {out_path}")
+    return out_path
+
+
 def main():
     parser = argparse.ArgumentParser(description='VN TTS Studio Build Helper')
     parser.add_argument('--copy-libs', action='store_true',
                        help='Copy heavy libraries to dist folder')
     parser.add_argument('--check-libs', action='store_true',
                        help='Check installed heavy libraries')
+    parser.add_argument('--compile-phoneme-dict', action='store_true',
+                       help='Compile the VN TTS phoneme dictionary for fast loading')
     parser.add_argument('--dest', default='dist/VNTTSStudio/_libs',
                        help='Destination directory for libraries')
     
@@ -184,6 +199,8 @@ def main():
         check_libs()
     elif args.copy_libs:
         copy_all_libs(args.dest)
+    elif args.compile_phoneme_dict:
+        compile_phoneme_dict()
     else:
         parser.print_help()
 
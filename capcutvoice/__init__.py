@@ -1,6 +1,8 @@
 """Capcut Voice TTS Module"""
 from .split_text import split_text
-from .tts import create_tts, set_tiktok_session_id
+from .journal import JobJournal
+from .mp3merge import merge_mp3_files
+from .tts import CapcutClient, create_tts, get_client, set_tiktok_session_id
 from .tts_helper import TextToSpeechHelper
 
-__all__ = ['split_text', 'create_tts', 'set_tiktok_session_id', 'TextToSpeechHelper']
+__all__ = ['split_text', 'JobJournal', 'merge_mp3_files', 'CapcutClient', 'create_tts', 'get_client', 'set_tiktok_session_id', 'TextToSpeechHelper']
@@ -2,7 +2,9 @@ import os
 import shutil
 from tts_helper import TextToSpeechHelper
 from split_text import split_text
-from tts import create_tts
+from tts import create_tts, get_client
+from journal import JobJournal
+from mp3merge import merge_mp3_files
 from natsort import natsorted
 import concurrent.futures
 import time
@@ -16,80 +18,17 @@ def print_progress_bar(iteration, total, decimals=1, length=50, fill='█'):
     if iteration == total:
         print()
 
-def write_error_log(temp_folder, error_info, txt_file):
-    """Write error to file-specific error_log.txt immediately."""
-    error_log_file = os.path.join(temp_folder, "error_log.txt")
-    with open(error_log_file, 'a', encoding='utf-8') as log_file:
-        log_file.write(f"File: {txt_file}\n")
-        log_file.write(f"Segment: {error_info['segment_id']}\n")
-        log_file.write(f"Text not converted to MP3: {error_info['text']}\n")
-        log_file.write("-" * 50 + "\n")
-
-def retry_failed_segments(temp_folder, voice_id, txt_file):
-    """Retry failed segments listed in error_log.txt using up to 5 threads."""
-    error_log_file = os.path.join(temp_folder, "error_log.txt")
-    if not os.path.exists(error_log_file):
-        print(f"No error_log.txt found in {temp_folder}, skipping retry")
-        return []
-
-    print(f"Found error_log.txt in {temp_folder}, reading failed segments...")
-    failed_segments = []
+def merge_segments(mp3_files, mp3_output):
+    """Frame-aware merge with one Xing header; plain concatenation if the inputs are not mergeable MP3."""
     try:
-        with open(error_log_file, 'r', encoding='utf-8') as log_file:
-            lines = log_file.readlines()
-            i = 0
-            while i < len(lines):
-                if lines[i].startswith("Segment:"):
-                    segment_id = lines[i].split("Segment: ")[1].strip()
-                    text_line = lines[i + 1].split("Text not converted to MP3: ")[1].strip()
-                    failed_segments.append((segment_id, text_line))
-                    i += 4  # Skip to next error block
-                else:
-                    i += 1
-    except Exception as e:
-        print(f"Failed to read error_log.txt in {temp_folder}: {str(e)}")
-        return []
-
-    if not failed_segments:
-        print(f"No failed segments found in error_log.txt for {txt_file}")
-        return []
-
-    num_threads = min(5, len(failed_segments))
-    print(f"Retrying {len(failed_segments)} failed segments for {txt_file} with {num_threads} threads...")
-
-    new_errors = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = {
-            executor.submit(create_tts, text, voice_id, segment_id, temp_folder): (segment_id, text)
-            for segment_id, text in failed_segments
-        }
-        for future in concurrent.futures.as_completed(futures):
-            segment_id, text = futures[future]
-            try:
-                success, error_info = future.result()
-                if not success:
-                    print(f"Retry failed for segment {segment_id}: {error_info.get('error', 'Unknown error')}")
-                    new_errors.append(error_info)
-                    write_error_log(temp_folder, error_info, txt_file)
-                else:
-                    print(f"Retry succeeded for segment {segment_id}")
-                    with open(error_log_file, 'r', encoding='utf-8') as log_file:
-                        lines = log_file.readlines()
-                    with open(error_log_file, 'w', encoding='utf-8') as log_file:
-                        i = 0
-                        while i < len(lines):
-                            if lines[i].startswith(f"Segment: {segment_id}\n"):
-                                i += 4
-                            else:
-                                log_file.write(lines[i])
-                                i += 1
-            except Exception as e:
-                print(f"Exception during retry for segment {segment_id}: {str(e)}")
-                error_info = {"segment_id": segment_id, "text": text, "error": str(e)}
-                new_errors.append(error_info)
-                write_error_log(temp_folder, error_info, txt_file)
-
-    return new_errors
+        merge_mp3_files(mp3_files, mp3_output)
+        return
+    except ValueError as e:
+        print(f"MP3 merge fell back to byte concatenation: {e}")
+    with open(mp3_output, 'wb') as outfile:
+        for file_path in mp3_files:
+            with open(file_path, 'rb') as infile:
+                outfile.write(infile.read())
 
 if __name__ == "__main__":
     try:
@@ -101,6 +40,8 @@ if __name__ == "__main__":
 
         voice_id = "BV074_streaming"
         num_workers = 150
+        # One keep-alive connection pool shared by all worker threads
+        get_client(pool_size=num_workers)
 
         temp_root = 'temp'
         os.makedirs(temp_root, exist_ok=True)
@@ -151,85 +92,62 @@ if __name__ == "__main__":
             temp_folder = os.path.join(temp_root, os.path.splitext(txt_file)[0])
             os.makedirs(temp_folder, exist_ok=True)
 
-            existing_errors = retry_failed_segments(temp_folder, voice_id, txt_file)
-            if not existing_errors:
-                mp3_files = natsorted([f for f in os.listdir(temp_folder) if f.endswith('.mp3')])
-                if mp3_files and len(mp3_files) >= total_segments:
-                    print(f"All segments for {txt_file} processed, merging...")
-                    with open(mp3_output, 'wb') as outfile:
-                        for mp3_file in mp3_files:
-                            file_path = os.path.join(temp_folder, mp3_file)
-                            with open(file_path, 'rb') as infile:
-                                outfile.write(infile.read())
-                    print(f"Done! Combined MP3 saved as {mp3_output} with {len(mp3_files)}/{total_segments} segments")
-                    shutil.rmtree(temp_folder)
-                    continue
-                else:
-                    print(f"Not enough MP3 files ({len(mp3_files)}/{total_segments}) for {txt_file}, proceeding to process segments")
-
+            # journal.jsonl replaces error_log.txt: each segment's state is appended,
+            # so a restart only redoes what was not finished
             file_start_time = time.time()
-            error_logs = []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-                futures = {}
+            with JobJournal(os.path.join(temp_folder, "journal.jsonl")) as journal:
+                segment_ids = []
                 for i, segment in enumerate(arr):
                     segment_id = f"{os.path.splitext(txt_file)[0]}_segment_{i}"
-                    futures[executor.submit(create_tts, segment, voice_id, segment_id, temp_folder)] = (i, segment)
-                
-                completed = 0
-                for future in concurrent.futures.as_completed(futures):
-                    index, segment_text = futures[future]
-                    try:
-                        success, error_info = future.result(timeout=20)
-                        if not success:
-                            print(f"Segment {index} failed: {error_info.get('error', 'Unknown error')}")
-                            error_logs.append(error_info)
-                            write_error_log(temp_folder, error_info, txt_file)
-                        else:
-                            print(f"Segment {index} processed successfully")
-                    except concurrent.futures.TimeoutError:
-                        print(f"Segment_{index} timed out after 20 seconds")
-                        error_logs.append({
-                            "segment_id": index,
-                            "text": segment_text,
-                            "error": "Timeout after 20 seconds"
-                        })
-                        write_error_log(temp_folder, {
-                            "segment_id": index,
-                            "text": segment_text,
-                            "error": "Timeout after 20 seconds"
-                        }, txt_file)
-                    except Exception as e:
-                        print(f"Segment_{index} raised exception: {e}")
-                        error_logs.append({
-                            "segment_id": index,
-                            "text": segment_text,
-                            "error": str(e)
-                        })
-                        write_error_log(temp_folder, {
-                            "segment_id": index,
-                            "text": segment_text,
-                            "error": str(e)
-                        }, txt_file)
-                    completed += 1
-                    print_progress_bar(completed, total_segments)
+                    journal.add(segment_id, segment, os.path.join(temp_folder, f"{segment_id}.mp3"))
+                    segment_ids.append(segment_id)
+
+                wanted = set(segment_ids)
+                todo = [job for job in journal.unfinished() if job['id'] in wanted]
+                if len(todo) < total_segments:
+                    print(f"Resuming {txt_file}: {total_segments - len(todo)}/{total_segments} segments already done")
+
+                failed = 0
+                if todo:
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=min(num_workers, len(todo))) as executor:
+                        futures = {
+                            executor.submit(create_tts, job['text'], voice_id, job['id'], temp_folder): job['id']
+                            for job in todo
+                        }
+
+                        completed = 0
+                        for future in concurrent.futures.as_completed(futures):
+                            segment_id = futures[future]
+                            try:
+                                success, error_info = future.result(timeout=20)
+                                if success:
+                                    journal.mark_done(segment_id)
+                                    print(f"Segment {segment_id} processed successfully")
+                                else:
+                                    job = journal.mark_failed(segment_id, error_info.get('error', 'Unknown error'))
+                                    print(f"Segment {segment_id} failed (attempt {job['attempts']}): {job['error']}")
+                                    failed += 1
+                            except concurrent.futures.TimeoutError:
+                                print(f"Segment {segment_id} timed out after 20 seconds")
+                                journal.mark_failed(segment_id, "Timeout after 20 seconds")
+                                failed += 1
+                            except Exception as e:
+                                print(f"Segment {segment_id} raised exception: {e}")
+                                journal.mark_failed(segment_id, e)
+                                failed += 1
+                            completed += 1
+                            print_progress_bar(completed, len(todo))
+
+                mp3_files = [journal.jobs[segment_id]['output'] for segment_id in segment_ids]
 
             file_duration = time.time() - file_start_time
-            if not error_logs:
-                mp3_files = natsorted([f for f in os.listdir(temp_folder) if f.endswith('.mp3')])
-                if mp3_files and len(mp3_files) >= total_segments:
-                    print(f"Finished processing segments, starting to merge files...")
-                    with open(mp3_output, 'wb') as outfile:
-                        for mp3_file in mp3_files:
-                            file_path = os.path.join(temp_folder, mp3_file)
-                            with open(file_path, 'rb') as infile:
-                                outfile.write(infile.read())
-                    print(f"Done! Combined MP3 saved as {mp3_output} with {len(mp3_files)}/{total_segments} segments in {file_duration:.2f}s")
-                    shutil.rmtree(temp_folder)
-                else:
-                    print(f"Not enough MP3 files generated ({len(mp3_files)}/{total_segments}) for {txt_file} in {file_duration:.2f}s")
-                    incomplete_files.append(txt_file)
+            if not failed:
+                print(f"Finished processing segments, starting to merge files...")
+                merge_segments(mp3_files, mp3_output)
+                print(f"Done! Combined MP3 saved as {mp3_output} with {total_segments} segments in {file_duration:.2f}s")
+                shutil.rmtree(temp_folder)
             else:
-                print(f"Errors occurred for {txt_file}, skipping merge and keeping temp folder {temp_folder}")
+                print(f"{failed} segments failed for {txt_file}, keeping temp folder {temp_folder}; rerun to resume")
                 incomplete_files.append(txt_file)
 
         if incomplete_files:
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobJournal:
+    """
+    Append-only JSONL journal of segment states (pending, done, failed).
+
+    Every state change is appended as one line and flushed to the OS, so a
+    killed process loses nothing; fsync is batched (every `fsync_every`
+    records or `fsync_interval` seconds) to survive power loss cheaply.
+    Reopening the journal replays it, the latest record per segment wins and
+    a torn last line from a crash is ignored.
+    """
+
+    def __init__(self, path, fsync_every=64, fsync_interval=1.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._replay()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            # Only complete lines count; a torn tail from a crash is cut off so
+            # the next append starts on a fresh line
+            end = data.rfind(b'\n') + 1
+            if end != len(data):
+                f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            job = self.jobs.setdefault(record['id'], {})
+            job.update(record)
+
+    def _append(self, record):
+        job = self.jobs.setdefault(record['id'], {})
+        job.update(record)
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        now = time.monotonic()
+        if self._unsynced >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self._fsync(now)
+        return job
+
+    def _fsync(self, now=None):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic() if now is None else now
+
+    def add(self, job_id, text, output):
+        """Register a segment; known segments keep their state unless the text changed."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.get('text') == text and job.get('output') == output:
+                return job
+            return self._append({'id': job_id, 'state': PENDING, 'text': text, 'output': output, 'attempts': 0, 'error': None})
+
+    def mark_done(self, job_id):
+        with self._lock:
+            attempts = self.jobs[job_id].get('attempts', 0) + 1
+            return self._append({'id': job_id, 'state': DONE, 'attempts': attempts, 'error': None})
+
+    def mark_failed(self, job_id, error):
+        with self._lock:
+            attempts = self.jobs[job_id].get('attempts', 0) + 1
+            return self._append({'id': job_id, 'state': FAILED, 'attempts': attempts, 'error': str(error)})
+
+    def unfinished(self, check_outputs=True):
+        """Segments still to do, in journal order. Done segments whose output vanished are included."""
+        with self._lock:
+            return [
+                job for job in self.jobs.values()
+                if job['state'] != DONE or (check_outputs and not os.path.exists(job['output']))
+            ]
+
+    def failed(self):
+        with self._lock:
+            return [job for job in self.jobs.values() if job['state'] == FAILED]
+
+    def sync(self):
+        with self._lock:
+            self._file.flush()
+            self._fsync()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            self._fsync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,252 @@
+"""
+In-process MP3 merger.
+
+Concatenating MP3 files byte by byte leaves each file's ID3 tags and Xing/Info
+frame in the middle of the stream, so players misreport the duration and seek
+slowly. This merger walks the MPEG audio frames of every input, drops the
+tags and per-file Xing/Info/VBRI frames, and writes a single Xing (VBR) or
+Info (CBR) header with the total frame count, byte count and a seek TOC.
+Audio frames are copied as-is: no decoding and no subprocess.
+"""
+
+import struct
+from collections import namedtuple
+
+# Bitrates in kbps, indexed by [version is MPEG1][layer][bitrate index]
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates indexed by version bits (0 = MPEG2.5, 2 = MPEG2, 3 = MPEG1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+XING_FLAGS = 0x07  # frames + bytes + TOC
+TOC_SIZE = 100
+
+FrameHeader = namedtuple(
+    'FrameHeader',
+    'version layer bitrate_index sample_rate_index padding channel_mode '
+    'bitrate sample_rate samples length',
+)
+
+
+def parse_frame_header(data, pos):
+    """Parse the 4-byte MPEG audio frame header at `pos`, or return None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 3
+    layer = 4 - ((b1 >> 1) & 3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if mpeg1 or layer == 2 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    return FrameHeader(version, layer, bitrate_index, sample_rate_index, padding,
+                       b3 >> 6, bitrate, sample_rate, samples, length)
+
+
+def _side_info_size(header):
+    mono = header.channel_mode == 3
+    if header.version == 3:
+        return 17 if mono else 32
+    return 9 if mono else 17
+
+
+def is_info_frame(data, pos, header):
+    """Whether the frame at `pos` is a Xing/Info/VBRI header rather than audio."""
+    if header.layer != 3:
+        return False
+    tag = pos + 4 + _side_info_size(header)
+    return data[tag:tag + 4] in (b'Xing', b'Info') or data[pos + 36:pos + 40] == b'VBRI'
+
+
+def _same_stream(a, b):
+    return (a.version, a.layer, a.sample_rate_index) == (b.version, b.layer, b.sample_rate_index)
+
+
+def audio_bounds(data):
+    """Start and end of the audio data, excluding ID3v2, ID3v1 and APEv2 tags."""
+    start, end = 0, len(data)
+    # ID3v2 (possibly several in a row)
+    while data[start:start + 3] == b'ID3' and start + 10 <= end:
+        size = 0
+        for b in data[start + 6:start + 10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if data[start + 5] & 0x10 else 0
+        start += 10 + size + footer
+    # ID3v1
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    # APEv2 footer
+    if end - start >= 32 and data[end - 32:end - 24] == b'APETAGEX':
+        size, flags = struct.unpack_from('<I4xI', data, end - 20)
+        end -= size + (32 if flags & 0x80000000 else 0)
+    return min(start, end), end
+
+
+def scan_frames(data):
+    """
+    Find the audio frames in one MP3 file.
+
+    Tags are skipped, a leading Xing/Info/VBRI frame is dropped and anything
+    that is not a run of consistent frame headers is treated as junk.
+
+    Returns:
+        (runs, sizes, bitrate_indexes, first): `runs` are (start, end) byte
+        ranges of contiguous audio frames, `sizes` the length of each frame,
+        `first` the header of the first frame (None if there is no audio).
+    """
+    start, end = audio_bounds(data)
+    runs, sizes, bitrate_indexes = [], [], set()
+    first = None
+    pos = start
+    synced = False
+    run_start = None
+    while pos + 4 <= end:
+        header = parse_frame_header(data, pos)
+        valid = (
+            header is not None
+            and pos + header.length <= end
+            and (first is None or _same_stream(header, first))
+        )
+        if valid and not synced:
+            # After a resync, require a second header (or EOF) right behind this one
+            nxt = parse_frame_header(data, pos + header.length)
+            valid = pos + header.length == end or (nxt is not None and _same_stream(header, nxt))
+        if not valid:
+            if run_start is not None:
+                runs.append((run_start, pos))
+                run_start = None
+            synced = False
+            pos = data.find(b'\xff', pos + 1, end)
+            if pos < 0:
+                break
+            continue
+
+        synced = True
+        if first is None:
+            first = header
+            if is_info_frame(data, pos, header):
+                pos += header.length
+                continue
+        if run_start is None:
+            run_start = pos
+        sizes.append(header.length)
+        bitrate_indexes.add(header.bitrate_index)
+        pos += header.length
+
+    if run_start is not None:
+        runs.append((run_start, pos))
+    return runs, sizes, bitrate_indexes, first
+
+
+def _xing_frame_size(header):
+    """Smallest frame (header + side info + Xing payload) matching the stream."""
+    needed = 4 + _side_info_size(header) + 4 + 4 + 4 + 4 + TOC_SIZE
+    mpeg1 = header.version == 3
+    for bitrate_index in range(1, 15):
+        bitrate = _BITRATES[(mpeg1, 3)][bitrate_index] * 1000
+        samples = 1152 if mpeg1 else 576
+        length = samples // 8 * bitrate // header.sample_rate
+        if length >= needed:
+            return bitrate_index, length
+    raise ValueError("No frame size can hold a Xing header")
+
+
+def build_xing_frame(header, bitrate_index, length, frame_sizes, cbr):
+    """Build the Xing/Info frame describing `frame_sizes` audio frames."""
+    frame = bytearray(length)
+    frame[0] = 0xFF
+    frame[1] = 0xE0 | (header.version << 3) | (1 << 1) | 1  # Layer III, no CRC
+    frame[2] = (bitrate_index << 4) | (header.sample_rate_index << 2)
+    frame[3] = header.channel_mode << 6
+
+    total_frames = len(frame_sizes)
+    total_bytes = length + sum(frame_sizes)
+
+    # TOC: byte position (as 1/256 of the stream) at each percent of duration
+    toc = bytearray(TOC_SIZE)
+    targets = [i * total_frames // TOC_SIZE for i in range(TOC_SIZE)]
+    position = length
+    target = 0
+    for index, size in enumerate(frame_sizes):
+        while target < TOC_SIZE and targets[target] == index:
+            toc[target] = min(255, position * 256 // total_bytes)
+            target += 1
+        position += size
+    while target < TOC_SIZE:
+        toc[target] = min(255, position * 256 // total_bytes)
+        target += 1
+
+    offset = 4 + _side_info_size(header)
+    frame[offset:offset + 4] = b'Info' if cbr else b'Xing'
+    struct.pack_into('>III', frame, offset + 4, XING_FLAGS, total_frames, total_bytes)
+    frame[offset + 16:offset + 16 + TOC_SIZE] = toc
+    return bytes(frame)
+
+
+def merge_mp3_files(input_files, output_file):
+    """
+    Merge MP3 files into `output_file` without re-encoding.
+
+    Returns:
+        dict with "frames", "bytes" and "duration" (seconds) of the output
+
+    Raises:
+        ValueError: If the inputs contain no audio or mix MPEG versions,
+            layers or sample rates (which cannot be joined without decoding).
+    """
+    stream = None
+    frame_sizes = []
+    bitrate_indexes = set()
+    xing_bitrate_index = xing_length = 0
+
+    with open(output_file, 'wb') as out:
+        for path in input_files:
+            with open(path, 'rb') as f:
+                data = f.read()
+            runs, sizes, bitrates, first = scan_frames(data)
+            if first is None:
+                continue
+            if stream is None:
+                if first.layer != 3:
+                    raise ValueError(f"{path}: only MPEG Layer III can be merged")
+                stream = first
+                xing_bitrate_index, xing_length = _xing_frame_size(stream)
+                out.write(b'\0' * xing_length)  # placeholder, filled in below
+            elif not _same_stream(first, stream):
+                raise ValueError(f"{path}: MPEG version or sample rate differs from the first file")
+
+            view = memoryview(data)
+            for run_start, run_end in runs:
+                out.write(view[run_start:run_end])
+            frame_sizes.extend(sizes)
+            bitrate_indexes |= bitrates
+
+        if not frame_sizes:
+            raise ValueError("No MP3 audio frames found")
+
+        out.seek(0)
+        out.write(build_xing_frame(stream, xing_bitrate_index, xing_length, frame_sizes, len(bitrate_indexes) == 1))
+
+    samples = 1152 if stream.version == 3 else 576
+    return {
+        "frames": len(frame_sizes),
+        "bytes": xing_length + sum(frame_sizes),
+        "duration": len(frame_sizes) * samples / stream.sample_rate,
+    }
@@ -3,11 +3,69 @@ import base64
 import os
 import time
 import re
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
 
 BASE_URL = 'https://api16-normal-v6.tiktokv.com/media/api/text/speech/invoke'
 DEFAULT_VOICE = 'vi_female_huong'
+DEFAULT_POOL_SIZE = 10
+USER_AGENT = 'com.zhiliaoapp.musically/2022600030 (Linux; U; Android 7.1.2; es_ES; SM-G988N; Build/NRD90M;tt-ok/3.12.13.1)'
 tiktok_session_id = "621bd837f095bc63f0473a36fdac4290"
 
+
+class CapcutClient:
+    """
+    Keep-alive HTTP client for the TikTok/CapCut TTS endpoint.
+
+    Wraps one requests.Session whose connection pool is shared by every
+    thread using the client, so consecutive lines reuse the TCP/TLS
+    connection instead of paying DNS, TCP and TLS setup per request.
+    `pool_size` should be at least the number of concurrent worker threads.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, base_url=BASE_URL):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': 'gzip,deflate,compress',
+        })
+        # The session ID is sent per request; never keep cookies the server sets
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def invoke(self, req_text, voice_id, session_id, timeout=5):
+        """POST one already prepared text (see prepare_text) and return the response."""
+        url = f'{self.base_url}/?text_speaker={voice_id}&req_text={req_text}&speaker_map_type=0&aid=1233'
+        return self.session.post(url, headers={'Cookie': f'sessionid={session_id}'}, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client(pool_size=DEFAULT_POOL_SIZE):
+    """Return the process-wide client, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = CapcutClient(pool_size=pool_size)
+        return _default_client
+
+
 def set_tiktok_session_id(session_id):
     global tiktok_session_id
     tiktok_session_id = session_id
@@ -33,7 +91,7 @@ def handle_status_error(status_code):
     elif status_code == 5:
         raise ValueError(f'No session ID found. status_code: {status_code}')
 
-def create_tts(text, voice_id=DEFAULT_VOICE, index=1, temp_folder='temp', retries=3, delay=1):
+def create_tts(text, voice_id=DEFAULT_VOICE, index=1, temp_folder='temp', retries=3, delay=1, client=None):
     if not tiktok_session_id:
         raise ValueError("TikTok session ID is not set. Use set_tiktok_session_id() to set it.")
 
@@ -43,18 +101,13 @@ def create_tts(text, voice_id=DEFAULT_VOICE, index=1, temp_folder='temp', retrie
         return (False, {"segment_id": index, "text": text, "error": "Empty or meaningless content"})
 
     req_text = prepare_text(text)
-    url = f'{BASE_URL}/?text_speaker={voice_id}&req_text={req_text}&speaker_map_type=0&aid=1233'
-    headers = {
-        'User-Agent': 'com.zhiliaoapp.musically/2022600030 (Linux; U; Android 7.1.2; es_ES; SM-G988N; Build/NRD90M;tt-ok/3.12.13.1)',
-        'Cookie': f'sessionid={tiktok_session_id}',
-        'Accept-Encoding': 'gzip,deflate,compress'
-    }
+    client = client or get_client()
 
     start_time = time.time()
     for attempt in range(retries):
         try:
             print(f"Attempt {attempt + 1} for Segment_{index} at {time.time() - start_time:.2f}s")
-            response = requests.post(url, headers=headers, timeout=5)
+            response = client.invoke(req_text, voice_id, tiktok_session_id, timeout=5)
             os.makedirs(temp_folder, exist_ok=True)
 
             if response.status_code == 200:
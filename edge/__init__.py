@@ -3,16 +3,24 @@ needing Windows or the Edge browser."""
 
 from . import exceptions
 from .communicate import Communicate
+from .sinks import AudioSink, FFmpegSink, FileSink, MemorySink
 from .submaker import SubMaker
+from .transport import Transport
 from .version import __version__, __version_info__
-from .voices import VoicesManager, list_voices
+from .voices import VoiceCatalogCache, VoicesManager, list_voices
 
 __all__ = [
     "Communicate",
+    "AudioSink",
+    "FFmpegSink",
+    "FileSink",
+    "MemorySink",
     "SubMaker",
+    "Transport",
     "exceptions",
     "__version__",
     "__version_info__",
+    "VoiceCatalogCache",
     "VoicesManager",
     "list_voices",
 ]
@@ -4,9 +4,10 @@ end-users. The other classes and functions are for internal use only."""
 import asyncio
 import concurrent.futures
 import json
-import ssl
+import os
 import time
 import uuid
+import wave
 from contextlib import nullcontext
 from io import TextIOWrapper
 from queue import Queue
@@ -23,10 +24,9 @@ from typing import (
 from xml.sax.saxutils import escape, unescape
 
 import aiohttp
-import certifi
 from typing_extensions import Literal
 
-from .constants import DEFAULT_VOICE, SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+from .constants import DEFAULT_OUTPUT_FORMAT, DEFAULT_VOICE, OUTPUT_FORMATS
 from .data_classes import TTSConfig
 from .drm import DRM
 from .exceptions import (
@@ -35,9 +35,15 @@ from .exceptions import (
     UnknownResponse,
     WebSocketError,
 )
+from .sinks import AudioSink
+from .transport import PooledWebSocket, Transport
 from .typing import CommunicateState, TTSChunk
 
 
+class _StaleConnection(Exception):
+    """A pooled websocket turned out to be closed before the turn started."""
+
+
 def get_headers_and_data(
     data: bytes, header_length: int
 ) -> Tuple[Dict[bytes, bytes], bytes]:
@@ -100,10 +106,12 @@ def connect_id() -> str:
     return uuid.uuid4().hex
 
 
-def _find_last_newline_or_space_within_limit(text: bytes, limit: int) -> int:
+def _find_last_newline_or_space_within_limit(
+    text: bytes, limit: int, start: int = 0
+) -> int:
     """
     Finds the index of the rightmost preferred split character (newline or space)
-    within the initial `limit` bytes of the text.
+    within `text[start:limit]`.
 
     This helps find a natural word or sentence boundary for splitting, prioritizing
     newlines over spaces.
@@ -111,48 +119,76 @@ def _find_last_newline_or_space_within_limit(text: bytes, limit: int) -> int:
     Args:
         text (bytes): The byte string to search within.
         limit (int): The maximum index (exclusive) to search up to.
+        start (int): The index to start searching from.
 
     Returns:
-        int: The index of the last found newline or space within the limit,
+        int: The index of the last found newline or space within the range,
              or -1 if neither is found in that range.
     """
     # Prioritize finding a newline character
-    split_at = text.rfind(b"\n", 0, limit)
+    split_at = text.rfind(b"\n", start, limit)
     # If no newline is found, search for a space
     if split_at < 0:
-        split_at = text.rfind(b" ", 0, limit)
+        split_at = text.rfind(b" ", start, limit)
     return split_at
 
 
-def _find_safe_utf8_split_point(text_segment: bytes) -> int:
+def _utf8_sequence_length(lead_byte: int) -> int:
+    """
+    Returns the length of the UTF-8 sequence started by `lead_byte`,
+    or 0 if it is not a valid lead byte.
+    """
+    if lead_byte < 0x80:
+        return 1
+    if 0xC2 <= lead_byte <= 0xDF:
+        return 2
+    if 0xE0 <= lead_byte <= 0xEF:
+        return 3
+    if 0xF0 <= lead_byte <= 0xF4:
+        return 4
+    return 0
+
+
+def _find_safe_utf8_split_point(
+    text_segment: bytes, start: int = 0, end: Optional[int] = None
+) -> int:
     """
     Finds the rightmost possible byte index such that the
-    segment `text_segment[:index]` is a valid UTF-8 sequence.
+    segment `text_segment[start:index]` does not end inside a
+    multi-byte UTF-8 character.
 
-    This prevents splitting in the middle of a multi-byte UTF-8 character.
+    Only the last (at most four) bytes before `end` are inspected: the
+    lead byte of the final character is located by skipping continuation
+    bytes, and the split point moves before it if the character is cut.
+    The segment is assumed to be valid UTF-8 up to that point.
 
     Args:
         text_segment (bytes): The byte segment being considered for splitting.
+        start (int): The start of the segment.
+        end (Optional[int]): The proposed split point (defaults to the end).
 
     Returns:
-        int: The index of the safe split point. Returns 0 if no valid split
-             point is found (e.g., if the first byte is part of a multi-byte
-             sequence longer than the limit allows).
+        int: The index of the safe split point. Returns `start` if no valid
+             split point is found (e.g., if the first byte is part of a
+             multi-byte sequence longer than the limit allows).
     """
-    split_at = len(text_segment)
-    while split_at > 0:
-        try:
-            text_segment[:split_at].decode("utf-8")
-            # Found the largest valid UTF-8 sequence
-            return split_at
-        except UnicodeDecodeError:
-            # The byte at split_at-1 is part of an incomplete multi-byte char, try earlier
-            split_at -= 1
+    if end is None:
+        end = len(text_segment)
 
-    return split_at
+    lead = end - 1
+    while lead >= start and end - lead < 4 and text_segment[lead] & 0xC0 == 0x80:
+        lead -= 1
+    if lead < start:
+        return start
+
+    sequence_length = _utf8_sequence_length(text_segment[lead])
+    if sequence_length and lead + sequence_length <= end:
+        # The last character is complete
+        return end
+    return lead
 
 
-def _adjust_split_point_for_xml_entity(text: bytes, split_at: int) -> int:
+def _adjust_split_point_for_xml_entity(text: bytes, split_at: int, start: int = 0) -> int:
     """
     Adjusts a proposed split point backward to prevent splitting inside an XML entity.
 
@@ -163,14 +199,18 @@ def _adjust_split_point_for_xml_entity(text: bytes, split_at: int) -> int:
         text (bytes): The text segment being considered.
         split_at (int): The proposed split point index, determined by whitespace
                         or UTF-8 safety.
+        start (int): The start of the segment; ampersands before it are ignored.
 
     Returns:
         int: The adjusted split point index. It will be moved to the '&'
              if an unterminated entity is detected right before the original `split_at`.
              Otherwise, the original `split_at` is returned.
     """
-    while split_at > 0 and b"&" in text[:split_at]:
-        ampersand_index = text.rindex(b"&", 0, split_at)
+    while split_at > start:
+        ampersand_index = text.rfind(b"&", start, split_at)
+        if ampersand_index < 0:
+            break
+
         # Check if a semicolon exists between the ampersand and the split point
         if text.find(b";", ampersand_index, split_at) != -1:
             # Found a terminated entity (like &amp;), safe to break at original split_at
@@ -194,6 +234,10 @@ def split_text_by_byte_length(
     2. Chunks do not end with an incomplete UTF-8 multi-byte character.
     3. Chunks do not split XML entities (like `&amp;`) in the middle.
 
+    The text is walked with a moving offset rather than re-sliced, and every
+    search is bounded to the current window, so the total work is linear in
+    the length of the text.
+
     Args:
         text (str or bytes): The input text. If str, it's encoded to UTF-8.
         byte_length (int): The maximum allowed byte length for any yielded chunk.
@@ -217,18 +261,21 @@ def split_text_by_byte_length(
     if byte_length <= 0:
         raise ValueError("byte_length must be greater than 0")
 
-    while len(text) > byte_length:
+    start = 0
+    while len(text) - start > byte_length:
+        limit = start + byte_length
+
         # Find the initial split point based on whitespace or UTF-8 boundary
-        split_at = _find_last_newline_or_space_within_limit(text, byte_length)
+        split_at = _find_last_newline_or_space_within_limit(text, limit, start)
 
         if split_at < 0:
             ## No newline or space found, so we need to find a safe UTF-8 split point
-            split_at = _find_safe_utf8_split_point(text)
+            split_at = _find_safe_utf8_split_point(text, start, limit)
 
         # Adjust the split point to avoid cutting in the middle of an xml entity, such as '&amp;'
-        split_at = _adjust_split_point_for_xml_entity(text, split_at)
+        split_at = _adjust_split_point_for_xml_entity(text, split_at, start)
 
-        if split_at < 0:
+        if split_at < start:
             # This should not happen if byte_length is reasonable,
             # but guards against edge cases.
             raise ValueError(
@@ -237,16 +284,16 @@ def split_text_by_byte_length(
             )
 
         # Yield the chunk
-        chunk = text[:split_at].strip()
+        chunk = text[start:split_at].strip()
         if chunk:
             yield chunk
 
         # Prepare for the next iteration
-        # If split_at became 0 after adjustment, advance by 1 to avoid infinite loop
-        text = text[split_at if split_at > 0 else 1 :]
+        # If split_at did not advance after adjustment, advance by 1 to avoid infinite loop
+        start = split_at if split_at > start else start + 1
 
     # Yield the remaining part
-    remaining_chunk = text.strip()
+    remaining_chunk = text[start:].strip()
     if remaining_chunk:
         yield remaining_chunk
 
@@ -309,6 +356,27 @@ def ssml_headers_plus_data(request_id: str, timestamp: str, ssml: str) -> str:
     )
 
 
+class _PCMWaveWriter:
+    """File-like wrapper that writes 16-bit mono PCM into a WAV container."""
+
+    def __init__(self, fname: Union[str, bytes], sample_rate: int):
+        self._wav = wave.open(os.fsdecode(fname), "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, data: bytes) -> None:
+        """Appends PCM frames."""
+        self._wav.writeframesraw(data)
+
+    def __enter__(self) -> "_PCMWaveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # close() patches the RIFF/data sizes in the header.
+        self._wav.close()
+
+
 class Communicate:
     """
     Communicate with the service.
@@ -324,13 +392,15 @@ class Communicate:
         volume: str = "+0%",
         pitch: str = "+0Hz",
         boundary: Literal["WordBoundary", "SentenceBoundary"] = "SentenceBoundary",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
         connector: Optional[aiohttp.BaseConnector] = None,
         proxy: Optional[str] = None,
         connect_timeout: Optional[int] = 10,
         receive_timeout: Optional[int] = 60,
+        transport: Optional[Transport] = None,
     ):
         # Validate TTS settings and store the TTSConfig object.
-        self.tts_config = TTSConfig(voice, rate, volume, pitch, boundary)
+        self.tts_config = TTSConfig(voice, rate, volume, pitch, boundary, output_format)
 
         # Validate the text parameter.
         if not isinstance(text, str):
@@ -363,6 +433,14 @@ class Communicate:
         if connector is not None and not isinstance(connector, aiohttp.BaseConnector):
             raise TypeError("connector must be aiohttp.BaseConnector")
         self.connector: Optional[aiohttp.BaseConnector] = connector
+        self.connect_timeout = connect_timeout
+        self.receive_timeout = receive_timeout
+
+        # Validate the transport parameter. Without one, a private transport
+        # is created per stream() call so the text parts still share a socket.
+        if transport is not None and not isinstance(transport, Transport):
+            raise TypeError("transport must be Transport")
+        self.transport: Optional[Transport] = transport
 
         # Store current state of TTS.
         self.state: CommunicateState = {
@@ -391,26 +469,48 @@ class Communicate:
             raise UnknownResponse(f"Unknown metadata type: {meta_type}")
         raise UnexpectedResponse("No WordBoundary metadata found")
 
-    async def __stream(self) -> AsyncGenerator[TTSChunk, None]:
-        async def send_command_request() -> None:
-            """Sends the command request to the service."""
-            word_boundary = self.tts_config.boundary == "WordBoundary"
-            wd = "true" if word_boundary else "false"
-            sq = "true" if not word_boundary else "false"
-            await websocket.send_str(
+    def __speech_config(self) -> str:
+        """Returns the body of the speech.config message."""
+        word_boundary = self.tts_config.boundary == "WordBoundary"
+        wd = "true" if word_boundary else "false"
+        sq = "true" if not word_boundary else "false"
+        return (
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            f'"sentenceBoundaryEnabled":"{sq}","wordBoundaryEnabled":"{wd}"'
+            "},"
+            f'"outputFormat":"{self.tts_config.output_format}"'
+            "}}}}\r\n"
+        )
+
+    async def __stream(self, transport: Transport) -> AsyncGenerator[TTSChunk, None]:
+        try:
+            async for message in self.__stream_turn(transport, fresh=False):
+                yield message
+        except _StaleConnection:
+            # The server closed the idle socket; nothing was yielded yet,
+            # so run the turn again on a new connection.
+            async for message in self.__stream_turn(transport, fresh=True):
+                yield message
+
+    async def __stream_turn(
+        self, transport: Transport, fresh: bool
+    ) -> AsyncGenerator[TTSChunk, None]:
+        async def send_command_request(conn: PooledWebSocket) -> None:
+            """Sends the command request to the service, once per socket and settings."""
+            speech_config = self.__speech_config()
+            if conn.speech_config == speech_config:
+                return
+            await conn.websocket.send_str(
                 f"X-Timestamp:{date_to_string()}\r\n"
                 "Content-Type:application/json; charset=utf-8\r\n"
                 "Path:speech.config\r\n\r\n"
-                '{"context":{"synthesis":{"audio":{"metadataoptions":{'
-                f'"sentenceBoundaryEnabled":"{sq}","wordBoundaryEnabled":"{wd}"'
-                "},"
-                '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
-                "}}}}\r\n"
+                f"{speech_config}"
             )
+            conn.speech_config = speech_config
 
-        async def send_ssml_request() -> None:
+        async def send_ssml_request(conn: PooledWebSocket) -> None:
             """Sends the SSML request to the service."""
-            await websocket.send_str(
+            await conn.websocket.send_str(
                 ssml_headers_plus_data(
                     connect_id(),
                     date_to_string(),
@@ -426,27 +526,28 @@ class Communicate:
         # don't receive any audio data.
         audio_was_received = False
 
-        # Create a new connection to the service.
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession(
-            connector=self.connector,
-            trust_env=True,
-            timeout=self.session_timeout,
-        ) as session, session.ws_connect(
-            f"{WSS_URL}&ConnectionId={connect_id()}"
-            f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
-            f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
-            compress=15,
-            proxy=self.proxy,
-            headers=DRM.headers_with_muid(WSS_HEADERS),
-            ssl=ssl_ctx,
-        ) as websocket:
-            await send_command_request()
-
-            await send_ssml_request()
+        # Bytes of audio in this turn; used to place raw PCM turns exactly.
+        turn_audio_bytes = 0
+
+        # message_was_received tells a pooled socket that was closed while
+        # idle apart from a real failure during the turn.
+        message_was_received = False
+
+        # Reuse a pooled connection to the service, or open a new one.
+        async with transport.connection(fresh) as conn:
+            websocket = conn.websocket
+            try:
+                await send_command_request(conn)
+
+                await send_ssml_request(conn)
+            except (aiohttp.ClientError, ConnectionResetError) as e:
+                if conn.reused:
+                    raise _StaleConnection() from e
+                raise
 
             async for received in websocket:
                 if received.type == aiohttp.WSMsgType.TEXT:
+                    message_was_received = True
                     encoded_data: bytes = received.data.encode("utf-8")
                     parameters, data = get_headers_and_data(
                         encoded_data, encoded_data.find(b"\r\n\r\n")
@@ -463,23 +564,37 @@ class Communicate:
                             parsed_metadata["offset"] + parsed_metadata["duration"]
                         )
                     elif path == b"turn.end":
-                        # Update the offset compensation for the next SSML request.
-                        self.state["offset_compensation"] = self.state[
-                            "last_duration_offset"
-                        ]
-
-                        # Use average padding typically added by the service
-                        # to the end of the audio data. This seems to work pretty
-                        # well for now, but we might ultimately need to use a
-                        # more sophisticated method like using ffmpeg to get
-                        # the actual duration of the audio data.
-                        self.state["offset_compensation"] += 8_750_000
+                        pcm_sample_rate = self.tts_config.pcm_sample_rate
+                        if pcm_sample_rate is not None:
+                            # Raw 16-bit mono PCM has no padding or framing, so the
+                            # duration of the turn follows from the byte count
+                            # (in 100-nanosecond ticks).
+                            self.state["offset_compensation"] += (
+                                turn_audio_bytes * 10_000_000 // (2 * pcm_sample_rate)
+                            )
+                        else:
+                            # Update the offset compensation for the next SSML request.
+                            self.state["offset_compensation"] = self.state[
+                                "last_duration_offset"
+                            ]
+
+                            # Use average padding typically added by the service
+                            # to the end of the audio data. This seems to work pretty
+                            # well for now, but we might ultimately need to use a
+                            # more sophisticated method like using ffmpeg to get
+                            # the actual duration of the audio data.
+                            self.state["offset_compensation"] += 8_750_000
+
+                        # The turn is complete, so the socket can serve the next one.
+                        conn.reusable = True
 
                         # Exit the loop so we can send the next SSML request.
                         break
                     elif path not in (b"response", b"turn.start"):
                         raise UnknownResponse("Unknown path received")
                 elif received.type == aiohttp.WSMsgType.BINARY:
+                    message_was_received = True
+
                     # Message is too short to contain header length.
                     if len(received.data) < 2:
                         raise UnexpectedResponse(
@@ -508,7 +623,10 @@ class Communicate:
                     # with no Content-Type; this is expected. What is not expected is for
                     # an audio stream to be sent with no data.
                     content_type = parameters.get(b"Content-Type", None)
-                    if content_type not in (b"audio/mpeg", None):
+                    expected_type = OUTPUT_FORMATS[self.tts_config.output_format]
+                    if content_type is not None and not content_type.startswith(
+                        expected_type.encode("ascii")
+                    ):
                         raise UnexpectedResponse(
                             "Received binary message, but with an unexpected Content-Type."
                         )
@@ -531,12 +649,18 @@ class Communicate:
 
                     # Yield the audio data.
                     audio_was_received = True
+                    turn_audio_bytes += len(data)
                     yield {"type": "audio", "data": data}
                 elif received.type == aiohttp.WSMsgType.ERROR:
+                    if conn.reused and not message_was_received:
+                        raise _StaleConnection()
                     raise WebSocketError(
                         received.data if received.data else "Unknown error"
                     )
 
+            if conn.reused and not message_was_received:
+                raise _StaleConnection()
+
             if not audio_was_received:
                 raise NoAudioReceived(
                     "No audio was received. Please verify that your parameters are correct."
@@ -560,18 +684,50 @@ class Communicate:
             raise RuntimeError("stream can only be called once.")
         self.state["stream_was_called"] = True
 
+        # Use the shared transport, or one that lives for this call only.
+        transport = self.transport
+        if transport is None:
+            transport = Transport(
+                connector=self.connector,
+                proxy=self.proxy,
+                connect_timeout=self.connect_timeout,
+                receive_timeout=self.receive_timeout,
+            )
+
         # Stream the audio and metadata from the service.
-        for self.state["partial_text"] in self.texts:
-            try:
-                async for message in self.__stream():
-                    yield message
-            except aiohttp.ClientResponseError as e:
-                if e.status != 403:
-                    raise
+        try:
+            for self.state["partial_text"] in self.texts:
+                try:
+                    async for message in self.__stream(transport):
+                        yield message
+                except aiohttp.ClientResponseError as e:
+                    if e.status != 403:
+                        raise
+
+                    DRM.handle_client_response_error(e)
+                    async for message in self.__stream(transport):
+                        yield message
+        finally:
+            if transport is not self.transport:
+                await transport.close()
+
+    async def stream_to(self, sink: AudioSink) -> List[TTSChunk]:
+        """
+        Streams the audio into `sink` and returns the boundary metadata.
+
+        The sink is not closed, so the audio of several consecutive
+        Communicate objects can be written into one output in one pass.
 
-                DRM.handle_client_response_error(e)
-                async for message in self.__stream():
-                    yield message
+        Returns:
+            List[TTSChunk]: The WordBoundary/SentenceBoundary messages.
+        """
+        metadata: List[TTSChunk] = []
+        async for message in self.stream():
+            if message["type"] == "audio":
+                sink.write(message["data"])
+            else:
+                metadata.append(message)
+        return metadata
 
     async def save(
         self,
@@ -580,13 +736,23 @@ class Communicate:
     ) -> None:
         """
         Save the audio and metadata to the specified files.
+
+        With a raw PCM output format, a file name ending in ".wav" gets a WAV
+        header; otherwise the audio is written exactly as received.
         """
         metadata: Union[TextIOWrapper, ContextManager[None]] = (
             open(metadata_fname, "w", encoding="utf-8")
             if metadata_fname is not None
             else nullcontext()
         )
-        with metadata, open(audio_fname, "wb") as audio:
+        pcm_sample_rate = self.tts_config.pcm_sample_rate
+        if pcm_sample_rate is not None and os.fsdecode(audio_fname).lower().endswith(
+            ".wav"
+        ):
+            audio_file: ContextManager = _PCMWaveWriter(audio_fname, pcm_sample_rate)
+        else:
+            audio_file = open(audio_fname, "wb")
+        with metadata, audio_file as audio:
             async for message in self.stream():
                 if message["type"] == "audio":
                     audio.write(message["data"])
@@ -5,9 +5,26 @@ TRUSTED_CLIENT_TOKEN = "6A5AA1D4EAFF4E9FB37E23D68491D6F4"
 
 WSS_URL = f"wss://{BASE_URL}/edge/v1?TrustedClientToken={TRUSTED_CLIENT_TOKEN}"
 VOICE_LIST = f"https://{BASE_URL}/voices/list?trustedclienttoken={TRUSTED_CLIENT_TOKEN}"
+VOICE_CACHE_TTL = 24 * 60 * 60  # seconds before the cached voice list is revalidated
 
 DEFAULT_VOICE = "en-US-EmmaMultilingualNeural"
 
+DEFAULT_OUTPUT_FORMAT = "audio-24khz-48kbitrate-mono-mp3"
+# Supported output formats, mapped to the Content-Type prefix of their audio frames.
+OUTPUT_FORMATS = {
+    "audio-24khz-48kbitrate-mono-mp3": "audio/mpeg",
+    "audio-24khz-96kbitrate-mono-mp3": "audio/mpeg",
+    "audio-48khz-96kbitrate-mono-mp3": "audio/mpeg",
+    "raw-16khz-16bit-mono-pcm": "audio/",
+    "raw-24khz-16bit-mono-pcm": "audio/",
+    "webm-24khz-16bit-mono-opus": "audio/webm",
+}
+# Headerless 16-bit mono PCM formats and their sample rates.
+PCM_SAMPLE_RATES = {
+    "raw-16khz-16bit-mono-pcm": 16000,
+    "raw-24khz-16bit-mono-pcm": 24000,
+}
+
 CHROMIUM_FULL_VERSION = "143.0.3650.75"
 CHROMIUM_MAJOR_VERSION = CHROMIUM_FULL_VERSION.split(".", maxsplit=1)[0]
 SEC_MS_GEC_VERSION = f"1-{CHROMIUM_FULL_VERSION}"
@@ -5,9 +5,12 @@
 import argparse
 import re
 from dataclasses import dataclass
+from typing import Optional
 
 from typing_extensions import Literal
 
+from .constants import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS, PCM_SAMPLE_RATES
+
 
 @dataclass
 class TTSConfig:
@@ -20,6 +23,12 @@ class TTSConfig:
     volume: str
     pitch: str
     boundary: Literal["WordBoundary", "SentenceBoundary"]
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+
+    @property
+    def pcm_sample_rate(self) -> Optional[int]:
+        """Sample rate of a raw PCM output format, or None for encoded formats."""
+        return PCM_SAMPLE_RATES.get(self.output_format)
 
     @staticmethod
     def validate_string_param(param_name: str, param_value: str, pattern: str) -> str:
@@ -75,6 +84,12 @@ class TTSConfig:
         self.validate_string_param("volume", self.volume, r"^[+-]\d+%$")
         self.validate_string_param("pitch", self.pitch, r"^[+-]\d+Hz$")
 
+        # Validate the output format.
+        if not isinstance(self.output_format, str):
+            raise TypeError("output_format must be str")
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output_format '{self.output_format}'.")
+
 
 class UtilArgs(argparse.Namespace):
     """CLI arguments."""
@@ -88,4 +103,5 @@ class UtilArgs(argparse.Namespace):
     pitch: str
     write_media: str
     write_subtitles: str
+    output_format: str
     proxy: str
@@ -0,0 +1,219 @@
+"""Audio sinks for Communicate.stream_to(). A sink receives the audio frames of
+one or more consecutive Communicate streams, so several chunks can be written
+into a single output in one pass instead of being saved and merged later."""
+
+import queue
+import subprocess
+import threading
+from typing import IO, List, Optional, Union
+
+from .constants import DEFAULT_OUTPUT_FORMAT, PCM_SAMPLE_RATES
+
+
+class AudioSink:
+    """
+    Base class for audio sinks.
+
+    Subclasses implement `write` and `close`; `abort` discards the output
+    when the pipeline fails half-way.
+    """
+
+    def write(self, data: bytes) -> None:
+        """Appends audio data."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finalizes the output."""
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        """Stops writing without finalizing the output."""
+        self.close()
+
+    def __enter__(self) -> "AudioSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class MemorySink(AudioSink):
+    """Collects audio frames in memory, e.g. to retry a chunk before committing it."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+
+    def close(self) -> None:
+        pass
+
+    def getvalue(self) -> bytes:
+        """Returns the collected audio."""
+        return bytes(self._buffer)
+
+
+class FileSink(AudioSink):
+    """
+    Writes audio frames straight to a file.
+
+    Consecutive MP3 streams from the service are plain MPEG frames without
+    ID3 tags, so appending them yields a playable MP3 without re-encoding.
+    """
+
+    def __init__(self, fname: Union[str, bytes]):
+        self.fname = fname
+        self._file: Optional[IO[bytes]] = open(fname, "wb")
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> None:
+        if self._file is None:
+            raise ValueError("write to closed sink")
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class FFmpegSink(AudioSink):
+    """
+    Pipes audio frames into one long-lived ffmpeg process through stdin.
+
+    The default arguments copy MP3 frames into a properly muxed file (with a
+    Xing header for seeking), matching the output of an ffmpeg concat merge.
+    Raw PCM formats are described to ffmpeg with -f s16le. WebM/Opus streams
+    cannot be concatenated this way, since every turn starts a new container.
+
+    Writes are handed to a writer thread through a queue of at most
+    `max_pending` items, so `write` only blocks (e.g. the event loop of
+    Communicate.stream_to) when ffmpeg falls that far behind.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        output_file: str,
+        ffmpeg_path: str = "ffmpeg",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        output_args: Optional[List[str]] = None,
+        timeout: float = 300,
+        max_pending: int = 16,
+    ):
+        if output_format.startswith("webm-"):
+            raise ValueError("WebM streams cannot be concatenated through a pipe")
+
+        sample_rate = PCM_SAMPLE_RATES.get(output_format)
+        if sample_rate is not None:
+            input_args = ["-f", "s16le", "-ar", str(sample_rate), "-ac", "1"]
+            default_output_args: List[str] = []
+        else:
+            input_args = ["-f", "mp3"]
+            default_output_args = ["-c", "copy"]
+
+        self.output_file = output_file
+        self.timeout = timeout
+        self.bytes_written = 0
+        self.cmd = [
+            ffmpeg_path,
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            *input_args,
+            "-i",
+            "pipe:0",
+            *(default_output_args if output_args is None else output_args),
+            output_file,
+        ]
+        # stderr is small at -loglevel error and only read after stdin closes.
+        self._process: Optional[subprocess.Popen] = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(max(1, max_pending))
+        self._write_error: Optional[Exception] = None
+        self._writer = threading.Thread(
+            target=self._drain, args=(self._process.stdin,), daemon=True
+        )
+        self._writer.start()
+
+    def _drain(self, stdin: IO[bytes]) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._write_error is not None:
+                continue  # keep draining so write() and close() never block
+            try:
+                stdin.write(data)
+            except (OSError, ValueError) as e:
+                self._write_error = e
+
+    def _stop_writer(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+    def write(self, data: bytes) -> None:
+        if self._process is None:
+            raise ValueError("write to closed sink")
+        if self._write_error is not None:
+            raise RuntimeError(
+                f"ffmpeg exited early: {self._stderr()}"
+            ) from self._write_error
+        self._queue.put(data)
+        self.bytes_written += len(data)
+
+    def _stderr(self) -> str:
+        if self._process is None or self._process.stderr is None:
+            return ""
+        try:
+            self._process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        return self._process.stderr.read().decode("utf-8", "replace").strip()
+
+    def close(self) -> None:
+        """
+        Closes stdin and waits for ffmpeg to finish the file.
+
+        Raises:
+            RuntimeError: If ffmpeg fails or times out.
+        """
+        if self._process is None:
+            return
+        self._stop_writer()
+        process, self._process = self._process, None
+        try:
+            # communicate() flushes and closes stdin, then drains stderr.
+            _, stderr = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired as e:
+            process.kill()
+            process.communicate()
+            raise RuntimeError("ffmpeg timed out") from e
+        if self._write_error is not None:
+            raise RuntimeError(
+                f"ffmpeg exited early: {stderr.decode('utf-8', 'replace').strip()}"
+            ) from self._write_error
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed ({process.returncode}): "
+                f"{stderr.decode('utf-8', 'replace').strip()}"
+            )
+
+    def abort(self) -> None:
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        process.kill()  # unblocks the writer thread if the pipe is full
+        self._stop_writer()
+        process.communicate()
@@ -168,6 +168,26 @@ def timedelta_to_srt_timestamp(timedelta_timestamp: timedelta) -> str:
     return f"{int(hrs):02}:{int(mins):02}:{int(secs):02},{int(msecs):03}"
 
 
+def _microseconds_to_srt_timestamp(microseconds: int) -> str:
+    secs, usecs = divmod(microseconds, 1_000_000)
+    hrs, secs_remainder = divmod(secs, SECONDS_IN_HOUR)
+    mins, secs = divmod(secs_remainder, SECONDS_IN_MINUTE)
+    msecs = usecs // MICROSECONDS_IN_MILLISECOND
+    return f"{hrs:02}:{mins:02}:{secs:02},{msecs:03}"
+
+
+def ticks_to_microseconds(ticks: Union[int, float]) -> int:
+    """
+    Convert a 100 ns tick offset to whole microseconds, rounding exactly like
+    ``timedelta(microseconds=ticks / 10)`` (round half to even).
+
+    :param ticks: The offset in 100 ns units
+    :returns: The offset in microseconds
+    :rtype: int
+    """
+    return round(ticks / 10)
+
+
 def sort_and_reindex(
     subtitles: Union[Generator[Subtitle, None, None], List[Subtitle]],
     start_index: int = 1,
@@ -288,6 +308,72 @@ def compose(
     return "".join(subtitle.to_srt(eol=eol) for subtitle in subtitles)
 
 
+def compose_columns(
+    starts: List[int],
+    ends: List[int],
+    contents: List[str],
+    start_index: int = 1,
+    eol: Union[str, None] = None,
+) -> str:
+    r"""
+    Compose SRT directly from parallel columns of start/end times (in whole
+    microseconds) and contents, without building :py:class:`Subtitle` objects.
+
+    The output is identical to :py:func:`compose` with ``reindex=True`` over
+    subtitles whose original indexes follow the column order: cues are
+    sorted by (start, end, position), useless cues are skipped, and the
+    remaining ones are numbered from ``start_index``.
+
+    .. doctest::
+
+        >>> starts, ends = [1000000, 0], [2000000, 1000000]
+        >>> compose_columns(starts, ends, ['b', 'a'])  # doctest: +ELLIPSIS
+        '1\n00:00:00,000 --> 00:00:01,000\na\n\n2\n00:00:01,000 --> ...'
+
+    :param starts: Start times in microseconds
+    :param ends: End times in microseconds
+    :param contents: Subtitle contents
+    :param int start_index: The index to start numbering from
+    :param str eol: The end of line string to use (default "\n")
+    :returns: A single SRT formatted string
+    :rtype: str
+    """
+    if not len(starts) == len(ends) == len(contents):
+        raise ValueError("starts, ends and contents must have the same length")
+
+    if eol is None:
+        eol = "\n"
+
+    count = len(starts)
+    order: Union[range, List[int]] = range(count)
+    # Word boundaries arrive in order, so sorting is usually unnecessary.
+    for i in range(1, count):
+        if (starts[i], ends[i]) < (starts[i - 1], ends[i - 1]):
+            order = sorted(order, key=lambda j: (starts[j], ends[j]))
+            break
+
+    blocks = []
+    index = start_index
+    for i in order:
+        start, end, content = starts[i], ends[i], contents[i]
+        if not content.strip() or start < 0 or start >= end:
+            continue
+
+        content = make_legal_content(content)
+        if eol != "\n":
+            content = content.replace("\n", eol)
+
+        blocks.append(
+            f"{index or 0}{eol}"
+            f"{_microseconds_to_srt_timestamp(start)} --> "
+            f"{_microseconds_to_srt_timestamp(end)}{eol}"
+            f"{content}{eol}{eol}"
+        )
+        index += 1
+
+    return "".join(blocks)
+
+
 class _ShouldSkipException(Exception):
     """
     Raised when a subtitle should be skipped.
@@ -3,19 +3,47 @@
 from datetime import timedelta
 from typing import List, Optional
 
-from .srt_composer import Subtitle, compose
+from .srt_composer import Subtitle, compose_columns, ticks_to_microseconds
 from .typing import TTSChunk
 
 
 class SubMaker:
     """
     SubMaker is used to generate subtitles from WordBoundary and SentenceBoundary messages.
+
+    Cues are stored as parallel columns of 100 ns offsets and texts, so long
+    narrations do not allocate a Subtitle and two timedeltas per word.
     """
 
     def __init__(self) -> None:
-        self.cues: List[Subtitle] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.texts: List[str] = []
         self.type: Optional[str] = None
 
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def cues(self) -> List[Subtitle]:
+        """
+        The fed messages as Subtitle objects, built on demand.
+
+        Returns:
+            List[Subtitle]: One subtitle per message, in feed order.
+        """
+        return [
+            Subtitle(
+                index=index,
+                start=timedelta(microseconds=start / 10),
+                end=timedelta(microseconds=end / 10),
+                content=text,
+            )
+            for index, (start, end, text) in enumerate(
+                zip(self.starts, self.ends, self.texts), start=1
+            )
+        ]
+
     def feed(self, msg: TTSChunk) -> None:
         """
         Feed a WordBoundary or SentenceBoundary message to the SubMaker object.
@@ -38,14 +66,9 @@ class SubMaker:
                 f"Expected message type '{self.type}', but got '{msg['type']}'."
             )
 
-        self.cues.append(
-            Subtitle(
-                index=len(self.cues) + 1,
-                start=timedelta(microseconds=msg["offset"] / 10),
-                end=timedelta(microseconds=(msg["offset"] + msg["duration"]) / 10),
-                content=msg["text"],
-            )
-        )
+        self.starts.append(msg["offset"])
+        self.ends.append(msg["offset"] + msg["duration"])
+        self.texts.append(msg["text"])
 
     def get_srt(self) -> str:
         """
@@ -54,7 +77,11 @@ class SubMaker:
         Returns:
             str: The SRT formatted subtitles.
         """
-        return compose(self.cues)
+        return compose_columns(
+            [ticks_to_microseconds(start) for start in self.starts],
+            [ticks_to_microseconds(end) for end in self.ends],
+            self.texts,
+        )
 
     def __str__(self) -> str:
         return self.get_srt()
@@ -0,0 +1,191 @@
+"""Shared connection pool for the service. A Transport owns one ClientSession
+and SSL context and keeps idle websockets open so that consecutive SSML turns
+(and consecutive Communicate instances) skip the TCP and TLS handshakes."""
+
+import ssl
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, List, Optional
+
+import aiohttp
+import certifi
+
+from .constants import SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+from .drm import DRM
+
+
+class PooledWebSocket:
+    """
+    A websocket checked out from a Transport.
+
+    Attributes:
+        websocket: The underlying aiohttp websocket.
+        speech_config: The last speech.config message sent on this socket,
+            so it is only resent when the settings change.
+        turns: Number of completed turns on this socket.
+        reusable: Set by the caller once a turn finished cleanly; sockets
+            released without it are closed instead of pooled.
+    """
+
+    def __init__(self, websocket: aiohttp.ClientWebSocketResponse):
+        self.websocket = websocket
+        self.speech_config: Optional[str] = None
+        self.turns = 0
+        self.reusable = False
+        self.released_at = 0.0
+
+    @property
+    def reused(self) -> bool:
+        """Whether this socket already served a previous turn."""
+        return self.turns > 0
+
+
+class Transport:
+    """
+    Pooled HTTP/websocket transport that can be shared by several
+    Communicate instances running on the same event loop.
+
+    Example:
+        async with Transport() as transport:
+            for text in texts:
+                await Communicate(text, voice, transport=transport).save(...)
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        proxy: Optional[str] = None,
+        connect_timeout: Optional[int] = 10,
+        receive_timeout: Optional[int] = 60,
+        max_idle: int = 4,
+        idle_timeout: float = 30.0,
+    ):
+        # Validate the proxy parameter.
+        if proxy is not None and not isinstance(proxy, str):
+            raise TypeError("proxy must be str")
+        self.proxy: Optional[str] = proxy
+
+        # Validate the timeout parameters.
+        if not isinstance(connect_timeout, int):
+            raise TypeError("connect_timeout must be int")
+        if not isinstance(receive_timeout, int):
+            raise TypeError("receive_timeout must be int")
+        self.session_timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=None,
+            sock_connect=connect_timeout,
+            sock_read=receive_timeout,
+        )
+
+        # Validate the connector parameter.
+        if connector is not None and not isinstance(connector, aiohttp.BaseConnector):
+            raise TypeError("connector must be aiohttp.BaseConnector")
+        self.connector: Optional[aiohttp.BaseConnector] = connector
+
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+
+        self._ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._idle: List[PooledWebSocket] = []
+
+        # Counters, mostly useful to check that connections are reused.
+        self.connections_opened = 0
+        self.turns_served = 0
+
+    async def __aenter__(self) -> "Transport":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=self.connector,
+                trust_env=True,
+                timeout=self.session_timeout,
+            )
+        return self._session
+
+    async def _open(self) -> PooledWebSocket:
+        websocket = await self._get_session().ws_connect(
+            f"{WSS_URL}&ConnectionId={uuid.uuid4().hex}"
+            f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
+            f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
+            compress=15,
+            proxy=self.proxy,
+            headers=DRM.headers_with_muid(WSS_HEADERS),
+            ssl=self._ssl_ctx,
+        )
+        self.connections_opened += 1
+        return PooledWebSocket(websocket)
+
+    async def _take_idle(self) -> Optional[PooledWebSocket]:
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if conn.websocket.closed or now - conn.released_at > self.idle_timeout:
+                await conn.websocket.close()
+                continue
+            return conn
+        return None
+
+    async def acquire(self, fresh: bool = False) -> PooledWebSocket:
+        """
+        Check out an open websocket, reusing an idle one when possible.
+
+        Args:
+            fresh (bool): Skip the pool and always open a new connection.
+
+        Returns:
+            PooledWebSocket: The connection; pass it back to `release`.
+        """
+        conn = None if fresh else await self._take_idle()
+        if conn is None:
+            conn = await self._open()
+        conn.reusable = False
+        return conn
+
+    async def release(self, conn: PooledWebSocket) -> None:
+        """
+        Return a websocket to the pool, or close it if the turn did not
+        finish cleanly or the pool is full.
+        """
+        if conn.reusable:
+            conn.turns += 1
+            self.turns_served += 1
+        if (
+            conn.reusable
+            and not conn.websocket.closed
+            and self._session is not None
+            and not self._session.closed
+            and len(self._idle) < self.max_idle
+        ):
+            conn.released_at = time.monotonic()
+            self._idle.append(conn)
+        else:
+            await conn.websocket.close()
+
+    @asynccontextmanager
+    async def connection(
+        self, fresh: bool = False
+    ) -> AsyncGenerator[PooledWebSocket, None]:
+        """Context manager around `acquire`/`release`."""
+        conn = await self.acquire(fresh)
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    async def close(self) -> None:
+        """Close all idle websockets and the underlying session."""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.websocket.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -8,7 +8,7 @@ from typing import Optional, TextIO
 from tabulate import tabulate
 
 from . import Communicate, SubMaker, list_voices
-from .constants import DEFAULT_VOICE
+from .constants import DEFAULT_OUTPUT_FORMAT, DEFAULT_VOICE, OUTPUT_FORMATS
 from .data_classes import UtilArgs
 from .version import __version__
 
@@ -53,6 +53,7 @@ async def _run_tts(args: UtilArgs) -> None:
         rate=args.rate,
         volume=args.volume,
         pitch=args.pitch,
+        output_format=args.output_format,
         proxy=args.proxy,
     )
     submaker = SubMaker()
@@ -108,6 +109,12 @@ async def amain() -> None:
     parser.add_argument("--rate", help="set TTS rate. Default +0%%.", default="+0%")
     parser.add_argument("--volume", help="set TTS volume. Default +0%%.", default="+0%")
     parser.add_argument("--pitch", help="set TTS pitch. Default +0Hz.", default="+0Hz")
+    parser.add_argument(
+        "--output-format",
+        help=f"audio format of the media output. Default: {DEFAULT_OUTPUT_FORMAT}",
+        choices=list(OUTPUT_FORMATS),
+        default=DEFAULT_OUTPUT_FORMAT,
+    )
     parser.add_argument(
         "--write-media", help="send media output to file instead of stdout"
     )
@@ -1,22 +1,140 @@
 """This module contains functions to list all available voices and a class to find the
 correct voice based on their attributes."""
 
+import asyncio
 import json
+import os
 import ssl
-from typing import Any, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import aiohttp
 import certifi
 from typing_extensions import Unpack
 
-from .constants import SEC_MS_GEC_VERSION, VOICE_HEADERS, VOICE_LIST
+from .constants import SEC_MS_GEC_VERSION, VOICE_CACHE_TTL, VOICE_HEADERS, VOICE_LIST
 from .drm import DRM
 from .typing import Voice, VoicesManagerFind, VoicesManagerVoice
 
+DEFAULT_VOICE_CACHE_PATH = os.getenv(
+    "EDGE_TTS_VOICE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "edge_tts", "voices.json"),
+)
+
+
+def normalize_voices(data: List[Any]) -> List[Voice]:
+    """
+    Fills in the VoiceTag fields that the service omits for some voices.
+
+    Args:
+        data (List[Any]): The parsed voice list.
+
+    Returns:
+        List[Voice]: The same list, with VoiceTag always present.
+    """
+    for voice in data:
+        if "VoiceTag" not in voice:
+            voice["VoiceTag"] = {}
+
+        if "ContentCategories" not in voice["VoiceTag"]:
+            voice["VoiceTag"]["ContentCategories"] = []
+
+        if "VoicePersonalities" not in voice["VoiceTag"]:
+            voice["VoiceTag"]["VoicePersonalities"] = []
+
+    return data
+
+
+class VoiceCatalogCache:
+    """
+    On-disk cache of the voice list.
+
+    The list is served from disk while it is younger than `ttl`. After that it
+    is revalidated with the stored ETag / Last-Modified validators, so an
+    unchanged list costs a 304 instead of a full download. A stale copy is
+    still used when the service cannot be reached.
+    """
+
+    def __init__(self, path: str = DEFAULT_VOICE_CACHE_PATH, ttl: float = VOICE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Reads the cache entry.
+
+        Returns:
+            Optional[Dict[str, Any]]: The entry with "voices", "fetched_at", "etag"
+            and "last_modified" keys, or None if missing or unreadable.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("voices"), list):
+            return None
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Whether the entry is younger than the TTL."""
+        return time.time() - float(entry.get("fetched_at", 0)) < self.ttl
+
+    @staticmethod
+    def validators(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Conditional request headers for revalidating the entry.
+
+        Returns:
+            Dict[str, str]: If-None-Match / If-Modified-Since headers (may be empty).
+        """
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def save(
+        self,
+        voices: List[Voice],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Writes a freshly downloaded voice list."""
+        self._write(
+            {
+                "fetched_at": time.time(),
+                "etag": etag,
+                "last_modified": last_modified,
+                "voices": voices,
+            }
+        )
+
+    def touch(self, entry: Dict[str, Any]) -> None:
+        """Marks a revalidated (304) entry as fresh again."""
+        self._write({**entry, "fetched_at": time.time()})
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The cache is an optimisation only.
+            pass
+
 
 async def __list_voices(
-    session: aiohttp.ClientSession, ssl_ctx: ssl.SSLContext, proxy: Optional[str]
-) -> List[Voice]:
+    session: aiohttp.ClientSession,
+    ssl_ctx: ssl.SSLContext,
+    proxy: Optional[str],
+    validators: Optional[Dict[str, str]] = None,
+) -> Tuple[Optional[List[Voice]], Optional[str], Optional[str]]:
     """
     Private function that makes the request to the voice list URL and parses the
     JSON response. This function is used by list_voices() and makes it easier to
@@ -26,35 +144,40 @@ async def __list_voices(
         session (aiohttp.ClientSession): The aiohttp session to use for the request.
         ssl_ctx (ssl.SSLContext): The SSL context to use for the request.
         proxy (Optional[str]): The proxy to use for the request.
+        validators (Optional[Dict[str, str]]): Conditional request headers.
 
     Returns:
-        List[Voice]: A list of voices and their attributes.
+        tuple: The voices (None if the server answered 304 Not Modified),
+            and the response ETag and Last-Modified headers.
     """
+    headers = DRM.headers_with_muid(VOICE_HEADERS)
+    if validators:
+        headers.update(validators)
+
     async with session.get(
         f"{VOICE_LIST}&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
         f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
-        headers=DRM.headers_with_muid(VOICE_HEADERS),
+        headers=headers,
         proxy=proxy,
         ssl=ssl_ctx,
         raise_for_status=True,
     ) as url:
+        etag = url.headers.get("ETag")
+        last_modified = url.headers.get("Last-Modified")
+        if url.status == 304:
+            return None, etag, last_modified
         data: List[Any] = json.loads(await url.text())
 
-    for voice in data:
-        if "VoiceTag" not in voice:
-            voice["VoiceTag"] = {}
-
-        if "ContentCategories" not in voice["VoiceTag"]:
-            voice["VoiceTag"]["ContentCategories"] = []
-
-        if "VoicePersonalities" not in voice["VoiceTag"]:
-            voice["VoiceTag"]["VoicePersonalities"] = []
-
-    return data
+    return normalize_voices(data), etag, last_modified
 
 
 async def list_voices(
-    *, connector: Optional[aiohttp.BaseConnector] = None, proxy: Optional[str] = None
+    *,
+    connector: Optional[aiohttp.BaseConnector] = None,
+    proxy: Optional[str] = None,
+    cache: Optional[VoiceCatalogCache] = None,
+    force_refresh: bool = False,
+    timeout: Optional[float] = None,
 ) -> List[Voice]:
     """
     List all available voices and their attributes.
@@ -65,20 +188,56 @@ async def list_voices(
     Args:
         connector (Optional[aiohttp.BaseConnector]): The connector to use for the request.
         proxy (Optional[str]): The proxy to use for the request.
+        cache (Optional[VoiceCatalogCache]): On-disk cache to serve from and update.
+        force_refresh (bool): Revalidate with the service even if the cache is fresh.
+        timeout (Optional[float]): Total timeout of the request in seconds.
 
     Returns:
         List[Voice]: A list of voices and their attributes.
     """
+    entry = cache.load() if cache is not None else None
+    if entry is not None and not force_refresh and cache.is_fresh(entry):
+        return entry["voices"]
+
+    validators = VoiceCatalogCache.validators(entry)
     ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-    async with aiohttp.ClientSession(connector=connector, trust_env=True) as session:
-        try:
-            data = await __list_voices(session, ssl_ctx, proxy)
-        except aiohttp.ClientResponseError as e:
-            if e.status != 403:
-                raise
+    session_timeout = (
+        aiohttp.ClientTimeout(total=timeout)
+        if timeout is not None
+        else aiohttp.client.DEFAULT_TIMEOUT
+    )
+    try:
+        async with aiohttp.ClientSession(
+            connector=connector,
+            trust_env=True,
+            timeout=session_timeout,
+        ) as session:
+            try:
+                data, etag, last_modified = await __list_voices(
+                    session, ssl_ctx, proxy, validators
+                )
+            except aiohttp.ClientResponseError as e:
+                if e.status != 403:
+                    raise
+
+                DRM.handle_client_response_error(e)
+                data, etag, last_modified = await __list_voices(
+                    session, ssl_ctx, proxy, validators
+                )
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # Offline or timed out: a stale list is better than none.
+        if entry is not None:
+            return entry["voices"]
+        raise
 
-            DRM.handle_client_response_error(e)
-            data = await __list_voices(session, ssl_ctx, proxy)
+    if cache is not None:
+        if data is None and entry is not None:
+            cache.touch(entry)
+            return entry["voices"]
+        if data is not None:
+            cache.save(data, etag, last_modified)
+    if data is None:
+        raise aiohttp.ClientError("Voice list not modified but no cached copy exists")
     return data
 
 
@@ -87,25 +246,50 @@ class VoicesManager:
     A class to find the correct voice based on their attributes.
     """
 
+    # Attributes with a prebuilt index; find() on these is a set intersection.
+    INDEXED_ATTRIBUTES = ("Locale", "Gender", "ShortName", "Language")
+
     def __init__(self) -> None:
         self.voices: List[VoicesManagerVoice] = []
         self.called_create: bool = False
+        self._index: Dict[str, Dict[str, Set[int]]] = {}
 
     @classmethod
     async def create(
-        cls, custom_voices: Optional[List[Voice]] = None
+        cls,
+        custom_voices: Optional[List[Voice]] = None,
+        *,
+        cache: Optional[VoiceCatalogCache] = None,
     ) -> "VoicesManager":
         """
         Creates a VoicesManager object and populates it with all available voices.
         """
-        self = VoicesManager()
-        voices = await list_voices() if custom_voices is None else custom_voices
+        voices = (
+            await list_voices(cache=cache) if custom_voices is None else custom_voices
+        )
+        return cls.from_voices(voices)
+
+    @classmethod
+    def from_voices(cls, voices: List[Voice]) -> "VoicesManager":
+        """
+        Creates a VoicesManager object from an already loaded voice list.
+        """
+        self = cls()
         self.voices = [
             {**voice, "Language": voice["Locale"].split("-")[0]} for voice in voices
         ]
+        self._build_index()
         self.called_create = True
         return self
 
+    def _build_index(self) -> None:
+        self._index = {attribute: {} for attribute in self.INDEXED_ATTRIBUTES}
+        for position, voice in enumerate(self.voices):
+            for attribute, index in self._index.items():
+                value = voice.get(attribute)
+                if isinstance(value, str):
+                    index.setdefault(value, set()).add(position)
+
     def find(self, **kwargs: Unpack[VoicesManagerFind]) -> List[VoicesManagerVoice]:
         """
         Finds all matching voices based on the provided attributes.
@@ -115,7 +299,23 @@ class VoicesManager:
                 "VoicesManager.find() called before VoicesManager.create()"
             )
 
-        matching_voices = [
-            voice for voice in self.voices if kwargs.items() <= voice.items()
-        ]
-        return matching_voices
+        positions: Optional[Set[int]] = None
+        unindexed: Dict[str, Any] = {}
+        for attribute, value in kwargs.items():
+            index = self._index.get(attribute)
+            if index is None or not isinstance(value, str):
+                unindexed[attribute] = value
+                continue
+            matches = index.get(value, set())
+            positions = matches if positions is None else positions & matches
+            if not positions:
+                return []
+
+        candidates = (
+            self.voices
+            if positions is None
+            else [self.voices[position] for position in sorted(positions)]
+        )
+        if not unindexed:
+            return list(candidates)
+        return [voice for voice in candidates if unindexed.items() <= voice.items()]
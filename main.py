@@ -2,6 +2,8 @@ import json
 import os
 import re
 import wave
+import hashlib
+import unicodedata
 import asyncio
 import threading
 import tkinter as tk  
@@ -9,7 +11,8 @@ from tkinter import filedialog, messagebox
 import customtkinter as ctk 
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from queue import Queue, Empty
 import time
 import subprocess
@@ -55,6 +58,8 @@ _APP_DIR = _setup_paths()
 
 # Import authentication module
 from auth_module import AuthManager, require_login
+from capcutvoice.mp3merge import merge_mp3_files
+from capcutvoice.tts import CapcutClient
 
 # Cấu hình giao diện CustomTkinter
 ctk.set_appearance_mode("Dark")  # Modes: "System" (standard), "Dark", "Light"
@@ -66,6 +71,11 @@ try:
 except ImportError:
     HAS_PYAUDIO = False
 
+try:
+    import numpy as np  # chỉ cần khi ghi audio dạng float (VieNeu)
+except ImportError:
+    np = None
+
 from google import genai
 from google.genai import types
 
@@ -381,6 +391,7 @@ VIENEU_GGUF_ALLOWED_VOICES = [
 VIENEU_MAX_CHARS_PER_CHUNK = 256
 VIENEU_DEFAULT_DEVICE = "Auto"  # Auto, CPU, CUDA
 VIENEU_SAMPLE_RATE = 24000
+VIENEU_SORT_WINDOW_BATCHES = 4  # Chỉ sắp xếp theo độ dài trong cửa sổ vài batch để giới hạn audio chờ ghi
 
 # Enhanced Retry settings
 MAX_RETRIES = 5  # Tăng số lần retry
@@ -388,7 +399,16 @@ RECOVERY_EXTRA_RETRIES = 1  # Extra retries for recovery mode (missing chunk ret
 BASE_RETRY_DELAY = 2  # Delay cơ bản (giây)
 MAX_RETRY_DELAY = 30  # Delay tối đa (giây)
 RETRY_JITTER = 0.5  # Random jitter để tránh thundering herd
-CAPCUT_RATE_LIMIT_DELAY = 0.5  # Delay giữa các requests để tránh rate limiting
+CAPCUT_RATE_INITIAL = 2.0  # Tốc độ ban đầu (requests/giây) của bộ giới hạn AIMD
+CAPCUT_RATE_MIN = 0.2  # Tốc độ tối thiểu khi bị throttle liên tục
+CAPCUT_RATE_MAX = 8.0  # Tốc độ tối đa khi service ổn định
+CAPCUT_MAX_CONCURRENCY = 4  # Số request đồng thời tối đa
+CAPCUT_POOL_SIZE = max(1, int(os.getenv("CAPCUT_POOL_SIZE", CAPCUT_MAX_CONCURRENCY)))  # Số kết nối keep-alive dùng chung cho các worker Capcut (biến môi trường CAPCUT_POOL_SIZE)
+GEMINI_KEY_RPM = 60  # Số request/phút tối đa cho mỗi Gemini API key (token bucket)
+GEMINI_KEY_BURST = 10  # Số request có thể gửi dồn khi bucket của key đầy
+GEMINI_KEY_THROTTLE_COOLDOWN = 5  # Số giây key bị loại sau lỗi 429 (nhân đôi nếu lặp lại)
+GEMINI_KEY_MAX_COOLDOWN = 120  # Thời gian loại key tối đa (giây)
+GEMINI_KEY_ERROR_COOLDOWN = 30  # Số giây key bị loại sau nhiều lỗi liên tiếp
 
 # Text chunking settings
 CAPCUT_MAX_CHUNK_SIZE = 450  # Capcut max chars per API call (500 limit with safety margin)
@@ -407,6 +427,12 @@ SENTENCE_BREAK_PUNCTUATION = ['.', '!', '?', ',', '-', ';', ':', '。', '！', '
 # Note: Dash '-' is NOT removed to preserve compound words and hyphenated terms
 PUNCTUATION_TO_REMOVE = ['.', '!', '?', ',', ';', ':', '。', '！', '？', '，', '；', '：']
 FFMPEG_TIMEOUT_SECONDS = 300  # FFmpeg merge timeout
+LIVE_CONNECT_TIMEOUT = 10.0  # Thời gian tối đa chờ Persistent Session kết nối (giây)
+LIVE_RESPONSE_TIMEOUT = 120.0  # Thời gian tối đa chờ audio của một request (giây)
+
+# Synthesis cache - audio đã tạo được dùng lại giữa các lần chạy và các engine
+SYNTH_CACHE_DIR = os.path.join(_APP_DIR, "_synth_cache")
+SYNTH_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB, xoá bớt entry cũ nhất (LRU) khi vượt
 
 # Connection error patterns - lỗi cần retry nhiều hơn
 CONNECTION_ERROR_PATTERNS = [
@@ -426,6 +452,16 @@ CONNECTION_ERROR_PATTERNS = [
     "429",
 ]
 
+# Lỗi do key bị giới hạn (quota/rate limit) - key bị loại tạm thời thay vì retry trên chính nó
+RATE_LIMIT_ERROR_PATTERNS = [
+    "429",
+    "rate limit",
+    "quota",
+    "resource_exhausted",
+    "resource exhausted",
+    "too many requests",
+]
+
 # Audio file validation
 MIN_AUDIO_FILE_SIZE = 100  # Minimum bytes for a valid audio file
 
@@ -503,6 +539,17 @@ class TTSConfig:
     live_session_enabled: bool = False
     # Keep voice beta mode - wrap text in {content} for Gemini to maintain consistent voice
     keep_voice_beta: bool = False
+    
+    def cache_params(self) -> Dict[str, Any]:
+        """Settings that change the generated audio (speed is applied after generation)"""
+        return {
+            "system_instruction": self.system_instruction,
+            "media_resolution": self.media_resolution,
+            "thinking_budget": self.thinking_budget if self.thinking_mode else None,
+            "affective_dialog": self.affective_dialog,
+            "proactive_audio": self.proactive_audio,
+            "keep_voice_beta": self.keep_voice_beta,
+        }
 
 
 @dataclass 
@@ -627,6 +674,53 @@ def save_wave_file(filename: str, pcm_data: bytes, rate: int = RECEIVE_SAMPLE_RA
         wf.writeframes(pcm_data)
 
 
+class StreamingWavWriter:
+    """
+    Append-only mono 16-bit WAV writer.
+    
+    Audio is written to disk as it arrives and the `wave` module patches the
+    RIFF header sizes on close, so memory use stays flat no matter how long
+    the output gets.
+    """
+    
+    def __init__(self, filename: str, rate: int = RECEIVE_SAMPLE_RATE):
+        self.filename = filename
+        self.rate = rate
+        self.frames_written = 0
+        self._wf = wave.open(filename, "wb")
+        self._wf.setnchannels(AUDIO_CHANNELS)
+        self._wf.setsampwidth(AUDIO_SAMPLE_WIDTH)
+        self._wf.setframerate(rate)
+    
+    def write(self, audio):
+        """Append float samples in [-1, 1] (numpy array) or raw 16-bit PCM bytes."""
+        if isinstance(audio, (bytes, bytearray)):
+            pcm_data = bytes(audio)
+        else:
+            pcm_data = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        self._wf.writeframes(pcm_data)
+        self.frames_written += len(pcm_data) // AUDIO_SAMPLE_WIDTH
+    
+    def write_silence(self, seconds: float):
+        """Append `seconds` of silence."""
+        n_frames = int(self.rate * seconds)
+        self._wf.writeframes(bytes(n_frames * AUDIO_SAMPLE_WIDTH))
+        self.frames_written += n_frames
+    
+    @property
+    def duration(self) -> float:
+        return self.frames_written / self.rate
+    
+    def close(self):
+        self._wf.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 def split_text_into_chunks(text: str, chunk_size: int = 500) -> List[TextChunk]:
     """
     Split text into chunks of approximately chunk_size characters.
@@ -917,7 +1011,10 @@ def split_text_by_punctuation_v2(text: str, target_chunk_size: int = 300, remove
 
 def merge_mp3_files_ffmpeg(input_files: List[str], output_file: str, ffmpeg_path: str = "ffmpeg.exe") -> bool:
     """
-    Merge multiple MP3 files into one using ffmpeg.
+    Merge multiple MP3 files into one.
+    
+    MP3 → MP3 merges run in-process (frame copy + one Xing header, no ffmpeg);
+    ffmpeg is only used as a fallback for other formats or mismatched streams.
     Returns True if successful, False otherwise.
     """
     if not input_files:
@@ -926,6 +1023,13 @@ def merge_mp3_files_ffmpeg(input_files: List[str], output_file: str, ffmpeg_path
     # Sort files by index (assuming format: chunk_0001.mp3)
     input_files_sorted = sorted(input_files)
     
+    if all(f.lower().endswith('.mp3') for f in input_files_sorted + [output_file]):
+        try:
+            merge_mp3_files(input_files_sorted, output_file)
+            return True
+        except (ValueError, OSError) as e:
+            print(f"In-process MP3 merge failed, falling back to ffmpeg: {e}")
+    
     try:
         # Convert all paths to absolute paths
         input_files_abs = [os.path.abspath(f) for f in input_files_sorted]
@@ -1084,6 +1188,12 @@ def is_connection_error(error_str: str) -> bool:
     return any(pattern in error_lower for pattern in CONNECTION_ERROR_PATTERNS)
 
 
+def is_rate_limit_error(error_str: str) -> bool:
+    """Check if error means the API key is throttled (429 / quota exhausted)"""
+    error_lower = error_str.lower()
+    return any(pattern in error_lower for pattern in RATE_LIMIT_ERROR_PATTERNS)
+
+
 def cleanup_event_loop(loop: asyncio.AbstractEventLoop) -> None:
     """
     Properly cleanup an asyncio event loop to prevent CPU/memory leaks.
@@ -1116,6 +1226,205 @@ def cleanup_event_loop(loop: asyncio.AbstractEventLoop) -> None:
         asyncio.set_event_loop(None)
 
 
+# =============================================================================
+# SYNTHESIS CACHE
+# =============================================================================
+
+class SynthesisCache:
+    """
+    Content-addressed on-disk cache of synthesized audio, shared by all engines.
+    
+    Entries are keyed by a hash of (engine, voice, model, settings, normalized
+    text), so re-running a job after a partial failure or an edit to one line
+    only synthesizes what changed, and repeated phrases are paid for once.
+    Total size is capped with LRU eviction; recency lives in memory and is
+    persisted through file mtimes so it survives restarts.
+    """
+    
+    def __init__(self, root: str = SYNTH_CACHE_DIR, max_bytes: int = SYNTH_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[OrderedDict] = None  # key -> size, least recently used first
+        self._total_bytes = 0
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return unicodedata.normalize("NFC", " ".join(text.split()))
+    
+    @classmethod
+    def make_key(cls, engine: str, voice: str, text: str, model: str = "", **params) -> str:
+        payload = json.dumps(
+            [engine, voice, model, sorted(params.items()), cls.normalize_text(text)],
+            ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        """Short hash of bytes/str parts, e.g. a reference voice (codes + text)"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+    
+    def _load_index(self):
+        """Scan the cache directory once (called with the lock held)"""
+        if self._entries is not None:
+            return
+        found = []
+        if os.path.isdir(self.root):
+            for shard in os.listdir(self.root):
+                shard_dir = os.path.join(self.root, shard)
+                if not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    path = os.path.join(shard_dir, name)
+                    try:
+                        if name.endswith(".tmp"):
+                            os.remove(path)  # left over from an interrupted write
+                            continue
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, name, st.st_size))
+        found.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in found)
+        self._total_bytes = sum(size for _, _, size in found)
+    
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+    
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+    
+    def __contains__(self, key: str) -> bool:
+        """Whether key is in the index (does not read the file or touch stats)"""
+        with self._lock:
+            self._load_index()
+            return key in self._entries
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio for key, or None"""
+        with self._lock:
+            self._load_index()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return data
+    
+    def get_file(self, key: str, output_file: str) -> bool:
+        """Write cached audio to output_file. Returns False on a miss"""
+        data = self.get(key)
+        if data is None:
+            return False
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(output_file, "wb") as f:
+            f.write(data)
+        return True
+    
+    def put(self, key: str, data: bytes):
+        """Store audio for key (failures are ignored, the cache is only an optimisation)"""
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            self._load_index()
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self.stores += 1
+            self._evict()
+    
+    def put_file(self, key: str, path: str):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        self.put(key, data)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": len(self._entries) if self._entries is not None else 0,
+                "bytes": self._total_bytes,
+            }
+    
+    def describe(self) -> str:
+        s = self.stats()
+        return (f"{s['hits']} hit / {s['misses']} miss ({s['hit_rate']:.0%}), "
+                f"{s['entries']} entry, {s['bytes'] / (1024 * 1024):.1f} MB")
+
+
+_synthesis_cache = None
+_synthesis_cache_lock = threading.Lock()
+
+
+def get_synthesis_cache() -> SynthesisCache:
+    """Process-wide synthesis cache"""
+    global _synthesis_cache
+    with _synthesis_cache_lock:
+        if _synthesis_cache is None:
+            _synthesis_cache = SynthesisCache()
+        return _synthesis_cache
+
+
 # =============================================================================
 # CAPCUT VOICE TTS FUNCTIONS
 # =============================================================================
@@ -1142,121 +1451,243 @@ def capcut_prepare_text(text: str) -> str:
 
 
 
-def capcut_create_tts(text: str, voice_id: str, session_id: str, output_file: str, retries: int = 3, debug: bool = True) -> tuple:
+class AdaptiveRateLimiter:
+    """
+    AIMD rate + concurrency limiter for Capcut requests.
+    
+    Requests are spaced 1/rate seconds apart and at most `concurrency` run at
+    once. Every `success_window` consecutive successes add `increase` req/s
+    and one concurrency slot; a throttling/connection error multiplies the
+    rate by `decrease` and halves the concurrency (at most once per interval,
+    so a burst of failing in-flight requests counts as one congestion event).
+    
+    `clock` and `sleep` can be replaced by a fake clock for simulation.
+    """
+    
+    def __init__(self, rate: float = CAPCUT_RATE_INITIAL, min_rate: float = CAPCUT_RATE_MIN,
+                 max_rate: float = CAPCUT_RATE_MAX, increase: float = 0.25, decrease: float = 0.5,
+                 concurrency: int = 1, max_concurrency: int = CAPCUT_MAX_CONCURRENCY, success_window: int = 10,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.success_window = success_window
+        self.clock = clock
+        self.sleep = sleep
+        
+        self._cond = threading.Condition()
+        self._next_start = clock()
+        self._last_decrease = float('-inf')
+        self._streak = 0
+        self.in_flight = 0
+        
+        # Metrics
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.recent_error_rate = 0.0  # EWMA, 0..1
+    
+    def acquire(self) -> float:
+        """Block until a request may start. Returns the time spent waiting."""
+        with self._cond:
+            while self.in_flight >= self.concurrency:
+                self._cond.wait()
+            self.in_flight += 1
+            now = self.clock()
+            start = max(now, self._next_start)
+            self._next_start = start + 1.0 / self.rate
+            self.requests += 1
+        
+        wait = start - now
+        if wait > 0:
+            self.sleep(wait)
+        with self._cond:
+            self.total_wait += wait
+        return wait
+    
+    def release(self, success: bool, throttled: bool = False) -> None:
+        """
+        Report the outcome of a request started with acquire().
+        
+        throttled=True marks congestion (HTTP 429/5xx, timeouts, connection
+        errors) and backs off; other failures (bad text, voice or session) are
+        counted but do not change the rate.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self.recent_error_rate = 0.9 * self.recent_error_rate + (0.0 if success else 0.1)
+            
+            if success:
+                self.successes += 1
+                self._streak += 1
+                if self._streak >= self.success_window:
+                    self._streak = 0
+                    self.rate = min(self.max_rate, self.rate + self.increase)
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            else:
+                self.errors += 1
+                self._streak = 0
+                if throttled:
+                    self.throttled += 1
+                    now = self.clock()
+                    if now - self._last_decrease >= 1.0 / self.rate:
+                        self._last_decrease = now
+                        self.rate = max(self.min_rate, self.rate * self.decrease)
+                        self.concurrency = max(1, self.concurrency // 2)
+                        # Cool down before the next request starts
+                        self._next_start = max(self._next_start, now + 1.0 / self.rate)
+            
+            self._cond.notify_all()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Current rate/concurrency and error counters."""
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "successes": self.successes,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "error_rate": self.errors / self.requests if self.requests else 0.0,
+                "recent_error_rate": self.recent_error_rate,
+                "total_wait": self.total_wait,
+            }
+    
+    def describe(self) -> str:
+        m = self.metrics()
+        return (f"{m['rate']:.2f} req/s, {m['concurrency']} luồng, "
+                f"lỗi {m['errors']}/{m['requests']} (throttle {m['throttled']})")
+
+
+_capcut_client = None
+_capcut_client_lock = threading.Lock()
+_capcut_limiter = None
+
+
+def get_capcut_client() -> CapcutClient:
+    """
+    Shared keep-alive Capcut client.
+    
+    SRT, folder and script workers all go through this one requests.Session,
+    so consecutive lines reuse the connection instead of a new TCP/TLS handshake.
+    """
+    global _capcut_client
+    with _capcut_client_lock:
+        if _capcut_client is None:
+            _capcut_client = CapcutClient(pool_size=CAPCUT_POOL_SIZE, base_url=CAPCUT_TTS_URL)
+        return _capcut_client
+
+
+def get_capcut_limiter() -> AdaptiveRateLimiter:
+    """Shared AIMD limiter: the Capcut quota applies to the whole app, not per worker."""
+    global _capcut_limiter
+    with _capcut_client_lock:
+        if _capcut_limiter is None:
+            _capcut_limiter = AdaptiveRateLimiter()
+        return _capcut_limiter
+
+
+def capcut_create_tts(text: str, voice_id: str, session_id: str, output_file: str, retries: int = 3,
+                      debug: bool = False, client: Optional[CapcutClient] = None,
+                      limiter: Optional[AdaptiveRateLimiter] = None) -> tuple:
     """
     Create TTS audio using Capcut/TikTok API
     Returns (success: bool, error_info: dict or None)
+    
+    Mỗi request đi qua bộ giới hạn AIMD dùng chung (thay cho sleep cố định).
+    debug=True chỉ in lỗi cuối cùng (không in từng bước).
     """
-    if debug:
-        print(f"[DEBUG Capcut TTS] Starting TTS request...")
-        print(f"[DEBUG Capcut TTS] Voice ID: {voice_id}")
-        # Mask session ID for security - only show length and first 4 chars
-        masked_session = f"{session_id[:4]}****({len(session_id)} chars)" if len(session_id) > 4 else "****"
-        print(f"[DEBUG Capcut TTS] Session ID: {masked_session}")
-        print(f"[DEBUG Capcut TTS] Text length: {len(text)} chars")
-        print(f"[DEBUG Capcut TTS] Output file: {output_file}")
+    cache = get_synthesis_cache()
+    cache_key = cache.make_key("capcut", voice_id, text)
+    if cache.get_file(cache_key, output_file):
+        return (True, None)
     
+    result = _capcut_create_tts(text, voice_id, session_id, output_file, retries,
+                                client or get_capcut_client(), limiter or get_capcut_limiter())
+    if result[0]:
+        cache.put_file(cache_key, output_file)
+    if debug and not result[0]:
+        print(f"[Capcut TTS] {voice_id}: {result[1]['error']}")
+    return result
+
+
+def _capcut_create_tts(text: str, voice_id: str, session_id: str, output_file: str, retries: int,
+                       client: CapcutClient, limiter: AdaptiveRateLimiter) -> tuple:
     if not session_id:
-        if debug:
-            print("[DEBUG Capcut TTS] ERROR: Session ID is empty!")
         return (False, {"error": "Session ID không được để trống"})
     
     stripped_text = text.strip()
     if not stripped_text or not re.search(r'[a-zA-Z0-9À-ỹ]', stripped_text):
-        if debug:
-            print(f"[DEBUG Capcut TTS] ERROR: Text is empty or invalid: '{stripped_text[:50]}'")
         return (False, {"error": "Text trống hoặc không hợp lệ"})
     
     req_text = capcut_prepare_text(text)
-    url = f'{CAPCUT_TTS_URL}/?text_speaker={voice_id}&req_text={req_text}&speaker_map_type=0&aid=1233'
-    headers = {
-        'User-Agent': 'com.zhiliaoapp.musically/2022600030 (Linux; U; Android 7.1.2; es_ES; SM-G988N; Build/NRD90M;tt-ok/3.12.13.1)',
-        'Cookie': f'sessionid={session_id}',
-        'Accept-Encoding': 'gzip,deflate,compress'
-    }
-    
-    if debug:
-        print(f"[DEBUG Capcut TTS] Request URL: {url[:100]}...")
-        print(f"[DEBUG Capcut TTS] Headers Cookie: sessionid=****")
     
     for attempt in range(retries):
+        limiter.acquire()
         try:
-            if debug:
-                print(f"[DEBUG Capcut TTS] Attempt {attempt + 1}/{retries}...")
-            
-            response = requests.post(url, headers=headers, timeout=10)
-            
-            if debug:
-                print(f"[DEBUG Capcut TTS] HTTP Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                status_code = data.get('status_code')
-                status_msg = data.get('status_msg', 'No message')
-                
-                if debug:
-                    print(f"[DEBUG Capcut TTS] API status_code: {status_code}")
-                    print(f"[DEBUG Capcut TTS] API status_msg: {status_msg}")
-                    print(f"[DEBUG Capcut TTS] Response keys: {list(data.keys())}")
-                
-                if status_code == 1:
-                    if debug:
-                        print("[DEBUG Capcut TTS] ERROR: Invalid or expired session ID")
-                    return (False, {"error": f"Session ID không hợp lệ hoặc hết hạn (status_code: {status_code}, msg: {status_msg})"})
-                elif status_code == 2:
-                    if debug:
-                        print("[DEBUG Capcut TTS] ERROR: Text too long")
-                    return (False, {"error": "Text quá dài"})
-                elif status_code == 4:
-                    if debug:
-                        print("[DEBUG Capcut TTS] ERROR: Invalid voice ID")
-                    return (False, {"error": "Voice ID không hợp lệ"})
-                elif status_code == 5:
-                    if debug:
-                        print("[DEBUG Capcut TTS] ERROR: Missing session ID in request")
-                    return (False, {"error": "Thiếu Session ID"})
-                elif status_code != 0:
-                    if debug:
-                        print(f"[DEBUG Capcut TTS] ERROR: Unknown error code: {status_code}")
-                    return (False, {"error": f"Lỗi không xác định: {status_code}, msg: {status_msg}"})
-                
-                encoded_voice = data.get('data', {}).get('v_str')
-                if encoded_voice:
-                    if debug:
-                        print(f"[DEBUG Capcut TTS] SUCCESS: Got audio data, length: {len(encoded_voice)} chars")
-                    
-                    # Create output directory if needed
-                    output_dir = os.path.dirname(output_file)
-                    if output_dir:
-                        os.makedirs(output_dir, exist_ok=True)
-                    
-                    with open(output_file, 'wb') as f:
-                        f.write(base64.b64decode(encoded_voice))
-                    
-                    if debug:
-                        file_size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
-                        print(f"[DEBUG Capcut TTS] File saved: {output_file}, size: {file_size} bytes")
-                    
-                    return (True, None)
-                else:
-                    if debug:
-                        print("[DEBUG Capcut TTS] ERROR: No audio data in response")
-                        print(f"[DEBUG Capcut TTS] Response data keys: {list(data.get('data', {}).keys()) if data.get('data') else 'No data'}")
-                    return (False, {"error": "Không nhận được audio data"})
-            else:
-                if debug:
-                    print(f"[DEBUG Capcut TTS] HTTP Error: {response.status_code}")
-                    try:
-                        print(f"[DEBUG Capcut TTS] Response body: {response.text[:200]}")
-                    except:
-                        pass
-                if attempt < retries - 1:
-                    time.sleep(1)
-                    continue
-                return (False, {"error": f"HTTP Error: {response.status_code}"})
+            response = client.invoke(req_text, voice_id, session_id, timeout=10)
+        except Exception as e:
+            limiter.release(False, throttled=True)
+            if attempt < retries - 1:
+                time.sleep(1)
+                continue
+            return (False, {"error": str(e)})
+        
+        if response.status_code != 200:
+            limiter.release(False, throttled=response.status_code == 429 or response.status_code >= 500)
+            if attempt < retries - 1:
+                time.sleep(1)
+                continue
+            return (False, {"error": f"HTTP Error: {response.status_code}"})
+        
+        try:
+            data = response.json()
+            status_code = data.get('status_code')
+            status_msg = data.get('status_msg', 'No message')
+            encoded_voice = (data.get('data') or {}).get('v_str')
+        except Exception as e:
+            limiter.release(False)
+            if attempt < retries - 1:
+                time.sleep(1)
+                continue
+            return (False, {"error": str(e)})
+        
+        # API errors also come back as HTTP 200; only real audio counts towards raising the rate
+        limiter.release(status_code == 0 and bool(encoded_voice))
+        
+        if status_code == 1:
+            return (False, {"error": f"Session ID không hợp lệ hoặc hết hạn (status_code: {status_code}, msg: {status_msg})"})
+        elif status_code == 2:
+            return (False, {"error": "Text quá dài"})
+        elif status_code == 4:
+            return (False, {"error": "Voice ID không hợp lệ"})
+        elif status_code == 5:
+            return (False, {"error": "Thiếu Session ID"})
+        elif status_code != 0:
+            return (False, {"error": f"Lỗi không xác định: {status_code}, msg: {status_msg}"})
+        
+        if not encoded_voice:
+            return (False, {"error": "Không nhận được audio data"})
+        
+        try:
+            # Create output directory if needed
+            output_dir = os.path.dirname(output_file)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            
+            with open(output_file, 'wb') as f:
+                f.write(base64.b64decode(encoded_voice))
+            
+            return (True, None)
         except Exception as e:
-            if debug:
-                print(f"[DEBUG Capcut TTS] Exception: {type(e).__name__}: {str(e)}")
             if attempt < retries - 1:
                 time.sleep(1)
                 continue
@@ -1269,25 +1700,28 @@ def capcut_create_tts(text: str, voice_id: str, session_id: str, output_file: st
 # EDGE TTS FUNCTIONS
 # =============================================================================
 
-def fetch_edge_voices() -> List[Dict[str, Any]]:
-    """Fetch voice list from Edge TTS API"""
+def fetch_edge_voices(force_refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    Fetch voice list from Edge TTS API.
+    
+    Goes through edge.voices.list_voices with the on-disk VoiceCatalogCache:
+    served from the cache while it is fresh; afterwards (or with force_refresh)
+    it is revalidated with ETag/Last-Modified, and a stale copy is used when
+    the API cannot be reached.
+    """
+    from edge.voices import VoiceCatalogCache, list_voices
+    
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36 Edg/143.0.0.0',
-            'Accept': '*/*',
-        }
-        response = requests.get(EDGE_TTS_VOICE_URL, headers=headers, timeout=10)
-        if response.status_code == 200:
-            voices = response.json()
-            # Process voices to add language field
-            for voice in voices:
-                locale = voice.get('Locale', '')
-                voice['Language'] = locale.split('-')[0] if locale else ''
-            return voices
-        return []
+        voices = asyncio.run(list_voices(cache=VoiceCatalogCache(), force_refresh=force_refresh, timeout=10))
     except Exception as e:
         print(f"Error fetching Edge voices: {e}")
         return []
+    
+    # Process voices to add language field
+    for voice in voices:
+        locale = voice.get('Locale', '')
+        voice['Language'] = locale.split('-')[0] if locale else ''
+    return voices
 
 
 def calculate_retry_delay(attempt: int, is_conn_error: bool = False) -> float:
@@ -1308,6 +1742,250 @@ def calculate_retry_delay(attempt: int, is_conn_error: bool = False) -> float:
     return delay + jitter
 
 
+# =============================================================================
+# EDGE TTS BATCH ENGINE
+# =============================================================================
+
+class EdgeBatchEngine:
+    """
+    Runs Edge TTS jobs on a single asyncio event loop.
+    
+    Concurrency is bounded by an asyncio.Semaphore instead of one thread and one
+    event loop per item, and all jobs share one pooled websocket transport.
+    Failed items are retried with calculate_retry_delay backoff; the semaphore
+    is released while waiting so other items keep running.
+    
+    Progress is reported through a single callback `on_progress(event, info)`
+    called on the engine thread, with event being "retry", "done" or "failed".
+    GUI code should hop to the Tk thread from it (self.after).
+    """
+    
+    def __init__(self, voice: str, rate: str = "+0%", volume: str = "+0%", pitch: str = "+0Hz",
+                 concurrency: int = 10, max_retries: int = MAX_RETRIES,
+                 min_file_size: int = MIN_AUDIO_FILE_SIZE,
+                 on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 max_ahead: Optional[int] = None):
+        self.voice = voice
+        self.rate = rate
+        self.volume = volume
+        self.pitch = pitch
+        self.concurrency = max(1, concurrency)
+        # run_to_sink: max chunks started but not yet written (bounds the audio held in memory)
+        self.max_ahead = max(self.concurrency, max_ahead or 4 * self.concurrency)
+        self.max_retries = max_retries
+        self.min_file_size = min_file_size
+        self.on_progress = on_progress
+        
+        self.loop = asyncio.new_event_loop()
+        self.cancelled = False
+        self._transport = None
+        self._tasks: set = set()
+        self._lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _emit(self, event: str, **info):
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(event, info)
+        except Exception as e:
+            print(f"Edge batch progress callback error: {e}")
+    
+    async def _synthesize_once(self, text: str, output_file: Optional[str]):
+        """One attempt: save to output_file, or return the audio bytes when it is None"""
+        from edge.communicate import Communicate
+        from edge.sinks import MemorySink
+        
+        cache = get_synthesis_cache()
+        cache_key = cache.make_key("edge", self.voice, text, rate=self.rate, volume=self.volume, pitch=self.pitch)
+        cached = cache.get(cache_key)
+        if cached is not None and len(cached) >= self.min_file_size:
+            if output_file is None:
+                return cached
+            with open(output_file, 'wb') as f:
+                f.write(cached)
+            return output_file
+        
+        communicate = Communicate(text, self.voice, rate=self.rate, volume=self.volume,
+                                  pitch=self.pitch, transport=self._transport)
+        if output_file is None:
+            buffer = MemorySink()
+            await communicate.stream_to(buffer)
+            result = buffer.getvalue()
+            size = len(result)
+        else:
+            await communicate.save(output_file)
+            result = output_file
+            size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
+        
+        # Verify audio was created and has content
+        if size < self.min_file_size:
+            raise ValueError("Audio file empty or not created")
+        
+        if output_file is None:
+            cache.put(cache_key, result)
+        else:
+            cache.put_file(cache_key, output_file)
+        return result
+    
+    async def _synthesize(self, key, text: str, output_file: Optional[str],
+                          semaphore: asyncio.Semaphore, progress: Dict[str, int]):
+        last_error = None
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with semaphore:
+                    result = await self._synthesize_once(text, output_file)
+                
+                progress['completed'] += 1
+                self._emit("done", key=key, output_file=output_file, attempt=attempt, **progress)
+                return result
+            except Exception as e:
+                last_error = str(e)
+                if attempt < self.max_retries:
+                    self._emit("retry", key=key, attempt=attempt, max_retries=self.max_retries, error=last_error)
+                    await asyncio.sleep(calculate_retry_delay(attempt, is_connection_error(last_error)))
+        
+        progress['completed'] += 1
+        self._emit("failed", key=key, error=last_error, max_retries=self.max_retries, **progress)
+        return None
+    
+    def _prepare(self, total: int) -> Tuple[asyncio.Semaphore, Dict[str, int]]:
+        """Open the shared transport and return the semaphore and progress counters for a batch"""
+        from edge.transport import Transport
+        
+        if self._transport is None:
+            self._transport = Transport(max_idle=self.concurrency)
+        
+        return asyncio.Semaphore(self.concurrency), {'completed': 0, 'total': total}
+    
+    def _start(self, jobs: List[Tuple[Any, str, Optional[str]]]) -> Dict[Any, asyncio.Future]:
+        """Schedule all jobs as tasks on the running loop"""
+        semaphore, progress = self._prepare(len(jobs))
+        tasks = {
+            key: asyncio.ensure_future(self._synthesize(key, text, output_file, semaphore, progress))
+            for key, text, output_file in jobs
+        }
+        with self._lock:
+            self._tasks = set(tasks.values())
+            cancelled = self.cancelled
+        if cancelled:
+            for task in tasks.values():
+                task.cancel()
+        return tasks
+    
+    async def _run(self, jobs: List[Tuple[Any, str, str]]) -> Dict[Any, str]:
+        tasks = self._start(jobs)
+        try:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            with self._lock:
+                self._tasks = set()
+        
+        return {
+            key: task.result() for key, task in tasks.items()
+            if not task.cancelled() and task.exception() is None and task.result()
+        }
+    
+    async def _run_to_sink(self, jobs: List[Tuple[Any, str]], sink) -> int:
+        semaphore, progress = self._prepare(len(jobs))
+        pending = list(reversed(jobs))
+        window: List[asyncio.Future] = []
+        loop = asyncio.get_running_loop()
+        written = 0
+        try:
+            while pending or window:
+                # Only max_ahead chunks may be started but unwritten, so chunks that
+                # finish early behind a slow head chunk cannot pile up in memory
+                while pending and len(window) < self.max_ahead and not self.cancelled:
+                    key, text = pending.pop()
+                    task = asyncio.ensure_future(self._synthesize(key, text, None, semaphore, progress))
+                    window.append(task)
+                    with self._lock:
+                        self._tasks.add(task)
+                if not window:
+                    break
+                
+                task = window.pop(0)
+                await asyncio.wait([task])
+                with self._lock:
+                    self._tasks.discard(task)
+                if task.cancelled() or task.exception() is not None or not task.result():
+                    continue
+                # File and pipe writes block; keep them off the event loop
+                await loop.run_in_executor(None, sink.write, task.result())
+                written += 1
+        finally:
+            for task in window:
+                task.cancel()
+            with self._lock:
+                self._tasks = set()
+        return written
+
+    def run(self, jobs: List[Tuple[Any, str, str]]) -> Dict[Any, str]:
+        """
+        Synthesize a batch of jobs, blocking until all finish or are cancelled.
+        
+        Args:
+            jobs: (key, text, output_file) tuples
+        
+        Returns:
+            Mapping of key -> output file for the jobs that succeeded
+        """
+        if self.cancelled or not jobs:
+            return {}
+        return self.loop.run_until_complete(self._run(jobs))
+    
+    def run_to_sink(self, jobs: List[Tuple[Any, str]], sink) -> int:
+        """
+        Synthesize a batch of jobs and write their audio, in job order, into one sink.
+        
+        Chunks are still synthesized concurrently, at most max_ahead ahead of
+        the write cursor, but nothing is written to disk per chunk: the sink
+        (e.g. edge.sinks.FFmpegSink) produces the merged output in one pass.
+        Failed chunks are skipped.
+        
+        Args:
+            jobs: (key, text) tuples in output order
+            sink: edge.sinks.AudioSink receiving the audio (not closed here)
+        
+        Returns:
+            Number of chunks written
+        """
+        if self.cancelled or not jobs:
+            return 0
+        return self.loop.run_until_complete(self._run_to_sink(jobs, sink))
+    
+    def cancel(self):
+        """Cancel all running jobs. Safe to call from any thread."""
+        with self._lock:
+            self.cancelled = True
+            tasks = list(self._tasks)
+        for task in tasks:
+            try:
+                self.loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # Loop already closed
+                break
+    
+    def close(self):
+        """Close the shared transport and the event loop."""
+        if self.loop.is_closed():
+            return
+        try:
+            if self._transport is not None:
+                self.loop.run_until_complete(self._transport.close())
+        except Exception:
+            pass
+        finally:
+            self._transport = None
+            cleanup_event_loop(self.loop)
+
+
 # =============================================================================
 # AUDIO PLAYER
 # =============================================================================
@@ -1474,6 +2152,10 @@ class TruePersistentSession:
     2. generate_audio(text) - Gửi text và đợi nhận audio (qua CÙNG session)
     3. disconnect() - Đóng session khi hoàn tất
     
+    Chỉ background task đọc/ghi WebSocket. generate_audio() chỉ đưa request vào
+    hàng đợi (không lock), nên turn kế tiếp được gửi ngay khi turn trước nhận
+    turn_complete. Trạng thái kết nối dùng asyncio.Event thay vì polling.
+    
     Session sẽ tự động reconnect nếu bị timeout (~10 phút).
     """
     
@@ -1487,14 +2169,20 @@ class TruePersistentSession:
         self.session = None
         self._live_config = None
         
-        # State
-        self.is_connected = False
+        # State - các Event được tạo trong connect() (trên event loop đang chạy)
+        self._connected: Optional[asyncio.Event] = None  # set khi WebSocket sẵn sàng
+        self._stopped: Optional[asyncio.Event] = None  # set khi session manager dừng hẳn
         self._running = False
+        self.turns_completed = 0
         
-        # Queues for communication with session task
+        # Hàng đợi (text, future) cho session task
         self._request_queue = None
-        self._request_lock = None
+        self._interrupted = None  # Request bị đứt giữa chừng, gửi lại một lần sau reconnect
         self._session_task = None
+    
+    @property
+    def is_connected(self) -> bool:
+        return self._connected is not None and self._connected.is_set()
         
     def _setup_client(self, api_version: str = "v1beta"):
         """Setup Google GenAI client"""
@@ -1552,7 +2240,8 @@ class TruePersistentSession:
             self._live_config = self._build_config()
             
             self._request_queue = asyncio.Queue()
-            self._request_lock = asyncio.Lock()
+            self._connected = asyncio.Event()
+            self._stopped = asyncio.Event()
             
             self.log(f"🔗 Đang kết nối Persistent Session...", "INFO")
             self.log(f"🎭 Voice: {self.config.voice}", "INFO")
@@ -1560,81 +2249,129 @@ class TruePersistentSession:
             self._running = True
             self._session_task = asyncio.create_task(self._session_manager())
             
-            # Wait for connection to establish
-            for _ in range(20):  # Wait up to 10 seconds
-                await asyncio.sleep(0.5)
-                if self.is_connected:
-                    self.log(f"✅ Persistent Session đã kết nối!", "SUCCESS")
-                    return True
+            # Đợi Event kết nối thay vì polling
+            if await self._wait_connected(LIVE_CONNECT_TIMEOUT):
+                self.log(f"✅ Persistent Session đã kết nối!", "SUCCESS")
+                return True
             
             self.log(f"❌ Timeout khi kết nối session", "ERROR")
             return False
                 
         except Exception as e:
             self.log(f"❌ Lỗi kết nối: {str(e)}", "ERROR")
-            self.is_connected = False
             return False
     
+    async def _wait_connected(self, timeout: float) -> bool:
+        """Đợi đến khi WebSocket sẵn sàng, session manager dừng, hoặc hết timeout"""
+        if self.is_connected:
+            return True
+        
+        waiters = [
+            asyncio.ensure_future(self._connected.wait()),
+            asyncio.ensure_future(self._stopped.wait()),
+        ]
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return self.is_connected
+    
     async def _session_manager(self):
         """Background task giữ session mở và xử lý requests"""
         reconnect_delay = 1.0
         
-        while self._running:
-            try:
-                self.log(f"📡 Mở WebSocket connection...", "INFO")
-                
-                async with self.client.aio.live.connect(
-                    model=MODEL,
-                    config=self._live_config
-                ) as session:
-                    self.session = session
-                    self.is_connected = True
-                    reconnect_delay = 1.0  # Reset on success
+        try:
+            while self._running:
+                turns_before = self.turns_completed
+                try:
+                    self.log(f"📡 Mở WebSocket connection...", "INFO")
                     
-                    self.log(f"✅ WebSocket đã kết nối, sẵn sàng nhận requests", "SUCCESS")
+                    async with self.client.aio.live.connect(
+                        model=MODEL,
+                        config=self._live_config
+                    ) as session:
+                        self.session = session
+                        self._connected.set()
+                        reconnect_delay = 1.0  # Reset on success
+                        
+                        self.log(f"✅ WebSocket đã kết nối, sẵn sàng nhận requests", "SUCCESS")
+                        
+                        if not await self._serve_turns(session):
+                            break
                     
-                    # Process requests while connected
-                    while self._running and self.is_connected:
-                        try:
-                            # Wait for request with timeout
-                            request = await asyncio.wait_for(
-                                self._request_queue.get(),
-                                timeout=60.0
-                            )
-                            
-                            if request is None:  # Shutdown signal
-                                self.log(f"🔌 Nhận tín hiệu đóng session", "INFO")
-                                break
-                            
-                            text, response_future = request
-                            
-                            try:
-                                audio_data = await self._send_and_receive(session, text)
-                                response_future.set_result(audio_data)
-                            except Exception as e:
-                                response_future.set_exception(e)
-                                
-                        except asyncio.TimeoutError:
-                            # No requests - just continue waiting
-                            continue
-                        except Exception as e:
-                            self.log(f"⚠️ Lỗi xử lý request: {str(e)}", "WARNING")
-                
-                self.is_connected = False
-                self.session = None
-                
-            except Exception as e:
-                self.is_connected = False
-                self.session = None
-                
-                if self._running:
-                    self.log(f"⚠️ Session bị ngắt: {str(e)}", "WARNING")
-                    self.log(f"🔄 Reconnect sau {reconnect_delay}s...", "INFO")
-                    await asyncio.sleep(reconnect_delay)
-                    reconnect_delay = min(reconnect_delay * 2, 30.0)
+                except Exception as e:
+                    self._connected.clear()
+                    if self._running:
+                        self.log(f"⚠️ Session bị ngắt: {str(e)}", "WARNING")
+                        if self.session is not None and self.turns_completed > turns_before:
+                            # Session đang chạy tốt (thường là hết hạn ~10 phút): reconnect ngay
+                            self.log(f"🔄 Reconnect ngay...", "INFO")
+                        else:
+                            self.log(f"🔄 Reconnect sau {reconnect_delay}s...", "INFO")
+                            await asyncio.sleep(reconnect_delay)
+                            reconnect_delay = min(reconnect_delay * 2, 30.0)
+                finally:
+                    self._connected.clear()
+                    self.session = None
+        finally:
+            self._stopped.set()
+            self._fail_pending(ConnectionError("Persistent Session đã đóng"))
         
         self.log(f"🔌 Session manager đã dừng", "INFO")
     
+    async def _serve_turns(self, session) -> bool:
+        """
+        Gửi các request nối tiếp nhau trên cùng WebSocket.
+        
+        Request kế tiếp được lấy ngay sau turn_complete của request trước.
+        Trả về False khi nhận tín hiệu đóng session.
+        """
+        while self._running:
+            if self._interrupted is not None:
+                request, self._interrupted = self._interrupted, None
+                can_retry = False
+            else:
+                request = await self._request_queue.get()
+                can_retry = True
+            
+            if request is None:  # Shutdown signal
+                self.log(f"🔌 Nhận tín hiệu đóng session", "INFO")
+                return False
+            
+            text, response_future = request
+            if response_future.done():  # Caller đã timeout/hủy
+                continue
+            
+            try:
+                audio_data = await self._send_and_receive(session, text)
+            except Exception as e:
+                if can_retry and not response_future.done():
+                    self._interrupted = request
+                elif not response_future.done():
+                    response_future.set_exception(e)
+                # Turn bị đứt giữa chừng: audio còn lại sẽ lẫn vào turn sau -> reconnect
+                raise
+            
+            self.turns_completed += 1
+            if not response_future.done():
+                response_future.set_result(audio_data)
+        
+        return False
+    
+    def _fail_pending(self, error: Exception):
+        """Trả lỗi cho các request còn trong hàng đợi"""
+        if self._request_queue is None:
+            return
+        
+        if self._interrupted is not None:
+            self._request_queue.put_nowait(self._interrupted)
+            self._interrupted = None
+        while not self._request_queue.empty():
+            request = self._request_queue.get_nowait()
+            if request is not None and not request[1].done():
+                request[1].set_exception(error)
+    
     async def _send_and_receive(self, session, text: str) -> bytes:
         """Gửi text và nhận audio response qua persistent session"""
         input_text = text
@@ -1668,45 +2405,35 @@ class TruePersistentSession:
             self.log("❌ Session chưa được khởi động", "ERROR")
             return None
         
-        # Wait for connection if not connected
-        wait_count = 0
-        while not self.is_connected and wait_count < 20:
-            await asyncio.sleep(0.5)
-            wait_count += 1
-        
-        if not self.is_connected:
+        # Đợi kết nối (kể cả khi đang reconnect) bằng Event, không polling
+        if not await self._wait_connected(LIVE_CONNECT_TIMEOUT):
             self.log("❌ Session không có kết nối", "ERROR")
             return None
         
-        async with self._request_lock:
+        try:
+            # Không cần lock: session task gửi lần lượt từng request trong hàng đợi
+            response_future = asyncio.get_running_loop().create_future()
+            self._request_queue.put_nowait((text, response_future))
+            
+            # Wait for response
             try:
-                # Create future for response
-                loop = asyncio.get_event_loop()
-                response_future = loop.create_future()
-                
-                # Put request in queue
-                await self._request_queue.put((text, response_future))
-                
-                # Wait for response
-                try:
-                    audio_data = await asyncio.wait_for(response_future, timeout=120.0)
-                    return audio_data
-                except asyncio.TimeoutError:
-                    self.log(f"⏰ Timeout waiting for audio", "ERROR")
-                    return None
-                    
-            except Exception as e:
-                self.log(f"❌ Lỗi generate_audio: {str(e)}", "ERROR")
+                audio_data = await asyncio.wait_for(response_future, timeout=LIVE_RESPONSE_TIMEOUT)
+                return audio_data
+            except asyncio.TimeoutError:
+                self.log(f"⏰ Timeout waiting for audio", "ERROR")
                 return None
+                
+        except Exception as e:
+            self.log(f"❌ Lỗi generate_audio: {str(e)}", "ERROR")
+            return None
     
     async def disconnect(self):
         """Ngắt kết nối và cleanup"""
         self._running = False
-        self.is_connected = False
         
         # Send shutdown signal
         if self._request_queue:
-            await self._request_queue.put(None)
+            self._request_queue.put_nowait(None)
         
         # Wait for session task to finish
         if self._session_task:
@@ -1860,6 +2587,179 @@ class WorkerEngine:
         self._setup_client()
 
 
+# =============================================================================
+# API KEY SCHEDULER
+# =============================================================================
+
+@dataclass
+class KeyState:
+    """Token bucket and health of one Gemini API key"""
+    api_key: str
+    tokens: float
+    updated: float
+    free_slots: List[int] = field(default_factory=list)
+    requests: int = 0
+    successes: int = 0
+    errors: int = 0
+    throttled: int = 0
+    consecutive_errors: int = 0
+    consecutive_throttles: int = 0
+    error_rate: float = 0.0  # EWMA, 0..1
+    latency: float = 0.0  # EWMA (giây), 0 = chưa đo
+    
+    @property
+    def preview(self) -> str:
+        return f"...{self.api_key[-4:]}" if len(self.api_key) >= 4 else "****"
+
+
+class KeyScheduler:
+    """
+    Dispatches Gemini requests to the API key with the most headroom.
+    
+    Each key has a token bucket (`rpm` requests/minute, up to `burst` tokens)
+    and `slots` concurrent request slots. acquire() returns the eligible key
+    with the best score: more tokens, fewer requests in flight, a lower recent
+    error rate and lower latency all count. A 429 (or `max_consecutive_errors`
+    failures in a row) drives the key's bucket negative, so the key is skipped
+    until the bucket refills while healthy keys keep taking the work.
+    
+    `clock` can be replaced by a fake clock for simulation.
+    """
+    
+    def __init__(self, api_keys: List[str], slots: int = 1, rpm: float = GEMINI_KEY_RPM,
+                 burst: float = GEMINI_KEY_BURST, throttle_cooldown: float = GEMINI_KEY_THROTTLE_COOLDOWN,
+                 max_cooldown: float = GEMINI_KEY_MAX_COOLDOWN, error_cooldown: float = GEMINI_KEY_ERROR_COOLDOWN,
+                 max_consecutive_errors: int = 3, clock: Callable[[], float] = time.monotonic):
+        self.slots = slots
+        self.rate = rpm / 60.0
+        self.burst = burst
+        self.throttle_cooldown = throttle_cooldown
+        self.max_cooldown = max_cooldown
+        self.error_cooldown = error_cooldown
+        self.max_consecutive_errors = max_consecutive_errors
+        self.clock = clock
+        
+        now = clock()
+        self.keys: Dict[str, KeyState] = {
+            api_key: KeyState(api_key, float(burst), now, free_slots=list(range(slots)))
+            for api_key in api_keys
+        }
+        self._cond: Optional[asyncio.Condition] = None  # Tạo trên event loop đang chạy
+    
+    def _refill(self, state: KeyState, now: float) -> None:
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+    
+    def _score(self, state: KeyState, default_latency: float) -> float:
+        in_flight = self.slots - len(state.free_slots)
+        latency = state.latency or default_latency
+        return (state.tokens / self.burst) * (1.0 - state.error_rate) / ((in_flight + 1) * latency)
+    
+    def _pick(self) -> Tuple[Optional[KeyState], Optional[float]]:
+        """Best eligible key, or (None, seconds until a bucket refills / None to wait for a release)"""
+        now = self.clock()
+        # Key chưa đo latency được tính theo latency trung bình của các key khác
+        measured = [state.latency for state in self.keys.values() if state.latency]
+        default_latency = sum(measured) / len(measured) if measured else 1.0
+        best = None
+        best_score = 0.0
+        wait = None
+        for state in self.keys.values():
+            self._refill(state, now)
+            if not state.free_slots:
+                continue
+            if state.tokens < 1.0:
+                refill = (1.0 - state.tokens) / self.rate
+                wait = refill if wait is None else min(wait, refill)
+                continue
+            score = self._score(state, default_latency)
+            if best is None or score > best_score:
+                best, best_score = state, score
+        return best, wait
+    
+    async def acquire(self) -> Tuple[str, int]:
+        """Wait for a key with a free slot and a token. Returns (api_key, slot)."""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        
+        async with self._cond:
+            while True:
+                state, wait = self._pick()
+                if state is not None:
+                    state.tokens -= 1.0
+                    state.requests += 1
+                    return state.api_key, state.free_slots.pop(0)
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def release(self, api_key: str, slot: int, success: bool,
+                      throttled: bool = False, latency: Optional[float] = None) -> float:
+        """
+        Report the outcome of a request started with acquire().
+        
+        Returns the cooldown (seconds) imposed on the key, 0 if none.
+        """
+        state = self.keys[api_key]
+        cooldown = 0.0
+        async with self._cond:
+            self._refill(state, self.clock())
+            state.free_slots.append(slot)
+            state.error_rate = 0.8 * state.error_rate + (0.0 if success else 0.2)
+            
+            if success:
+                state.successes += 1
+                state.consecutive_errors = 0
+                state.consecutive_throttles = 0
+                if latency is not None:
+                    state.latency = latency if not state.latency else 0.8 * state.latency + 0.2 * latency
+            else:
+                state.errors += 1
+                state.consecutive_errors += 1
+                # Bucket âm nghĩa là key đang bị loại; các request đang chạy trên
+                # cùng key lỗi theo nên chỉ tính là một lần throttle
+                in_cooldown = state.tokens < 0
+                if throttled and not in_cooldown:
+                    state.throttled += 1
+                    state.consecutive_throttles += 1
+                    cooldown = min(self.max_cooldown, self.throttle_cooldown * 2 ** (state.consecutive_throttles - 1))
+                elif throttled:
+                    state.throttled += 1
+                elif state.consecutive_errors >= self.max_consecutive_errors and not in_cooldown:
+                    state.consecutive_errors = 0
+                    cooldown = self.error_cooldown
+                
+                if cooldown:
+                    state.tokens = min(state.tokens, 1.0 - cooldown * self.rate)
+            
+            self._cond.notify_all()
+        return cooldown
+    
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-key counters, keyed by key preview."""
+        now = self.clock()
+        result = {}
+        for state in self.keys.values():
+            self._refill(state, now)
+            result[state.preview] = {
+                "tokens": state.tokens,
+                "requests": state.requests,
+                "successes": state.successes,
+                "errors": state.errors,
+                "throttled": state.throttled,
+                "recent_error_rate": state.error_rate,
+                "latency": state.latency,
+            }
+        return result
+    
+    def describe(self) -> List[str]:
+        return [
+            f"{preview}: {m['successes']}/{m['requests']} ok, throttle {m['throttled']}, {m['latency']:.1f}s/req"
+            for preview, m in self.metrics().items()
+        ]
+
+
 # =============================================================================
 # MULTI-THREAD PROCESSOR 
 # =============================================================================
@@ -1881,32 +2781,48 @@ class MultiThreadProcessor:
         self.total_tasks = 0
         self.completed_tasks = 0
         self.lock = asyncio.Lock()
+        
+        # Scheduler chọn key cho từng request; mỗi (key, slot) có một engine riêng
+        self.scheduler: Optional[KeyScheduler] = None
+        self.engines: Dict[Tuple[str, int], Any] = {}
+    
+    def _get_slots_per_key(self) -> int:
+        """Number of concurrent requests per API key"""
+        return self.config.workers_per_key if self.config.multi_worker_enabled else 1
     
     def _get_total_workers(self) -> int:
         """Calculate total number of workers based on config"""
-        if self.config.multi_worker_enabled:
-            return len(self.api_keys) * self.config.workers_per_key
-        return len(self.api_keys)
+        return len(self.api_keys) * self._get_slots_per_key()
     
-    def _get_worker_assignments(self) -> List[tuple]:
-        """
-        Get list of (worker_id, api_key) tuples.
-        If multi-worker is enabled, same key is assigned to multiple workers.
-        """
-        assignments = []
-        worker_id = 0
-        
-        if self.config.multi_worker_enabled:
-            for api_key in self.api_keys:
-                for _ in range(self.config.workers_per_key):
-                    assignments.append((worker_id, api_key))
-                    worker_id += 1
+    async def _get_engine(self, api_key: str, slot: int):
+        """Engine of one key slot, created on first use"""
+        engine = self.engines.get((api_key, slot))
+        if engine is not None:
+            return engine
+        
+        engine_id = self.api_keys.index(api_key) * self._get_slots_per_key() + slot
+        key_preview = f"...{api_key[-4:]}" if len(api_key) >= 4 else "****"
+        # Sử dụng LiveSessionWorkerEngine nếu live_session_enabled, ngược lại dùng WorkerEngine
+        if self.config.live_session_enabled:
+            engine = LiveSessionWorkerEngine(engine_id, api_key, self.config, log_callback=self.log)
+            await engine.connect()
+            self.log(f"📞 Engine {engine_id} (Key: {key_preview}) started", "INFO")
         else:
-            for api_key in self.api_keys:
-                assignments.append((worker_id, api_key))
-                worker_id += 1
+            engine = WorkerEngine(engine_id, api_key, self.config)
+            self.log(f"🔧 Engine {engine_id} (Key: {key_preview}) started", "INFO")
         
-        return assignments
+        self.engines[(api_key, slot)] = engine
+        return engine
+    
+    def _recreate_engine(self, api_key: str, slot: int):
+        """Recreate client/session dựa trên engine type"""
+        engine = self.engines.get((api_key, slot))
+        if engine is None:
+            return
+        if self.config.live_session_enabled and hasattr(engine, 'recreate_session'):
+            engine.recreate_session()
+        elif hasattr(engine, 'recreate_client'):
+            engine.recreate_client()
     
     async def process_all(self, subtitles: List[Subtitle], output_dir: Path, prefix: str):
         if not self.api_keys:
@@ -1922,9 +2838,8 @@ class MultiThreadProcessor:
         for sub in subtitles:
             await self.task_queue.put(sub)
         
-        # Get worker assignments
-        worker_assignments = self._get_worker_assignments()
-        total_workers = len(worker_assignments)
+        total_workers = self._get_total_workers()
+        self.scheduler = KeyScheduler(self.api_keys, slots=self._get_slots_per_key())
         
         # Log startup info
         if self.config.multi_worker_enabled:
@@ -1932,10 +2847,10 @@ class MultiThreadProcessor:
         else:
             self.log(f"🚀 Starting {total_workers} workers for {self.total_tasks} subtitles", "INFO")
         
-        # Create workers
+        # Workers không gắn cố định với key: mỗi request được scheduler giao cho key còn nhiều headroom nhất
         workers = [
-            asyncio.create_task(self._worker(worker_id, api_key, output_dir, prefix))
-            for worker_id, api_key in worker_assignments
+            asyncio.create_task(self._worker(worker_id, output_dir, prefix))
+            for worker_id in range(total_workers)
         ]
         
         await asyncio.gather(*workers)
@@ -1943,22 +2858,16 @@ class MultiThreadProcessor:
         successful = sum(1 for v in self.results.values() if v)
         self.log(f"\n{'='*50}", "INFO")
         self.log(f"✅ Done! Success: {successful}/{len(self.results)}", "SUCCESS")
+        for line in self.scheduler.describe():
+            self.log(f"🔑 Key {line}", "INFO")
+        self.log(f"💾 Cache: {get_synthesis_cache().describe()}", "INFO")
     
-    async def _worker(self, worker_id: int, api_key: str, output_dir: Path, prefix: str):
+    async def _worker(self, worker_id: int, output_dir: Path, prefix: str):
         try:
-            key_preview = f"...{api_key[-4:]}" if len(api_key) >= 4 else "****"
+            self.log(f"🔧 Worker {worker_id} started", "INFO")
             
-            # Sử dụng LiveSessionWorkerEngine nếu live_session_enabled, ngược lại dùng WorkerEngine
-            if self.config.live_session_enabled:
-                engine = LiveSessionWorkerEngine(worker_id, api_key, self.config, log_callback=self.log)
-                await engine.connect()
-                self.log(f"📞 Worker {worker_id} (Key: {key_preview}) started", "INFO")
-            else:
-                engine = WorkerEngine(worker_id, api_key, self.config)
-                self.log(f"🔧 Worker {worker_id} (Key: {key_preview}) started", "INFO")
-            
-            consecutive_errors = 0
-            max_consecutive_errors = 3
+            cache = get_synthesis_cache()
+            cache_params = self.config.cache_params()
             
             while self.is_running:
                 try:
@@ -1976,9 +2885,19 @@ class MultiThreadProcessor:
                 success = False
                 last_error = ""
                 
+                cache_key = cache.make_key("gemini", self.config.voice, subtitle.text, model=MODEL, **cache_params)
+                
                 for attempt in range(1, MAX_RETRIES + 1):
+                    lease = None  # (api_key, slot) đang giữ trong scheduler
                     try:
-                        audio_data = await engine.generate_audio(subtitle.text)
+                        # Raw PCM is cached before the speed change, so any speed reuses it
+                        audio_data = cache.get(cache_key) if attempt == 1 else None
+                        cached = audio_data is not None
+                        if not cached:
+                            lease = await self.scheduler.acquire()
+                            engine = await self._get_engine(*lease)
+                            started = time.monotonic()
+                            audio_data = await engine.generate_audio(subtitle.text)
                         
                         if not audio_data:
                             raise ValueError("Received 0 bytes (No Audio) - Connection issue likely")
@@ -1986,6 +2905,11 @@ class MultiThreadProcessor:
                         if len(audio_data) < MIN_AUDIO_FILE_SIZE:
                             raise ValueError(f"Audio too short ({len(audio_data)} bytes) - May be incomplete")
                         
+                        if not cached:
+                            await self.scheduler.release(*lease, True, latency=time.monotonic() - started)
+                            lease = None
+                            cache.put(cache_key, audio_data)
+                        
                         # --- SPEED PROCESSING ---
                         final_rate = int(RECEIVE_SAMPLE_RATE * self.config.speed)
                         
@@ -2000,12 +2924,13 @@ class MultiThreadProcessor:
                              status_msg += f" [x{self.config.speed:.1f}]"
                         if attempt > 1:
                             status_msg += f" [Retry {attempt-1}]"
+                        if cached:
+                            status_msg += " [cache]"
                             
                         self.log(status_msg, "SUCCESS")
                         
                         self.results[subtitle.index] = True
                         success = True
-                        consecutive_errors = 0  # Reset error counter on success
                         
                         self.on_audio_generated(GeneratedAudio(
                             index=subtitle.index,
@@ -2018,9 +2943,18 @@ class MultiThreadProcessor:
                     except Exception as e:
                         last_error = str(e)
                         is_conn_error = is_connection_error(last_error)
+                        throttled = is_rate_limit_error(last_error)
+                        
+                        if lease is not None:
+                            # Key bị 429 hoặc lỗi liên tiếp sẽ bị loại cho đến khi bucket hồi lại
+                            cooldown = await self.scheduler.release(*lease, False, throttled=throttled)
+                            if cooldown:
+                                key_preview = self.scheduler.keys[lease[0]].preview
+                                self.log(f"⏸️ Key {key_preview} paused for {cooldown:.0f}s - other keys take over", "WARNING")
                         
                         if attempt < MAX_RETRIES:
-                            delay = calculate_retry_delay(attempt, is_conn_error)
+                            # 429: scheduler đã loại key, thử lại ngay trên key khác
+                            delay = 0.0 if throttled else calculate_retry_delay(attempt, is_conn_error)
                             
                             # Log retry with appropriate detail
                             if is_conn_error:
@@ -2029,11 +2963,8 @@ class MultiThreadProcessor:
                                     "WARNING"
                                 )
                                 # Recreate client/session on connection errors
-                                if attempt >= 2:
-                                    if self.config.live_session_enabled and hasattr(engine, 'recreate_session'):
-                                        engine.recreate_session()
-                                    elif hasattr(engine, 'recreate_client'):
-                                        engine.recreate_client()
+                                if attempt >= 2 and lease is not None:
+                                    self._recreate_engine(*lease)
                                     self.log(f"🔄 W{worker_id} Recreated client connection", "INFO")
                             else:
                                 self.log(
@@ -2045,18 +2976,6 @@ class MultiThreadProcessor:
                         else:
                             self.log(f"❌ W{worker_id} [{subtitle.index:04d}] FAILED after {MAX_RETRIES} attempts: {last_error}", "ERROR")
                             self.results[subtitle.index] = False
-                            consecutive_errors += 1
-                
-                # Check for too many consecutive errors (might indicate API key issue)
-                if consecutive_errors >= max_consecutive_errors:
-                    self.log(f"⚠️ W{worker_id} Too many consecutive errors - pausing for 30s...", "WARNING")
-                    await asyncio.sleep(30)
-                    consecutive_errors = 0
-                    # Recreate client/session dựa trên engine type
-                    if self.config.live_session_enabled and hasattr(engine, 'recreate_session'):
-                        engine.recreate_session()
-                    elif hasattr(engine, 'recreate_client'):
-                        engine.recreate_client()
                 
                 async with self.lock:
                     self.completed_tasks += 1
@@ -2574,6 +3493,7 @@ class StudioGUI(ctk.CTk):
         self.capcut_custom_voices = []  # List of custom voice dicts
         # Edge TTS settings
         self.edge_voices_cache = []  # Cached voice list
+        self.edge_voice_manager = None  # Indexed view of edge_voices_cache
         self.edge_last_fetch = 0  # Timestamp of last fetch
         # FFmpeg path - use get_default_ffmpeg_path() to correctly get the app directory
         self.ffmpeg_path = get_default_ffmpeg_path()
@@ -3636,6 +4556,7 @@ class StudioGUI(ctk.CTk):
         
         # Store state
         self.edge_srt_processing = False
+        self.edge_batch_engine = None
 
         # Store temp audio path
         self.edge_temp_audio = None
@@ -3655,6 +4576,7 @@ class StudioGUI(ctk.CTk):
         
         # Initialize VN TTS state variables
         self.vieneu_tts_instance = None
+        self.vieneu_model_id = ""
         self.vieneu_model_loaded = False
         self.vieneu_using_fast = False
         self.vieneu_ref_codes = None
@@ -4356,6 +5278,7 @@ class StudioGUI(ctk.CTk):
                     self.vieneu_using_fast = False
                 
                 self._vieneu_progress_log(90, "Hoàn tất khởi tạo")
+                self.vieneu_model_id = f"{backbone_repo}|{codec_repo}"
                 self.vieneu_model_loaded = True
                 
                 # Update UI
@@ -4557,10 +5480,9 @@ class StudioGUI(ctk.CTk):
         self.vieneu_status_lbl.configure(text="Đang xử lý...")
         
         def generate_thread():
+            writer = None
             try:
                 import torch
-                import numpy as np
-                import soundfile as sf
                 import tempfile
                 
                 # Get reference
@@ -4597,8 +5519,13 @@ class StudioGUI(ctk.CTk):
                     ref_codes = ref_codes.cpu().numpy()
                 
                 sr = VIENEU_SAMPLE_RATE
+                silence_seconds = 0.15
                 start_time = time.time()
-                all_audio = []
+                
+                # Audio is appended to the temp file as it is produced
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
+                    tmp_path = tmp.name
+                writer = StreamingWavWriter(tmp_path, rate=sr)
                 
                 # Use streaming if enabled and available
                 if use_streaming:
@@ -4610,8 +5537,6 @@ class StudioGUI(ctk.CTk):
                     chunks = split_text_into_chunks(text, chunk_size=VIENEU_MAX_CHARS_PER_CHUNK)
                     total_chunks = len(chunks)
                     
-                    silence_pad = np.zeros(int(sr * 0.15), dtype=np.float32)
-                    
                     for chunk_idx, chunk in enumerate(chunks):
                         chunk_text = chunk.text if hasattr(chunk, 'text') else str(chunk)
                         self.after(0, lambda idx=chunk_idx+1, total=total_chunks: self._vieneu_log(f"⚡ Streaming đoạn {idx}/{total}..."))
@@ -4625,6 +5550,11 @@ class StudioGUI(ctk.CTk):
                             for audio_chunk in self.vieneu_tts_instance.infer_stream(chunk_text, ref_codes, ref_text):
                                 if audio_chunk is not None and len(audio_chunk) > 0:
                                     chunk_audio.append(audio_chunk)
+                            
+                            stream_stats = getattr(self.vieneu_tts_instance, 'last_stream_stats', None)
+                            if stream_stats and stream_stats.get('rtf') is not None:
+                                self.after(0, lambda st=stream_stats: self._vieneu_log(
+                                    f"   ⏱️ Audio đầu tiên: {st['time_to_first_audio']:.2f}s, RTF: {st['rtf']:.2f}"))
                         except (AttributeError, NotImplementedError, Exception) as stream_err:
                             # Log appropriate message based on error type
                             if isinstance(stream_err, (AttributeError, NotImplementedError)):
@@ -4636,13 +5566,13 @@ class StudioGUI(ctk.CTk):
                             if wav is not None and len(wav) > 0:
                                 chunk_audio = [wav]
                         
-                        # Filter out empty arrays and concatenate
+                        # Only the current chunk is held in memory; it goes to disk once complete
                         chunk_audio = [arr for arr in chunk_audio if arr is not None and len(arr) > 0]
                         if chunk_audio:
-                            combined = np.concatenate(chunk_audio)
-                            all_audio.append(combined)
+                            for arr in chunk_audio:
+                                writer.write(arr)
                             if chunk_idx < total_chunks - 1:
-                                all_audio.append(silence_pad)
+                                writer.write_silence(silence_seconds)
                 else:
                     # Split long text into chunks using local function
                     chunks = split_text_into_chunks(text, chunk_size=VIENEU_MAX_CHARS_PER_CHUNK)
@@ -4650,8 +5580,6 @@ class StudioGUI(ctk.CTk):
                     
                     self.after(0, lambda: self._vieneu_log(f"📝 Chia thành {total_chunks} đoạn"))
                     
-                    silence_pad = np.zeros(int(sr * 0.15), dtype=np.float32)
-                    
                     # Process chunks - chunks are TextChunk objects with .text attribute
                     for i, chunk in enumerate(chunks):
                         self.after(0, lambda idx=i+1, total=total_chunks: self._vieneu_log(f"⏳ Đang xử lý đoạn {idx}/{total}..."))
@@ -4662,25 +5590,25 @@ class StudioGUI(ctk.CTk):
                         wav = self.vieneu_tts_instance.infer(chunk_text, ref_codes, ref_text)
                         
                         if wav is not None and len(wav) > 0:
-                            all_audio.append(wav)
+                            writer.write(wav)
                             if i < total_chunks - 1:
-                                all_audio.append(silence_pad)
+                                writer.write_silence(silence_seconds)
+                
+                writer.close()
                 
-                if not all_audio:
+                if writer.frames_written == 0:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
                     self.after(0, lambda: self._vieneu_log("❌ Không tạo được audio!"))
                     self.after(0, lambda: self.vieneu_status_lbl.configure(text="Lỗi!"))
                     return
                 
-                # Concatenate all audio
-                final_wav = np.concatenate(all_audio)
-                
-                # Save to temp file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-                    sf.write(tmp.name, final_wav, sr)
-                    self.vieneu_temp_audio = tmp.name
+                self.vieneu_temp_audio = tmp_path
                 
                 process_time = time.time() - start_time
-                duration = len(final_wav) / sr
+                duration = writer.duration
                 speed = duration / process_time if process_time > 0 else 0
                 
                 self.after(0, lambda: self._vieneu_log(f"✅ Hoàn tất! ({process_time:.2f}s, {speed:.2f}x realtime)"))
@@ -4694,6 +5622,8 @@ class StudioGUI(ctk.CTk):
                 self.after(0, lambda: self._vieneu_log(f"❌ Lỗi: {str(e)}"))
                 self.after(0, lambda: self.vieneu_status_lbl.configure(text="Lỗi!"))
             finally:
+                if writer is not None:
+                    writer.close()
                 self.after(0, lambda: self.btn_vieneu_generate.configure(state="normal"))
         
         threading.Thread(target=generate_thread, daemon=True).start()
@@ -4765,7 +5695,6 @@ class StudioGUI(ctk.CTk):
         """Worker thread for file processing"""
         try:
             import torch
-            import numpy as np
             import soundfile as sf
             
             # Get reference voice (validation done via _vieneu_validate_voice_settings in _vieneu_process_file)
@@ -4815,7 +5744,7 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self._vieneu_log(f"🚀 Bắt đầu xử lý {total_files} file..."))
             
             sr = VIENEU_SAMPLE_RATE
-            silence_pad = np.zeros(int(sr * 0.15), dtype=np.float32)
+            silence_seconds = 0.15
             ffmpeg_path = getattr(self, 'ffmpeg_path', get_default_ffmpeg_path())
             
             for file_idx, file_path in enumerate(all_files):
@@ -4854,53 +5783,52 @@ class StudioGUI(ctk.CTk):
                     self.after(0, lambda c=len(text_items): self._vieneu_log(f"  📝 {c} đoạn"))
                     
                     # Process chunks
-                    all_audio = []
-                    chunk_files = []
-                    temp_dir = os.path.join(output_dir, f"_temp_{base_name}")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    
-                    for i, chunk_item in enumerate(text_items):
-                        if not self.vieneu_processing:
-                            break
-                        
-                        # Handle both TextChunk objects and plain strings
-                        if is_text_chunk and hasattr(chunk_item, 'text'):
-                            chunk_text = chunk_item.text
-                        else:
-                            chunk_text = str(chunk_item)
-                        
-                        try:
-                            wav = self.vieneu_tts_instance.infer(chunk_text, ref_codes, ref_text)
-                            
+                    chunk_files = []
+                    temp_dir = os.path.join(output_dir, f"_temp_{base_name}")
+                    # Chunk files are only kept when not merging or when asked to
+                    keep_chunks = not (merge_after and delete_chunks)
+                    if keep_chunks:
+                        os.makedirs(temp_dir, exist_ok=True)
+                    
+                    # Handle both TextChunk objects and plain strings
+                    chunk_texts = [
+                        chunk_item.text if is_text_chunk and hasattr(chunk_item, 'text') else str(chunk_item)
+                        for chunk_item in text_items
+                    ]
+                    
+                    def on_chunk_done(done, total, f_idx=file_idx):
+                        progress = (f_idx + done / total) / total_files
+                        self.after(0, lambda p=progress: self.vieneu_progress.set(p))
+                        self.after(0, lambda i=f_idx+1, d=done: self.vieneu_file_status.configure(
+                            text=f"File {i}/{total_files} - Đoạn {d}/{total}"))
+                    
+                    # Merged output is appended chunk by chunk, so no chunk stays in memory
+                    output_file = os.path.join(output_dir, f"{base_name}.wav")
+                    writer = StreamingWavWriter(output_file, rate=sr) if merge_after else None
+                    try:
+                        for i, wav in self._vieneu_iter_chunk_audio(chunk_texts, ref_codes, ref_text, on_chunk_done):
                             if wav is not None and len(wav) > 0:
                                 # Save chunk
-                                chunk_file = os.path.join(temp_dir, f"chunk_{i:04d}.wav")
-                                sf.write(chunk_file, wav, sr)
-                                chunk_files.append(chunk_file)
-                                all_audio.append(wav)
-                                if i < len(text_items) - 1:
-                                    all_audio.append(silence_pad)
-                        except Exception as e:
-                            self.after(0, lambda err=str(e), idx=i: self._vieneu_log(f"  ⚠️ Chunk [{idx}] lỗi: {err}"))
+                                if keep_chunks:
+                                    chunk_file = os.path.join(temp_dir, f"chunk_{i:04d}.wav")
+                                    sf.write(chunk_file, wav, sr)
+                                    chunk_files.append(chunk_file)
+                                if writer is not None:
+                                    writer.write(wav)
+                                    if i < len(text_items) - 1:
+                                        writer.write_silence(silence_seconds)
+                    finally:
+                        if writer is not None:
+                            writer.close()
                     
                     # Merge if requested
-                    if merge_after and all_audio:
-                        output_file = os.path.join(output_dir, f"{base_name}.wav")
-                        final_wav = np.concatenate(all_audio)
-                        sf.write(output_file, final_wav, sr)
+                    if writer is not None and writer.frames_written > 0:
                         self.after(0, lambda f=output_file: self._vieneu_log(f"  ✅ Đã tạo: {os.path.basename(f)}"))
-                        
-                        # Clean up chunks
-                        if delete_chunks:
-                            for cf in chunk_files:
-                                try:
-                                    os.remove(cf)
-                                except OSError:
-                                    pass
-                            try:
-                                os.rmdir(temp_dir)
-                            except OSError:
-                                pass
+                    elif writer is not None:
+                        try:
+                            os.remove(output_file)
+                        except OSError:
+                            pass
                     elif chunk_files:
                         self.after(0, lambda n=len(chunk_files): self._vieneu_log(f"  ✅ Đã tạo {n} chunks"))
                     
@@ -4916,6 +5844,7 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self._vieneu_log(f"\n{'='*40}"))
             self.after(0, lambda: self._vieneu_log(f"✅ Hoàn thành!"))
             self.after(0, lambda: self._vieneu_log(f"📁 Output: {output_dir}"))
+            self.after(0, lambda m=get_synthesis_cache().describe(): self._vieneu_log(f"💾 Cache: {m}"))
             
         except Exception as e:
             import traceback
@@ -4927,6 +5856,117 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self.btn_vieneu_stop_process.configure(state="disabled"))
             self.after(0, lambda: self.vieneu_file_status.configure(text="Hoàn thành!"))
 
+    def _vieneu_iter_chunk_audio(self, chunk_texts, ref_codes, ref_text, on_chunk_done=None):
+        """
+        Synthesize chunks and yield (index, wav) in original order.
+        
+        With a backend that has `infer_batch` (FastVieNeuTTS), the document is
+        taken in windows of VIENEU_SORT_WINDOW_BATCHES batches; inside a window
+        chunks are sorted by length and synthesized in batches of
+        `max_batch_size`, so each batch holds prompts of similar length while at
+        most one window of finished audio waits for its turn. Other backends run
+        one chunk at a time. Failed chunks are logged and yield wav=None.
+        
+        Args:
+            chunk_texts: Chunk texts in document order
+            ref_codes: Reference codes
+            ref_text: Reference text
+            on_chunk_done: Called with (done, total) after each chunk finishes
+        """
+        tts = self.vieneu_tts_instance
+        total = len(chunk_texts)
+        done = 0
+        
+        # Chunks already in the synthesis cache skip the model entirely
+        cache = get_synthesis_cache()
+        voice_id = SynthesisCache.fingerprint(np.asarray(ref_codes).tobytes(), ref_text)
+        keys = [cache.make_key("vieneu", voice_id, text, model=self.vieneu_model_id) for text in chunk_texts]
+        # Only the keys are noted here; the audio is read when its turn comes
+        cached = {idx for idx, key in enumerate(keys) if key in cache}
+        if cached:
+            done = len(cached)
+            self.after(0, lambda c=done: self._vieneu_log(f"  💾 {c} đoạn lấy từ cache"))
+            if on_chunk_done:
+                on_chunk_done(done, total)
+        
+        def store(idx, wav):
+            if wav is not None and len(wav) > 0:
+                cache.put(keys[idx], np.asarray(wav, dtype=np.float32).tobytes())
+        
+        def infer_one(idx):
+            try:
+                return tts.infer(chunk_texts[idx], ref_codes, ref_text)
+            except Exception as e:
+                self.after(0, lambda err=str(e), i=idx: self._vieneu_log(f"  ⚠️ Chunk [{i}] lỗi: {err}"))
+                return None
+        
+        def load_cached(idx):
+            data = cache.get(keys[idx])
+            if data is not None:
+                return np.frombuffer(data, dtype=np.float32)
+            # Evicted since the lookup above
+            wav = infer_one(idx)
+            store(idx, wav)
+            return wav
+        
+        batch_size = getattr(tts, 'max_batch_size', 1) if hasattr(tts, 'infer_batch') else 1
+        if batch_size <= 1:
+            for idx in range(total):
+                if not self.vieneu_processing:
+                    return
+                if idx in cached:
+                    yield idx, load_cached(idx)
+                    continue
+                wav = infer_one(idx)
+                store(idx, wav)
+                done += 1
+                if on_chunk_done:
+                    on_chunk_done(done, total)
+                yield idx, wav
+            return
+        
+        # Length-sorted batches within a window; results buffered until their turn comes
+        window = batch_size * VIENEU_SORT_WINDOW_BATCHES
+        pending = {}
+        next_idx = 0
+        
+        def drain():
+            nonlocal next_idx
+            while next_idx in pending or next_idx in cached:
+                # Stop also applies while a long cached stretch is replayed
+                if not self.vieneu_processing:
+                    return
+                wav = pending.pop(next_idx) if next_idx in pending else load_cached(next_idx)
+                yield next_idx, wav
+                next_idx += 1
+        
+        for window_start in range(0, total, window):
+            yield from drain()
+            window_end = min(window_start + window, total)
+            order = sorted(
+                (i for i in range(window_start, window_end) if i not in cached),
+                key=lambda i: len(chunk_texts[i])
+            )
+            for start in range(0, len(order), batch_size):
+                if not self.vieneu_processing:
+                    return
+                batch = order[start:start + batch_size]
+                try:
+                    wavs = tts.infer_batch([chunk_texts[i] for i in batch], ref_codes, ref_text, max_batch_size=batch_size)
+                except Exception as e:
+                    self.after(0, lambda err=str(e): self._vieneu_log(f"  ⚠️ Batch lỗi, xử lý từng đoạn: {err}"))
+                    wavs = [infer_one(i) for i in batch]
+                
+                for idx, wav in zip(batch, wavs):
+                    store(idx, wav)
+                    pending[idx] = wav
+                    done += 1
+                    if on_chunk_done:
+                        on_chunk_done(done, total)
+                
+                yield from drain()
+        yield from drain()
+
     def _vieneu_stop_processing(self):
         """Stop file processing"""
         self.vieneu_processing = False
@@ -5214,21 +6254,8 @@ class StudioGUI(ctk.CTk):
             # Get language code from display name
             lang_code = EDGE_TTS_LANGUAGE_MAP.get(lang_filter, "") if lang_filter != "Tất cả" else ""
             
-            # Filter voices
-            filtered_voices = []
-            for voice in voices:
-                voice_lang = voice.get('Language', '')
-                voice_gender = voice.get('Gender', '')
-                
-                # Language filter
-                if lang_code and voice_lang != lang_code:
-                    continue
-                
-                # Gender filter (Edge uses "Male"/"Female")
-                if gender_filter not in ["Tất cả", ""] and voice_gender != gender_filter:
-                    continue
-                
-                filtered_voices.append(voice)
+            # Filter voices (Edge uses "Male"/"Female")
+            filtered_voices = self._find_edge_voices(lang_code, gender_filter)
             
             # Limit to 100 for performance (increased from 50 because filtering reduces total count)
             for voice in filtered_voices[:100]:
@@ -5792,8 +6819,6 @@ class StudioGUI(ctk.CTk):
                         
                         if not chunk_success:
                             raise ValueError(f"Chunk {chunk.index} failed after {MAX_RETRIES} attempts")
-                        
-                        time.sleep(CAPCUT_RATE_LIMIT_DELAY)
                     
                     if chunk_files:
                         merge_success = merge_mp3_files_ffmpeg(chunk_files, output_file, ffmpeg_path)
@@ -6128,8 +7153,6 @@ class StudioGUI(ctk.CTk):
                         else:
                             err_msg = error.get('error', 'Unknown') if error else 'Unknown'
                             self.after(0, lambda e=err_msg, i=chunk.index: self._capcut_log(f"  ❌ Chunk [{i}] lỗi: {e}"))
-                        
-                        time.sleep(CAPCUT_RATE_LIMIT_DELAY)
                     
                     if chunk_files:
                         # Merge all chunks
@@ -6373,7 +7396,7 @@ class StudioGUI(ctk.CTk):
                 self.after(0, lambda: self._capcut_log("❌ Không có nội dung nào trong file!"))
                 return
             
-            self.after(0, lambda: self._capcut_log(f"🚀 Bắt đầu xử lý {total} {'dòng' if is_subtitle else 'chunks'} (tuần tự)..."))
+            self.after(0, lambda: self._capcut_log(f"🚀 Bắt đầu xử lý {total} {'dòng' if is_subtitle else 'chunks'} (tối đa {CAPCUT_MAX_CONCURRENCY} luồng)..."))
             masked_session = f"{session_id[:4]}****({len(session_id)} chars)" if len(session_id) > 4 else "****"
             self.after(0, lambda m=masked_session: self._capcut_log(f"[DEBUG] Session ID: {m}"))
             self.after(0, lambda: self._capcut_log(f"[DEBUG] Voice ID: {voice_id}"))
@@ -6384,100 +7407,31 @@ class StudioGUI(ctk.CTk):
             failed_count = 0
             results = []
             
-            # Process sequentially
-            for sub in subtitles:
-                if not self.capcut_srt_processing:
-                    self.after(0, lambda: self._capcut_log("⏹ Đã dừng bởi người dùng"))
-                    break
-                
-                # For long text in each subtitle line, apply chunking
-                text = sub.text
-                if len(text) > CAPCUT_LONG_TEXT_THRESHOLD:
-                    # Need to chunk this line
-                    line_chunks = split_text_smart(text, max_chars=CAPCUT_MAX_CHUNK_SIZE)
-                    chunk_files = []
-                    
-                    for chunk in line_chunks:
-                        if not self.capcut_srt_processing:
-                            break
-                        chunk_file = os.path.join(output_dir, f"{sub.index:04d}_chunk{chunk.index:02d}.mp3")
-                        
-                        # Retry logic for each chunk
-                        for attempt in range(1, MAX_RETRIES + 1):
-                            success, error = capcut_create_tts(chunk.text, voice_id, session_id, chunk_file, debug=False)
-                            if success and os.path.exists(chunk_file) and os.path.getsize(chunk_file) > 0:
-                                chunk_files.append(chunk_file)
-                                break
-                            elif attempt < MAX_RETRIES:
-                                delay = calculate_retry_delay(attempt, is_connection_error(str(error)))
-                                time.sleep(delay)
-                        
-                        time.sleep(CAPCUT_RATE_LIMIT_DELAY)
+            # Lines run on a pool sized for the limiter's maximum concurrency; the shared
+            # AIMD limiter decides how many requests are actually in flight at a time
+            with concurrent.futures.ThreadPoolExecutor(max_workers=CAPCUT_MAX_CONCURRENCY) as pool:
+                futures = {
+                    pool.submit(self._capcut_srt_line, sub, output_dir, voice_id, session_id, ffmpeg_path): sub
+                    for sub in subtitles
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    if not self.capcut_srt_processing:
+                        self.after(0, lambda: self._capcut_log("⏹ Đã dừng bởi người dùng"))
+                        for pending_future in futures:
+                            pending_future.cancel()
+                        break
                     
-                    # Merge chunks for this line
-                    if chunk_files:
-                        output_file = os.path.join(output_dir, f"{sub.index:04d}.mp3")
-                        merge_success = merge_mp3_files_ffmpeg(chunk_files, output_file, ffmpeg_path)
-                        if merge_success:
-                            results.append((sub.index, output_file))
-                            success_count += 1
-                            # Clean up chunk files
-                            for cf in chunk_files:
-                                try:
-                                    os.remove(cf)
-                                except:
-                                    pass
-                        else:
-                            failed_count += 1
+                    output_file = future.result()
+                    if output_file:
+                        success_count += 1
+                        results.append((futures[future].index, output_file))
                     else:
                         failed_count += 1
-                else:
-                    output_file = os.path.join(output_dir, f"{sub.index:04d}.mp3")
-                    self.after(0, lambda i=sub.index, t=text[:30]: self._capcut_log(f"📝 [{i}] Đang xử lý: {t}..."))
-                    
-                    # Retry logic for Capcut voice creation
-                    item_success = False
-                    last_error = None
-                    for attempt in range(1, MAX_RETRIES + 1):
-                        if not self.capcut_srt_processing:
-                            break
-                        
-                        success, error = capcut_create_tts(text, voice_id, session_id, output_file, debug=False)
-                        
-                        if success:
-                            # Verify file was created
-                            if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-                                success_count += 1
-                                results.append((sub.index, output_file))
-                                item_success = True
-                                if attempt > 1:
-                                    self.after(0, lambda i=sub.index, a=attempt-1: self._capcut_log(f"✅ [{i}] Thành công sau {a} lần thử lại"))
-                                else:
-                                    self.after(0, lambda i=sub.index: self._capcut_log(f"✅ [{i}] Thành công"))
-                                break
-                            else:
-                                last_error = {"error": "Audio file empty or not created"}
-                        else:
-                            last_error = error
-                        
-                        # Retry if not last attempt
-                        if attempt < MAX_RETRIES:
-                            err_msg = last_error.get('error', 'Unknown') if last_error else 'Unknown error'
-                            delay = calculate_retry_delay(attempt, is_connection_error(err_msg))
-                            self.after(0, lambda i=sub.index, a=attempt, e=err_msg[:ERROR_MSG_MAX_LENGTH]: self._capcut_log(f"⚠️ [{i}] Lần thử {a} thất bại: {e}... Đang thử lại"))
-                            time.sleep(delay)
-                    
-                    if not item_success:
-                        failed_count += 1
-                        err_msg = last_error.get('error', 'Unknown') if last_error else 'Unknown error'
-                        self.after(0, lambda i=sub.index, e=err_msg: self._capcut_log(f"❌ [{i}] Thất bại sau {MAX_RETRIES} lần thử: {e}"))
                     
-                    time.sleep(CAPCUT_RATE_LIMIT_DELAY)
-                
-                completed += 1
-                progress = completed / total
-                self.after(0, lambda p=progress: self.capcut_srt_progress.set(p))
-                self.after(0, lambda c=completed, t=total: self.capcut_srt_status.configure(text=f"Đang xử lý {c}/{t}"))
+                    completed += 1
+                    progress = completed / total
+                    self.after(0, lambda p=progress: self.capcut_srt_progress.set(p))
+                    self.after(0, lambda c=completed, t=total: self.capcut_srt_status.configure(text=f"Đang xử lý {c}/{t}"))
             
             # Sort results by index
             results.sort(key=lambda x: x[0])
@@ -6497,6 +7451,8 @@ class StudioGUI(ctk.CTk):
             
             self.after(0, lambda: self._capcut_log(f"\n{'='*40}"))
             self.after(0, lambda s=success_count, t=total, f=failed_count: self._capcut_log(f"✅ Hoàn thành! Thành công: {s}/{t}, Thất bại: {f}"))
+            self.after(0, lambda m=get_capcut_limiter().describe(): self._capcut_log(f"📈 Capcut rate: {m}"))
+            self.after(0, lambda m=get_synthesis_cache().describe(): self._capcut_log(f"💾 Cache: {m}"))
             
             if results:
                 self.after(0, lambda: self._capcut_log(f"📁 Files đã lưu tại: {output_dir}"))
@@ -6511,6 +7467,79 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self.btn_capcut_stop_srt.configure(state="disabled"))
             self.after(0, lambda: self.capcut_srt_status.configure(text="Hoàn thành!"))
 
+    def _capcut_srt_line(self, sub, output_dir, voice_id, session_id, ffmpeg_path):
+        """Synthesize one subtitle line (chunked if long). Returns the output file, or None on failure"""
+        # For long text in each subtitle line, apply chunking
+        text = sub.text
+        if len(text) > CAPCUT_LONG_TEXT_THRESHOLD:
+            # Need to chunk this line
+            line_chunks = split_text_smart(text, max_chars=CAPCUT_MAX_CHUNK_SIZE)
+            chunk_files = []
+            
+            for chunk in line_chunks:
+                if not self.capcut_srt_processing:
+                    break
+                chunk_file = os.path.join(output_dir, f"{sub.index:04d}_chunk{chunk.index:02d}.mp3")
+                
+                # Retry logic for each chunk
+                for attempt in range(1, MAX_RETRIES + 1):
+                    success, error = capcut_create_tts(chunk.text, voice_id, session_id, chunk_file, debug=False)
+                    if success and os.path.exists(chunk_file) and os.path.getsize(chunk_file) > 0:
+                        chunk_files.append(chunk_file)
+                        break
+                    elif attempt < MAX_RETRIES:
+                        delay = calculate_retry_delay(attempt, is_connection_error(str(error)))
+                        time.sleep(delay)
+            
+            # Merge chunks for this line
+            if not chunk_files:
+                return None
+            output_file = os.path.join(output_dir, f"{sub.index:04d}.mp3")
+            if not merge_mp3_files_ffmpeg(chunk_files, output_file, ffmpeg_path):
+                return None
+            # Clean up chunk files
+            for cf in chunk_files:
+                try:
+                    os.remove(cf)
+                except:
+                    pass
+            return output_file
+        
+        output_file = os.path.join(output_dir, f"{sub.index:04d}.mp3")
+        self.after(0, lambda i=sub.index, t=text[:30]: self._capcut_log(f"📝 [{i}] Đang xử lý: {t}..."))
+        
+        # Retry logic for Capcut voice creation
+        last_error = None
+        for attempt in range(1, MAX_RETRIES + 1):
+            if not self.capcut_srt_processing:
+                break
+            
+            success, error = capcut_create_tts(text, voice_id, session_id, output_file, debug=False)
+            
+            if success:
+                # Verify file was created
+                if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+                    if attempt > 1:
+                        self.after(0, lambda i=sub.index, a=attempt-1: self._capcut_log(f"✅ [{i}] Thành công sau {a} lần thử lại"))
+                    else:
+                        self.after(0, lambda i=sub.index: self._capcut_log(f"✅ [{i}] Thành công"))
+                    return output_file
+                else:
+                    last_error = {"error": "Audio file empty or not created"}
+            else:
+                last_error = error
+            
+            # Retry if not last attempt
+            if attempt < MAX_RETRIES:
+                err_msg = last_error.get('error', 'Unknown') if last_error else 'Unknown error'
+                delay = calculate_retry_delay(attempt, is_connection_error(err_msg))
+                self.after(0, lambda i=sub.index, a=attempt, e=err_msg[:ERROR_MSG_MAX_LENGTH]: self._capcut_log(f"⚠️ [{i}] Lần thử {a} thất bại: {e}... Đang thử lại"))
+                time.sleep(delay)
+        
+        err_msg = last_error.get('error', 'Unknown') if last_error else 'Unknown error'
+        self.after(0, lambda i=sub.index, e=err_msg: self._capcut_log(f"❌ [{i}] Thất bại sau {MAX_RETRIES} lần thử: {e}"))
+        return None
+
     def _capcut_folder_worker(self, folder_path, output_dir, voice_id, session_id, ffmpeg_path="ffmpeg.exe", merge_after=False):
         """Worker thread for processing folder of txt/docx files"""
         try:
@@ -6557,33 +7586,11 @@ class StudioGUI(ctk.CTk):
                     file_temp_dir = os.path.join(output_dir, f"_temp_{base_name}")
                     os.makedirs(file_temp_dir, exist_ok=True)
                     
-                    chunk_files = []
-                    
-                    for chunk in chunks:
-                        if not self.capcut_srt_processing:
-                            break
-                        
-                        chunk_file = os.path.join(file_temp_dir, f"chunk_{chunk.index:04d}.mp3")
-                        
-                        # Retry logic for each chunk
-                        chunk_success = False
-                        for attempt in range(1, MAX_RETRIES + 1):
-                            success, error = capcut_create_tts(chunk.text, voice_id, session_id, chunk_file, debug=False)
-                            
-                            if success and os.path.exists(chunk_file) and os.path.getsize(chunk_file) > 0:
-                                chunk_files.append(chunk_file)
-                                chunk_success = True
-                                break
-                            elif attempt < MAX_RETRIES:
-                                err_msg = error.get('error', 'Unknown') if error else 'Unknown'
-                                delay = calculate_retry_delay(attempt, is_connection_error(err_msg))
-                                time.sleep(delay)
-                        
-                        if not chunk_success:
-                            err_msg = error.get('error', 'Unknown') if error else 'Unknown'
-                            self.after(0, lambda e=err_msg, i=chunk.index: self._capcut_log(f"  ❌ Chunk [{i}] lỗi sau {MAX_RETRIES} lần thử: {e}"))
-                        
-                        time.sleep(CAPCUT_RATE_LIMIT_DELAY)
+                    # Chunks run concurrently (up to the limiter's concurrency) but are merged in order
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=CAPCUT_MAX_CONCURRENCY) as pool:
+                        chunk_results = list(pool.map(
+                            lambda c: self._capcut_folder_chunk(c, file_temp_dir, voice_id, session_id), chunks))
+                    chunk_files = [cf for cf in chunk_results if cf]
                     
                     # Merge chunks into single file
                     if chunk_files:
@@ -6631,6 +7638,8 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self._capcut_log(f"\n{'='*40}"))
             self.after(0, lambda n=len(all_output_files), t=total_files: 
                       self._capcut_log(f"✅ Hoàn thành! Đã tạo {n}/{t} file"))
+            self.after(0, lambda m=get_capcut_limiter().describe(): self._capcut_log(f"📈 Capcut rate: {m}"))
+            self.after(0, lambda m=get_synthesis_cache().describe(): self._capcut_log(f"💾 Cache: {m}"))
             self.after(0, lambda: self._capcut_log(f"📁 Files đã lưu tại: {output_dir}"))
             
         except Exception as e:
@@ -6643,6 +7652,29 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self.btn_capcut_stop_srt.configure(state="disabled"))
             self.after(0, lambda: self.capcut_srt_status.configure(text="Hoàn thành!"))
 
+    def _capcut_folder_chunk(self, chunk, temp_dir, voice_id, session_id):
+        """Synthesize one chunk of a folder file. Returns the chunk file, or None on failure"""
+        if not self.capcut_srt_processing:
+            return None
+        
+        chunk_file = os.path.join(temp_dir, f"chunk_{chunk.index:04d}.mp3")
+        
+        # Retry logic for each chunk
+        error = None
+        for attempt in range(1, MAX_RETRIES + 1):
+            success, error = capcut_create_tts(chunk.text, voice_id, session_id, chunk_file, debug=False)
+            
+            if success and os.path.exists(chunk_file) and os.path.getsize(chunk_file) > 0:
+                return chunk_file
+            elif attempt < MAX_RETRIES:
+                err_msg = error.get('error', 'Unknown') if error else 'Unknown'
+                delay = calculate_retry_delay(attempt, is_connection_error(err_msg))
+                time.sleep(delay)
+        
+        err_msg = error.get('error', 'Unknown') if error else 'Unknown'
+        self.after(0, lambda e=err_msg, i=chunk.index: self._capcut_log(f"  ❌ Chunk [{i}] lỗi sau {MAX_RETRIES} lần thử: {e}"))
+        return None
+
     def _capcut_stop_srt(self):
         """Stop SRT processing"""
         self.capcut_srt_processing = False
@@ -6651,14 +7683,17 @@ class StudioGUI(ctk.CTk):
     # ==========================================================================
     # EDGE TTS HELPER METHODS
     # ==========================================================================
-    def _load_edge_voices(self):
-        """Load voices from Edge TTS API"""
+    def _load_edge_voices(self, force_refresh=False):
+        """Load voices from Edge TTS API (served from the voice cache while fresh)"""
         self._edge_log("Đang tải danh sách voice từ Microsoft...")
         self.edge_voice_count_lbl.configure(text="Đang tải...")
         
         def load_thread():
-            voices = fetch_edge_voices()
+            from edge.voices import VoicesManager
+            
+            voices = fetch_edge_voices(force_refresh=force_refresh)
             if voices:
+                self.edge_voice_manager = VoicesManager.from_voices(voices)
                 self.edge_voices_cache = voices
                 self.edge_last_fetch = time.time()
                 self.after(0, lambda: self._edge_log(f"✅ Đã tải {len(voices)} voices"))
@@ -6696,6 +7731,18 @@ class StudioGUI(ctk.CTk):
             )
             rb.pack(anchor="w", pady=2)
 
+    def _find_edge_voices(self, lang_code="", gender=""):
+        """Find cached Edge voices by language code and gender using the voice index"""
+        criteria = {}
+        if lang_code:
+            criteria['Language'] = lang_code
+        if gender and gender != "Tất cả":
+            criteria['Gender'] = gender
+        
+        if self.edge_voice_manager is None:
+            return [v for v in self.edge_voices_cache if all(v.get(k) == val for k, val in criteria.items())]
+        return self.edge_voice_manager.find(**criteria)
+
     def _filter_edge_voices(self, _=None):
         """Filter Edge voices based on language and gender"""
         # SỬA: Lấy giá trị từ biến StringVar thay vì ComboBox.get()
@@ -6705,18 +7752,7 @@ class StudioGUI(ctk.CTk):
         # Convert display name to language code
         lang_code = EDGE_TTS_LANGUAGE_MAP.get(lang_display, "")
         
-        filtered = []
-        for voice in self.edge_voices_cache:
-            voice_lang = voice.get('Language', '')
-            voice_gender = voice.get('Gender', '')
-            
-            if lang_code and voice_lang != lang_code:
-                continue
-            if gender != "Tất cả" and voice_gender != gender:
-                continue
-            filtered.append(voice)
-        
-        self._populate_edge_voice_list(filtered)
+        self._populate_edge_voice_list(self._find_edge_voices(lang_code, gender))
 
     def _edge_log(self, msg):
         """Add message to Edge log"""
@@ -7032,8 +8068,6 @@ class StudioGUI(ctk.CTk):
     def _edge_srt_worker(self, file_path, output_dir, voice, rate, volume, pitch, workers, ffmpeg_path="ffmpeg.exe", merge_after=False):
         """Worker thread for Edge TTS SRT/text file processing with parallel workers and chunking support"""
         try:
-            from edge.communicate import Communicate
-            
             ext = os.path.splitext(file_path)[1].lower()
             base_name = os.path.splitext(os.path.basename(file_path))[0]
             
@@ -7057,83 +8091,39 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self._edge_log(f"🚀 Bắt đầu xử lý {total} {'dòng' if is_subtitle else 'chunks'} với {workers} workers..."))
             self.after(0, lambda: self.edge_srt_status.configure(text=f"Đang xử lý 0/{total}"))
             
-            completed = 0
-            success_count = 0
             failed_count = 0
-            lock = threading.Lock()
-            results = []
             
-            def process_single(sub):
-                nonlocal completed, success_count, failed_count
-                
-                if not self.edge_srt_processing:
-                    return None
+            def on_progress(event, info):
+                nonlocal failed_count
                 
-                text = sub.text
-                output_file = os.path.join(output_dir, f"{sub.index:04d}.mp3")
-                
-                # Retry logic for voice creation
-                max_retries = MAX_RETRIES
-                last_error = None
-                
-                for attempt in range(1, max_retries + 1):
-                    if not self.edge_srt_processing:
-                        return None
-                    
-                    loop = None
-                    try:
-                        # For long text in subtitle line, Edge TTS handles it internally
-                        communicate = Communicate(text, voice, rate=rate, volume=volume, pitch=pitch)
-                        
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        loop.run_until_complete(communicate.save(output_file))
-                        
-                        # Verify file was created and has content
-                        if not os.path.exists(output_file) or os.path.getsize(output_file) < MIN_AUDIO_FILE_SIZE:
-                            raise ValueError("Audio file empty or not created")
-                        
-                        with lock:
-                            completed += 1
-                            success_count += 1
-                            results.append((sub.index, output_file))
-                            progress = completed / total
-                            self.after(0, lambda p=progress: self.edge_srt_progress.set(p))
-                            self.after(0, lambda c=completed, t=total: self.edge_srt_status.configure(text=f"Đang xử lý {c}/{t}"))
-                        
-                        if attempt > 1:
-                            self.after(0, lambda i=sub.index, a=attempt-1: self._edge_log(f"✅ [{i}] Thành công sau {a} lần thử lại"))
-                        
-                        return output_file
-                        
-                    except Exception as e:
-                        last_error = str(e)
-                        if attempt < max_retries:
-                            delay = calculate_retry_delay(attempt, is_connection_error(last_error))
-                            self.after(0, lambda i=sub.index, a=attempt, m=max_retries, err=last_error[:ERROR_MSG_MAX_LENGTH]: 
-                                      self._edge_log(f"⚠️ [{i}] Lần thử {a}/{m} thất bại: {err}... Đang thử lại"))
-                            time.sleep(delay)
-                    finally:
-                        # CRITICAL: Properly close and cleanup the event loop to prevent CPU leak
-                        cleanup_event_loop(loop)
+                if event == "retry":
+                    self.after(0, lambda i=info['key'], a=info['attempt'], m=info['max_retries'], err=info['error'][:ERROR_MSG_MAX_LENGTH]:
+                              self._edge_log(f"⚠️ [{i}] Lần thử {a}/{m} thất bại: {err}... Đang thử lại"))
+                    return
                 
-                # All retries failed
-                with lock:
-                    completed += 1
+                if event == "done" and info['attempt'] > 1:
+                    self.after(0, lambda i=info['key'], a=info['attempt']-1: self._edge_log(f"✅ [{i}] Thành công sau {a} lần thử lại"))
+                elif event == "failed":
                     failed_count += 1
-                    self.after(0, lambda err=last_error, i=sub.index: self._edge_log(f"❌ [{i}] Thất bại sau {max_retries} lần thử: {err}"))
-                    progress = completed / total
-                    self.after(0, lambda p=progress: self.edge_srt_progress.set(p))
-                    self.after(0, lambda c=completed, t=total: self.edge_srt_status.configure(text=f"Đang xử lý {c}/{t}"))
-                return None
+                    self.after(0, lambda err=info['error'], i=info['key'], m=info['max_retries']: self._edge_log(f"❌ [{i}] Thất bại sau {m} lần thử: {err}"))
+                
+                progress = info['completed'] / info['total']
+                self.after(0, lambda p=progress: self.edge_srt_progress.set(p))
+                self.after(0, lambda c=info['completed'], t=info['total']: self.edge_srt_status.configure(text=f"Đang xử lý {c}/{t}"))
             
-            # Process with thread pool
-            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-                futures = {executor.submit(process_single, sub): sub for sub in subtitles}
-                for future in concurrent.futures.as_completed(futures):
-                    if not self.edge_srt_processing:
-                        break
-                    future.result()  # Wait for completion
+            # (key, text, output_file) jobs; Edge TTS splits long subtitle lines internally
+            jobs = [(sub.index, sub.text, os.path.join(output_dir, f"{sub.index:04d}.mp3")) for sub in subtitles]
+            
+            # Process all jobs on one event loop
+            with EdgeBatchEngine(voice, rate, volume, pitch, concurrency=workers, on_progress=on_progress) as engine:
+                self.edge_batch_engine = engine
+                if not self.edge_srt_processing:
+                    engine.cancel()
+                outputs = engine.run(jobs)
+            self.edge_batch_engine = None
+            
+            results = list(outputs.items())
+            success_count = len(results)
             
             # Sort results by index
             results.sort(key=lambda x: x[0])
@@ -7153,6 +8143,7 @@ class StudioGUI(ctk.CTk):
             
             self.after(0, lambda: self._edge_log(f"\n{'='*40}"))
             self.after(0, lambda s=success_count, t=total, f=failed_count: self._edge_log(f"✅ Hoàn thành! Thành công: {s}/{t}, Thất bại: {f}"))
+            self.after(0, lambda m=get_synthesis_cache().describe(): self._edge_log(f"💾 Cache: {m}"))
             
             if results:
                 self.after(0, lambda: self._edge_log(f"📁 Files đã lưu tại: {output_dir}"))
@@ -7161,15 +8152,17 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self._edge_log(f"❌ Lỗi: {str(e)}"))
         finally:
             self.edge_srt_processing = False
+            self.edge_batch_engine = None
             self.after(0, lambda: self.btn_edge_process_srt.configure(state="normal"))
             self.after(0, lambda: self.btn_edge_stop_srt.configure(state="disabled"))
             self.after(0, lambda: self.edge_srt_status.configure(text="Hoàn thành!"))
 
     def _edge_folder_worker(self, folder_path, output_dir, voice, rate, volume, pitch, workers, ffmpeg_path="ffmpeg.exe", merge_after=False):
         """Worker thread for processing folder of txt/docx files with Edge TTS"""
+        engine = None
         try:
-            from edge.communicate import Communicate
-            
+            from edge.sinks import FFmpegSink, FileSink
+
             # Find all supported files
             txt_files = glob.glob(os.path.join(folder_path, "*.txt"))
             docx_files = glob.glob(os.path.join(folder_path, "*.docx"))
@@ -7186,6 +8179,14 @@ class StudioGUI(ctk.CTk):
             
             all_output_files = []
             
+            def on_progress(event, info):
+                if event == "failed":
+                    self.after(0, lambda err=info['error'], i=info['key'], m=info['max_retries']: self._edge_log(f"  ❌ Chunk [{i}] lỗi sau {m} lần thử: {err}"))
+            
+            # One event loop and connection pool for every file in the folder
+            engine = EdgeBatchEngine(voice, rate, volume, pitch, concurrency=workers, min_file_size=1, on_progress=on_progress)
+            self.edge_batch_engine = engine
+            
             for file_idx, file_path in enumerate(all_files):
                 if not self.edge_srt_processing:
                     self.after(0, lambda: self._edge_log("⏹ Đã dừng bởi người dùng"))
@@ -7209,83 +8210,33 @@ class StudioGUI(ctk.CTk):
                     chunks = split_text_smart(content, max_chars=EDGE_MAX_CHUNK_SIZE)
                     self.after(0, lambda c=len(chunks): self._edge_log(f"  📝 Chia thành {c} chunks"))
                     
-                    # Create temp directory for this file's chunks
-                    file_temp_dir = os.path.join(output_dir, f"_temp_{base_name}")
-                    os.makedirs(file_temp_dir, exist_ok=True)
-                    
-                    chunk_files = []
-                    lock = threading.Lock()
-                    
-                    def process_chunk(chunk):
-                        if not self.edge_srt_processing:
-                            return None
-                        
-                        chunk_file = os.path.join(file_temp_dir, f"chunk_{chunk.index:04d}.mp3")
-                        
-                        # Retry logic for each chunk
-                        for attempt in range(1, MAX_RETRIES + 1):
-                            if not self.edge_srt_processing:
-                                return None
-                            
-                            loop = None
-                            try:
-                                communicate = Communicate(chunk.text, voice, rate=rate, volume=volume, pitch=pitch)
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                loop.run_until_complete(communicate.save(chunk_file))
-                                
-                                # Verify file was created
-                                if os.path.exists(chunk_file) and os.path.getsize(chunk_file) > 0:
-                                    with lock:
-                                        chunk_files.append((chunk.index, chunk_file))
-                                    return chunk_file
-                                else:
-                                    raise ValueError("Audio file empty or not created")
-                            except Exception as e:
-                                if attempt < MAX_RETRIES:
-                                    delay = calculate_retry_delay(attempt, is_connection_error(str(e)))
-                                    time.sleep(delay)
-                                else:
-                                    self.after(0, lambda err=str(e), i=chunk.index: self._edge_log(f"  ❌ Chunk [{i}] lỗi sau {MAX_RETRIES} lần thử: {err}"))
-                            finally:
-                                # CRITICAL: Properly close event loop to prevent CPU leak
-                                cleanup_event_loop(loop)
-                        return None
-                    
-                    # Process chunks with thread pool
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-                        futures = [executor.submit(process_chunk, chunk) for chunk in chunks]
-                        for future in concurrent.futures.as_completed(futures):
-                            if not self.edge_srt_processing:
-                                break
-                            future.result()
+                    # Stream chunks in order into one ffmpeg process - no chunk files to merge
+                    output_file = os.path.join(output_dir, f"{base_name}.mp3")
+                    jobs = [(chunk.index, chunk.text) for chunk in chunks]
                     
-                    # Sort chunk files by index
-                    chunk_files.sort(key=lambda x: x[0])
-                    chunk_file_paths = [cf[1] for cf in chunk_files]
+                    try:
+                        sink = FFmpegSink(output_file, ffmpeg_path)
+                    except FileNotFoundError:
+                        # Edge MP3 frames can be appended as-is
+                        self.after(0, lambda: self._edge_log(f"  ⚠️ Không tìm thấy ffmpeg, ghi MP3 trực tiếp"))
+                        sink = FileSink(output_file)
                     
-                    # Merge chunks into single file
-                    if chunk_file_paths:
-                        output_file = os.path.join(output_dir, f"{base_name}.mp3")
-                        merge_success = merge_mp3_files_ffmpeg(chunk_file_paths, output_file, ffmpeg_path)
-                        
-                        if merge_success:
-                            self.after(0, lambda f=output_file: self._edge_log(f"  ✅ Đã tạo: {os.path.basename(f)}"))
-                            all_output_files.append(output_file)
-                            
-                            # Clean up chunks
-                            for cf in chunk_file_paths:
-                                try:
-                                    os.remove(cf)
-                                except:
-                                    pass
-                            try:
-                                os.rmdir(file_temp_dir)
-                            except:
-                                pass
-                        else:
-                            self.after(0, lambda: self._edge_log(f"  ❌ Lỗi ghép file!"))
+                    written = 0
+                    try:
+                        with sink:
+                            written = engine.run_to_sink(jobs, sink)
+                            if not written:
+                                sink.abort()
+                    except RuntimeError as e:
+                        written = 0
+                        self.after(0, lambda err=str(e): self._edge_log(f"  ❌ Lỗi ghép file! {err}"))
                     
+                    if written:
+                        self.after(0, lambda f=output_file: self._edge_log(f"  ✅ Đã tạo: {os.path.basename(f)}"))
+                        all_output_files.append(output_file)
+                    elif os.path.exists(output_file):
+                        os.remove(output_file)
+
                 except Exception as e:
                     self.after(0, lambda err=str(e): self._edge_log(f"  ❌ Lỗi: {err}"))
                 
@@ -7310,12 +8261,16 @@ class StudioGUI(ctk.CTk):
             self.after(0, lambda: self._edge_log(f"\n{'='*40}"))
             self.after(0, lambda n=len(all_output_files), t=total_files: 
                       self._edge_log(f"✅ Hoàn thành! Đã tạo {n}/{t} file"))
+            self.after(0, lambda m=get_synthesis_cache().describe(): self._edge_log(f"💾 Cache: {m}"))
             self.after(0, lambda: self._edge_log(f"📁 Files đã lưu tại: {output_dir}"))
             
         except Exception as e:
             self.after(0, lambda: self._edge_log(f"❌ Lỗi: {str(e)}"))
         finally:
+            if engine is not None:
+                engine.close()
             self.edge_srt_processing = False
+            self.edge_batch_engine = None
             self.after(0, lambda: self.btn_edge_process_srt.configure(state="normal"))
             self.after(0, lambda: self.btn_edge_stop_srt.configure(state="disabled"))
             self.after(0, lambda: self.edge_srt_status.configure(text="Hoàn thành!"))
@@ -7323,6 +8278,9 @@ class StudioGUI(ctk.CTk):
     def _edge_stop_srt(self):
         """Stop SRT processing"""
         self.edge_srt_processing = False
+        engine = self.edge_batch_engine
+        if engine is not None:
+            engine.cancel()
         self._edge_log("⏹ Đang dừng...")
 
     def _add_custom_capcut_voice(self):
@@ -7400,8 +8358,8 @@ class StudioGUI(ctk.CTk):
             self.entry_ffmpeg_path.insert(0, file_path)
 
     def _refresh_edge_voices(self):
-        """Refresh Edge TTS voices"""
-        self._load_edge_voices()
+        """Refresh Edge TTS voices, revalidating the voice cache"""
+        self._load_edge_voices(force_refresh=True)
 
     def _load_settings(self):
         if os.path.exists(self.settings_file):
@@ -0,0 +1,161 @@
+"""Fake-clock simulation of the Capcut AIMD limiter (no network, no real sleeping)."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("google.genai")
+
+import main
+from main import AdaptiveRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeService:
+    """Accepts at most `capacity` requests per second; anything faster gets a 429."""
+
+    def __init__(self, clock, capacity):
+        self.clock = clock
+        self.capacity = capacity
+        self.last_accepted = float("-inf")
+
+    def request(self):
+        if self.clock() - self.last_accepted < 1.0 / self.capacity:
+            return False
+        self.last_accepted = self.clock()
+        return True
+
+
+def simulate(capacity, n_requests=400):
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(clock=clock, sleep=clock.sleep)
+    service = FakeService(clock, capacity)
+    for _ in range(n_requests):
+        limiter.acquire()
+        accepted = service.request()
+        limiter.release(accepted, throttled=not accepted)
+    return clock.now, limiter.metrics()
+
+
+@pytest.mark.parametrize("capacity", [1.0, 3.0])
+def test_rate_settles_near_service_capacity(capacity):
+    elapsed, metrics = simulate(capacity)
+
+    assert metrics["throttled"] < 0.1 * metrics["requests"]
+    assert metrics["successes"] / elapsed > 0.5 * capacity
+    assert metrics["rate"] <= 1.5 * capacity
+
+
+def test_rate_climbs_to_max_on_a_fast_service():
+    elapsed, metrics = simulate(capacity=100.0)
+
+    assert metrics["throttled"] == 0
+    assert metrics["rate"] == main.CAPCUT_RATE_MAX
+    # A fixed 0.5 s pause per request would take 200 s for the same 400 requests
+    assert elapsed < 100
+
+
+def test_simulation_is_deterministic():
+    assert simulate(3.0) == simulate(3.0)
+
+
+def test_concurrency_grows_with_successes_and_halves_on_throttle():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(concurrency=1, max_concurrency=4, success_window=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(True)
+    assert limiter.concurrency == 4
+
+    limiter.acquire()
+    limiter.release(False, throttled=True)
+    assert limiter.concurrency == 2
+    assert limiter.in_flight == 0
+
+
+def test_in_flight_never_exceeds_concurrency():
+    limiter = AdaptiveRateLimiter(rate=1e6, max_rate=1e6, concurrency=2, max_concurrency=2)
+    peak = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal peak
+        for _ in range(50):
+            limiter.acquire()
+            with lock:
+                peak = max(peak, limiter.in_flight)
+            limiter.release(True)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 1 <= peak <= 2
+    assert limiter.in_flight == 0
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+
+    def invoke(self, text, voice_id, session_id, timeout=None):
+        return self.response
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"status_code": 1, "status_msg": "session expired"},
+        {"status_code": 4},
+        {"status_code": 0, "data": {}},
+    ],
+)
+def test_api_error_on_http_200_is_not_a_success(tmp_path, payload):
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(success_window=1, clock=clock, sleep=clock.sleep)
+    rate = limiter.rate
+
+    ok, error = main._capcut_create_tts("xin chào", "vi_female", "session", str(tmp_path / "out.mp3"),
+                                        1, FakeClient(FakeResponse(200, payload)), limiter)
+
+    assert not ok and error
+    assert limiter.successes == 0
+    assert limiter.rate == rate
+    assert limiter.in_flight == 0
+
+
+def test_audio_response_is_a_success(tmp_path):
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(success_window=1, clock=clock, sleep=clock.sleep)
+    response = FakeResponse(200, {"status_code": 0, "data": {"v_str": "SUQz"}})
+
+    ok, error = main._capcut_create_tts("xin chào", "vi_female", "session", str(tmp_path / "out.mp3"),
+                                        1, FakeClient(response), limiter)
+
+    assert ok and error is None
+    assert limiter.successes == 1
+    assert limiter.rate > main.CAPCUT_RATE_INITIAL
+    assert (tmp_path / "out.mp3").read_bytes() == b"ID3"
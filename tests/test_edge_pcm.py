@@ -0,0 +1,139 @@
+"""Raw PCM output of Communicate: offsets placed from the audio byte count, and the WAV header."""
+
+import asyncio
+import json
+import struct
+import wave
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from edge import Communicate, Transport
+from edge.transport import PooledWebSocket
+
+PCM_FORMAT = "raw-24khz-16bit-mono-pcm"
+SAMPLE_RATE = 24000
+
+
+class FakeMessage:
+    def __init__(self, kind, data):
+        self.type = kind
+        self.data = data
+
+
+def text_message(path, body=""):
+    return FakeMessage(aiohttp.WSMsgType.TEXT, f"X-RequestId:0\r\nPath:{path}\r\n\r\n{body}")
+
+
+def binary_message(audio, content_type="audio/x-pcm"):
+    headers = "X-RequestId:0\r\n"
+    if content_type is not None:
+        headers += f"Content-Type:{content_type}\r\n"
+    headers += "Path:audio\r\n"
+    return FakeMessage(aiohttp.WSMsgType.BINARY, len(headers).to_bytes(2, "big") + headers.encode() + audio)
+
+
+def turn(audio_parts, boundaries):
+    """One service turn: word boundaries (offset in ticks from the turn start) and PCM parts."""
+    messages = [text_message("turn.start", "{}")]
+    for offset, word in boundaries:
+        metadata = {"Metadata": [{"Type": "WordBoundary", "Data": {
+            "Offset": offset, "Duration": 1_000_000, "text": {"Text": word, "Length": len(word), "BoxType": "Word"}}}]}
+        messages.append(text_message("audio.metadata", json.dumps(metadata)))
+    messages += [binary_message(part) for part in audio_parts]
+    messages += [binary_message(b"", content_type=None), text_message("turn.end", "{}")]
+    return messages
+
+
+class FakeWebSocket:
+    def __init__(self, turns):
+        self.turns = turns
+        self.closed = False
+
+    async def send_str(self, data):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    async def __aiter__(self):
+        for message in self.turns.pop(0):
+            yield message
+
+
+class FakeTransport(Transport):
+    """Serves canned turns, one per SSML request, without a network."""
+
+    def __init__(self, turns):
+        super().__init__()
+        self.turns = list(turns)
+
+    async def _open(self):
+        return PooledWebSocket(FakeWebSocket(self.turns))
+
+
+def communicate(turns):
+    comm = Communicate("x", boundary="WordBoundary", output_format=PCM_FORMAT, transport=FakeTransport(turns))
+    comm.texts = [b"first", b"second"][: len(turns)]
+    return comm
+
+
+async def collect(comm):
+    return [message async for message in comm.stream()]
+
+
+def pcm(n_bytes, seed=0):
+    return bytes((seed + i * 7) % 256 for i in range(n_bytes))
+
+
+def test_second_turn_offsets_follow_the_pcm_byte_count():
+    # 24015 samples in three messages: 1.000625 s, i.e. 10_006_250 ticks
+    first_audio = [pcm(20000), pcm(20000, 1), pcm(8030, 2)]
+    turns = [
+        turn(first_audio, [(500_000, "một"), (4_000_000, "hai")]),
+        turn([pcm(4800, 3)], [(0, "ba"), (1_250_000, "bốn")]),
+    ]
+
+    messages = asyncio.run(collect(communicate(turns)))
+
+    boundaries = [(m["text"], m["offset"]) for m in messages if m["type"] == "WordBoundary"]
+    first_turn_ticks = sum(map(len, first_audio)) * 10_000_000 // (2 * SAMPLE_RATE)
+    assert first_turn_ticks == 10_006_250
+    assert boundaries == [
+        ("một", 500_000),
+        ("hai", 4_000_000),
+        ("ba", first_turn_ticks),
+        ("bốn", first_turn_ticks + 1_250_000),
+    ]
+    assert b"".join(m["data"] for m in messages if m["type"] == "audio") == b"".join(first_audio) + pcm(4800, 3)
+
+
+def test_save_writes_a_wav_header_for_pcm(tmp_path):
+    audio = [pcm(30000), pcm(18002, 1)]
+    comm = communicate([turn(audio[:1], [(0, "một")]), turn(audio[1:], [(0, "hai")])])
+    path = tmp_path / "out.wav"
+
+    asyncio.run(comm.save(str(path)))
+
+    data = path.read_bytes()
+    riff, riff_size, wave_id = struct.unpack_from("<4sI4s", data, 0)
+    assert (riff, wave_id, riff_size) == (b"RIFF", b"WAVE", len(data) - 8)
+    fmt_id, fmt_size, tag, channels, rate, byte_rate, block_align, bits = struct.unpack_from("<4sIHHIIHH", data, 12)
+    assert (fmt_id, fmt_size, tag) == (b"fmt ", 16, 1)  # PCM
+    assert (channels, rate, byte_rate, block_align, bits) == (1, SAMPLE_RATE, 2 * SAMPLE_RATE, 2, 16)
+    data_id, data_size = struct.unpack_from("<4sI", data, 36)
+    assert (data_id, data_size) == (b"data", 48002)
+    assert data[44:] == b"".join(audio)
+
+    with wave.open(str(path), "rb") as wav:
+        assert wav.getnframes() == 24001
+
+
+def test_save_writes_raw_pcm_without_wav_extension(tmp_path):
+    audio = pcm(9600)
+    path = tmp_path / "out.pcm"
+
+    asyncio.run(communicate([turn([audio], [(0, "một")])]).save(str(path)))
+
+    assert path.read_bytes() == audio
@@ -0,0 +1,66 @@
+"""EdgeBatchEngine.run_to_sink: job order, failed chunks and the max_ahead window."""
+
+import asyncio
+import random
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("google.genai")
+pytest.importorskip("aiohttp")
+
+import main
+from edge.sinks import MemorySink
+
+
+class FakeEngine(main.EdgeBatchEngine):
+    """Chunk i sleeps a random time (chunk 0 much longer) and returns its index as audio."""
+
+    def __init__(self, failing=(), **kwargs):
+        super().__init__("vi-VN-HoaiMyNeural", max_retries=1, **kwargs)
+        self.failing = set(failing)
+        self.started = []
+        self.sink = None
+        self.peak_ahead = 0
+
+    async def _synthesize_once(self, text, output_file):
+        index = int(text)
+        self.started.append(index)
+        # chunks started but not written yet, counted from the write cursor
+        self.peak_ahead = max(self.peak_ahead, len(self.started) - len(self.sink.getvalue()))
+        await asyncio.sleep(0.05 if index == 0 else random.Random(index).uniform(0, 0.005))
+        if index in self.failing:
+            raise RuntimeError("429 Too Many Requests")
+        return bytes([index])
+
+
+def run(n_chunks, **kwargs):
+    sink = MemorySink()
+    with FakeEngine(**kwargs) as engine:
+        engine.sink = sink
+        written = engine.run_to_sink([(i, str(i)) for i in range(n_chunks)], sink)
+    return engine, written, sink.getvalue()
+
+
+def test_chunks_are_written_in_job_order():
+    engine, written, audio = run(100, concurrency=8)
+
+    assert written == 100
+    assert audio == bytes(range(100))
+    assert engine.started == list(range(100))
+
+
+def test_failed_chunks_are_skipped():
+    _, written, audio = run(50, concurrency=4, failing={3, 17})
+
+    assert written == 48
+    assert audio == bytes(i for i in range(50) if i not in (3, 17))
+
+
+@pytest.mark.parametrize("max_ahead", [None, 5, 12])
+def test_slow_head_chunk_does_not_let_the_rest_run_ahead(max_ahead):
+    engine, _, audio = run(200, concurrency=4, max_ahead=max_ahead)
+
+    assert audio == bytes(range(200))
+    assert engine.max_ahead == (max_ahead or 16)
+    assert engine.peak_ahead <= engine.max_ahead
@@ -0,0 +1,63 @@
+"""FFmpegSink against a stand-in ffmpeg script (copies stdin to the output file, or exits early)."""
+
+import sys
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from edge.sinks import FFmpegSink
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs an executable script as ffmpeg")
+
+COPY = """
+import sys
+with open(sys.argv[-1], "wb") as out:
+    while True:
+        data = sys.stdin.buffer.read(65536)
+        if not data:
+            break
+        out.write(data)
+"""
+
+EXIT_EARLY = """
+import sys
+sys.stderr.write("Invalid data found when processing input")
+sys.exit(1)
+"""
+
+
+def fake_ffmpeg(tmp_path, body):
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!{sys.executable}\n{body}", encoding="utf-8")
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_writes_reach_ffmpeg_in_order(tmp_path):
+    output_file = tmp_path / "out.mp3"
+    chunks = [bytes([i]) * (1000 + 37 * i) for i in range(200)]
+
+    with FFmpegSink(str(output_file), fake_ffmpeg(tmp_path, COPY), max_pending=4) as sink:
+        for chunk in chunks:
+            sink.write(chunk)
+
+    assert output_file.read_bytes() == b"".join(chunks)
+    assert sink.bytes_written == sum(map(len, chunks))
+
+
+def test_ffmpeg_exiting_early_is_reported(tmp_path):
+    sink = FFmpegSink(str(tmp_path / "out.mp3"), fake_ffmpeg(tmp_path, EXIT_EARLY), max_pending=2)
+
+    with pytest.raises(RuntimeError, match="Invalid data"):
+        for _ in range(1000):
+            sink.write(b"\0" * 65536)
+        sink.close()
+    sink.abort()
+
+
+def test_abort_does_not_hang_on_a_full_pipe(tmp_path):
+    sink = FFmpegSink(str(tmp_path / "out.mp3"), fake_ffmpeg(tmp_path, "import time; time.sleep(60)"), max_pending=1)
+    sink.write(b"\0" * (1 << 20))  # more than the pipe buffer, so the writer thread blocks
+    sink.abort()
+    assert not sink._writer.is_alive()
@@ -0,0 +1,98 @@
+"""Property tests for edge.communicate.split_text_by_byte_length on seeded random text."""
+
+import random
+from xml.sax.saxutils import escape
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from edge.communicate import split_text_by_byte_length
+
+# Spaces, newlines, 2/3/4-byte characters and characters that escape() turns into entities
+ALPHABET = list("abc xyz\n  ") + list("ạảãàáâậầấẩẫăắằặẳẵđêệềếểễôộồốổỗơợờớởỡưựừứửữ") + ["&", "<", ">", "😀", "中"]
+
+
+def reference_split(text: bytes, byte_length: int):
+    """
+    The slicing implementation split_text_by_byte_length replaced (quadratic).
+
+    One fix is applied: the UTF-8 fallback only looks at the first byte_length
+    bytes. The original searched the whole remaining text and could yield chunks
+    over the limit when a window had no space.
+    """
+    while len(text) > byte_length:
+        split_at = text.rfind(b"\n", 0, byte_length)
+        if split_at < 0:
+            split_at = text.rfind(b" ", 0, byte_length)
+        if split_at < 0:
+            split_at = byte_length
+            while split_at > 0:
+                try:
+                    text[:split_at].decode("utf-8")
+                    break
+                except UnicodeDecodeError:
+                    split_at -= 1
+        while split_at > 0 and b"&" in text[:split_at]:
+            ampersand_index = text.rindex(b"&", 0, split_at)
+            if text.find(b";", ampersand_index, split_at) != -1:
+                break
+            split_at = ampersand_index
+        chunk = text[:split_at].strip()
+        if chunk:
+            yield chunk
+        text = text[split_at if split_at > 0 else 1:]
+    if text.strip():
+        yield text.strip()
+
+
+def random_cases(seed, count):
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = escape("".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 200))))
+        yield text, rng.randint(8, 60)
+
+
+def assert_reassembles(text: bytes, chunks):
+    """Chunks appear in order and only whitespace lies between (or around) them."""
+    position = 0
+    for chunk in chunks:
+        found = text.find(chunk, position)
+        assert found >= 0
+        assert not text[position:found].strip()
+        position = found + len(chunk)
+    assert not text[position:].strip()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_properties_on_random_text(seed):
+    for text, byte_length in random_cases(seed, 2000):
+        chunks = list(split_text_by_byte_length(text, byte_length))
+        encoded = text.encode("utf-8")
+
+        assert all(0 < len(chunk) <= byte_length for chunk in chunks)
+        for chunk in chunks:
+            chunk.decode("utf-8")  # never cut inside a character
+            assert chunk.count(b"&") == chunk.count(b";")  # never cut inside an entity
+        assert_reassembles(encoded, chunks)
+        assert chunks == list(reference_split(encoded, byte_length))
+
+
+def test_long_text_without_spaces_stays_under_limit():
+    text = "ệ" * 5000 + "😀" * 1000
+    chunks = list(split_text_by_byte_length(text, 4096))
+
+    assert all(len(chunk) <= 4096 for chunk in chunks)
+    assert b"".join(chunks) == text.encode("utf-8")
+
+
+def test_str_and_bytes_give_the_same_chunks():
+    text = escape("Xin chào các bạn & hẹn gặp lại <3\n" * 200)
+    assert list(split_text_by_byte_length(text, 100)) == list(split_text_by_byte_length(text.encode("utf-8"), 100))
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        list(split_text_by_byte_length("abc", 0))
+    with pytest.raises(TypeError):
+        list(split_text_by_byte_length(123, 10))
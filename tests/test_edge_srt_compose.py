@@ -0,0 +1,78 @@
+"""SubMaker.get_srt and compose_columns must produce byte-identical output to srt_composer.compose."""
+
+import random
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from edge.srt_composer import compose, compose_columns, ticks_to_microseconds
+from edge.submaker import SubMaker
+
+# Empty, whitespace-only, multi-line and blank-line contents exercise the skip and legalisation rules
+TEXTS = ["a", "b c", "\n\nx\n", "  ", "", "x\n\ny", "Việt", "xin chào\r\nbạn"]
+# Repeated offsets, zero/negative durations and out-of-order jumps exercise sorting and skipping
+STEPS = [0, 1, 5, 15, 25, -5, 10000, 12345, 2_500_000]
+DURATIONS = [0, 1, 5, -3, 25, 3000, 2_500_000]
+
+
+def random_submaker(rng):
+    sub_maker = SubMaker()
+    offset = rng.randint(-30, 30)
+    for _ in range(rng.randint(0, 30)):
+        offset += rng.choice(STEPS)
+        if rng.random() < 0.1:
+            offset = rng.randint(-100, 10**11)
+        if rng.random() < 0.2:
+            # Half ticks land on a rounding boundary of timedelta(microseconds=ticks / 10)
+            offset = float(offset) + rng.choice([0, 0.5, 0.25, 5.0])
+        sub_maker.feed({
+            "type": "WordBoundary",
+            "offset": offset,
+            "duration": rng.choice(DURATIONS),
+            "text": rng.choice(TEXTS),
+        })
+    return sub_maker
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_get_srt_matches_compose(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        sub_maker = random_submaker(rng)
+        assert sub_maker.get_srt().encode("utf-8") == compose(sub_maker.cues).encode("utf-8")
+
+
+@pytest.mark.parametrize("start_index", [0, 1, 5])
+@pytest.mark.parametrize("eol", [None, "\r\n"])
+def test_compose_columns_matches_compose(start_index, eol):
+    rng = random.Random(start_index)
+    for _ in range(300):
+        sub_maker = random_submaker(rng)
+        columns = compose_columns(
+            [ticks_to_microseconds(start) for start in sub_maker.starts],
+            [ticks_to_microseconds(end) for end in sub_maker.ends],
+            sub_maker.texts,
+            start_index=start_index,
+            eol=eol,
+        )
+        expected = compose(sub_maker.cues, start_index=start_index, eol=eol)
+        assert columns.encode("utf-8") == expected.encode("utf-8")
+
+
+def test_long_narration_matches_compose():
+    sub_maker = SubMaker()
+    for i in range(20000):
+        sub_maker.feed({"type": "WordBoundary", "offset": i * 3_000_000, "duration": 2_500_000, "text": "từ"})
+    assert sub_maker.get_srt() == compose(sub_maker.cues)
+
+
+def test_ticks_round_like_timedelta():
+    for ticks in [0, 4, 5, 6, 15, 25, 35, -5, -15, 12345.5, 10**11 + 5]:
+        assert timedelta(microseconds=ticks_to_microseconds(ticks)) == timedelta(microseconds=ticks / 10)
+
+
+def test_mismatched_columns_raise():
+    with pytest.raises(ValueError):
+        compose_columns([0], [1, 2], ["x"])
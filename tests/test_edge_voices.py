@@ -0,0 +1,69 @@
+"""list_voices with a VoiceCatalogCache: fresh hits, 304 revalidation and the offline fallback."""
+
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+import edge.voices
+from edge.voices import VoiceCatalogCache, list_voices
+
+VOICES = [{"ShortName": "vi-VN-HoaiMyNeural", "Locale": "vi-VN", "Gender": "Female", "VoiceTag": {}}]
+
+
+def fake_request(monkeypatch, result):
+    """Replace the HTTP request; `result` is returned, or raised if it is an exception."""
+    calls = []
+
+    async def request(session, ssl_ctx, proxy, validators=None):
+        calls.append(validators)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    monkeypatch.setattr(edge.voices, "__list_voices", request)
+    return calls
+
+
+def stale_cache(tmp_path):
+    cache = VoiceCatalogCache(str(tmp_path / "voices.json"), ttl=60)
+    cache._write({"fetched_at": 0, "etag": '"v1"', "last_modified": None, "voices": VOICES})
+    assert not cache.is_fresh(cache.load())
+    return cache
+
+
+def test_fresh_cache_skips_the_request(tmp_path, monkeypatch):
+    calls = fake_request(monkeypatch, AssertionError("no request expected"))
+    cache = VoiceCatalogCache(str(tmp_path / "voices.json"))
+    cache.save(VOICES)
+
+    assert asyncio.run(list_voices(cache=cache)) == VOICES
+    assert calls == []
+
+
+def test_not_modified_revalidates_the_stale_entry(tmp_path, monkeypatch):
+    cache = stale_cache(tmp_path)
+    calls = fake_request(monkeypatch, (None, '"v1"', None))
+
+    assert asyncio.run(list_voices(cache=cache)) == VOICES
+    assert calls == [{"If-None-Match": '"v1"'}]
+    assert cache.is_fresh(cache.load())
+
+
+@pytest.mark.parametrize("error", [aiohttp.ClientConnectionError("offline"), asyncio.TimeoutError()])
+def test_stale_entry_is_used_when_the_service_is_unreachable(tmp_path, monkeypatch, error):
+    cache = stale_cache(tmp_path)
+    calls = fake_request(monkeypatch, error)
+
+    assert asyncio.run(list_voices(cache=cache, timeout=1)) == VOICES
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("error", [aiohttp.ClientConnectionError("offline"), asyncio.TimeoutError()])
+def test_errors_propagate_without_a_cached_copy(tmp_path, monkeypatch, error):
+    cache = VoiceCatalogCache(str(tmp_path / "voices.json"))
+    fake_request(monkeypatch, error)
+
+    with pytest.raises(type(error)):
+        asyncio.run(list_voices(cache=cache))
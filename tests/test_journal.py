@@ -0,0 +1,124 @@
+"""Crash-injection tests for capcutvoice.journal.JobJournal."""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip("requests")  # capcutvoice/__init__ imports the TTS client
+
+from capcutvoice.journal import DONE, FAILED, JobJournal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs SIGKILL")
+
+N_SEGMENTS = 200
+
+# Registers N_SEGMENTS segments, finishes them from several threads (every 7th fails),
+# and SIGKILLs itself halfway through appending the record of segment `kill_at`.
+WRITER = textwrap.dedent("""
+    import os, signal, sys, threading
+    sys.path.insert(0, {root!r})
+    from capcutvoice.journal import JobJournal
+
+    path, out_dir, kill_at, n = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+    journal = JobJournal(path, fsync_every=8)
+    ids = ["seg_%d" % i for i in range(n)]
+    for i, segment_id in enumerate(ids):
+        journal.add(segment_id, "văn bản %d" % i, os.path.join(out_dir, segment_id + ".mp3"))
+
+    def work(chunk):
+        for segment_id in chunk:
+            if segment_id == "seg_%d" % kill_at:
+                with journal._lock:
+                    # Torn record: the process dies partway through the line
+                    journal._file.write('{{"id": "%s", "state": "do' % segment_id)
+                    journal._file.flush()
+                    os.kill(os.getpid(), signal.SIGKILL)
+            with open(journal.jobs[segment_id]["output"], "wb") as f:
+                f.write(b"ID3")
+            if int(segment_id[4:]) % 7 == 0:
+                journal.mark_failed(segment_id, "HTTP 429")
+            else:
+                journal.mark_done(segment_id)
+
+    threads = [threading.Thread(target=work, args=(ids[k::4],)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+""")
+
+
+def run_killed_writer(tmp_path, kill_at):
+    script = tmp_path / "writer.py"
+    script.write_text(WRITER.format(root=ROOT), encoding="utf-8")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    path = tmp_path / "journal.jsonl"
+    proc = subprocess.run([sys.executable, str(script), str(path), str(out_dir), str(kill_at), str(N_SEGMENTS)])
+    assert proc.returncode == -signal.SIGKILL
+    return path
+
+
+@pytest.mark.parametrize("kill_at", [0, 57, 131, N_SEGMENTS - 1])
+def test_replay_after_kill_resubmits_only_unfinished_segments(tmp_path, kill_at):
+    path = run_killed_writer(tmp_path, kill_at)
+    assert not path.read_bytes().endswith(b"\n")  # the kill left a torn line
+
+    with JobJournal(str(path)) as journal:
+        assert len(journal.jobs) == N_SEGMENTS
+        done = {job["id"] for job in journal.jobs.values() if job["state"] == DONE}
+        todo = {job["id"] for job in journal.unfinished()}
+
+        # Completed segments survive the kill; everything else comes back exactly once
+        assert done.isdisjoint(todo)
+        assert done | todo == set(journal.jobs)
+        assert "seg_%d" % kill_at in todo
+        assert all(os.path.exists(journal.jobs[segment_id]["output"]) for segment_id in done)
+        assert all(journal.jobs[segment_id]["attempts"] == 1 for segment_id in done)
+        assert {job["id"] for job in journal.failed()} <= todo
+
+        resubmitted = []
+        for job in journal.unfinished():
+            resubmitted.append(job["id"])
+            with open(job["output"], "wb") as f:
+                f.write(b"ID3")
+            journal.mark_done(job["id"])
+
+    assert sorted(resubmitted) == sorted(todo)
+
+    # The torn tail was cut off on replay, so the journal is well-formed again
+    raw = path.read_bytes()
+    assert raw.endswith(b"\n")
+    records = [json.loads(line) for line in raw.splitlines()]
+    assert {record["id"] for record in records} == set("seg_%d" % i for i in range(N_SEGMENTS))
+
+    with JobJournal(str(path)) as journal:
+        assert journal.unfinished() == []
+        for segment_id in done:
+            assert journal.jobs[segment_id]["attempts"] == 1
+
+
+def test_done_segment_with_missing_output_is_resubmitted(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    output = str(tmp_path / "seg_0.mp3")
+    with JobJournal(path) as journal:
+        journal.add("seg_0", "xin chào", output)
+        journal.add("seg_1", "tạm biệt", str(tmp_path / "seg_1.mp3"))
+        journal.mark_failed("seg_1", "HTTP 429")
+        journal.mark_done("seg_0")
+
+    with JobJournal(path) as journal:
+        assert [job["id"] for job in journal.unfinished()] == ["seg_0", "seg_1"]
+        assert journal.jobs["seg_1"]["state"] == FAILED
+
+    with open(output, "wb") as f:
+        f.write(b"ID3")
+    with JobJournal(path) as journal:
+        assert [job["id"] for job in journal.unfinished()] == ["seg_1"]
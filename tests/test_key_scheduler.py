@@ -0,0 +1,196 @@
+"""
+Simulation of MultiThreadProcessor + KeyScheduler with fake API keys.
+
+Runs on an event loop with virtual time (sleeps and timeouts jump the clock
+instead of waiting), so minutes of simulated traffic take well under a second
+and every run is deterministic.
+"""
+
+import asyncio
+import functools
+import random
+import types
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("google.genai")
+
+import main
+from main import KeyScheduler, MultiThreadProcessor, Subtitle, TTSConfig
+
+CALL_SECONDS = 3.0  # successful request
+THROTTLED_SECONDS = 0.3  # a 429 comes back fast
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose clock jumps to the next timer whenever nothing is ready to run.
+
+    Like a real clock it also moves a little on every iteration, otherwise a
+    token bucket a rounding error short of a full token would spin forever.
+    """
+
+    TICK = 1e-6
+
+    def __init__(self):
+        super().__init__()
+        self._virtual_now = 0.0
+
+    def time(self):
+        return self._virtual_now
+
+    def _run_once(self):
+        self._virtual_now += self.TICK
+        if not self._ready:
+            timers = [handle.when() for handle in self._scheduled if not handle.cancelled()]
+            if timers:
+                self._virtual_now = max(self._virtual_now, min(timers))
+        super()._run_once()
+
+
+class FakeKey:
+    """'exhausted' answers 429 for the first 120 s, 'flaky' 10% of the time, 'ok' never."""
+
+    def __init__(self, kind, clock, rng):
+        self.kind = kind
+        self.clock = clock
+        self.rng = rng
+
+    def error(self):
+        if self.kind == "exhausted" and self.clock() < 120:
+            return "429 RESOURCE_EXHAUSTED: quota exceeded"
+        if self.kind == "flaky" and self.rng.random() < 0.1:
+            return "429 Too Many Requests"
+        return None
+
+
+class PinnedScheduler(KeyScheduler):
+    """Baseline: like the processor before KeyScheduler, every worker stays on one key whatever its state."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pins = {}
+
+    def _pick(self):
+        worker = asyncio.current_task()
+        if worker not in self._pins:
+            states = list(self.keys.values())
+            self._pins[worker] = states[len(self._pins) % len(states)]
+        state = self._pins[worker]
+        return (state, None) if state.free_slots else (None, None)
+
+
+class NoCache:
+    def make_key(self, *args, **kwargs):
+        return None
+
+    def get(self, key):
+        return None
+
+    def put(self, key, data):
+        pass
+
+    def describe(self):
+        return ""
+
+
+def simulate(monkeypatch, scheduler_cls, kinds, n_lines=120, seed=1):
+    loop = VirtualTimeLoop()
+    rng = random.Random(seed)
+    keys = {f"key-{i:04d}": FakeKey(kind, loop.time, rng) for i, kind in enumerate(kinds)}
+
+    class FakeEngine:
+        def __init__(self, engine_id, api_key, config, log_callback=None):
+            self.key = keys[api_key]
+
+        async def generate_audio(self, text):
+            error = self.key.error()
+            await asyncio.sleep(THROTTLED_SECONDS if error else CALL_SECONDS)
+            if error:
+                raise RuntimeError(error)
+            return b"\0" * 48000
+
+        def recreate_client(self):
+            pass
+
+    monkeypatch.setattr(main, "KeyScheduler", functools.partial(scheduler_cls, clock=loop.time))
+    monkeypatch.setattr(main, "WorkerEngine", FakeEngine)
+    monkeypatch.setattr(main, "get_synthesis_cache", NoCache)
+    monkeypatch.setattr(main, "save_wave_file", lambda *args, **kwargs: None)
+    monkeypatch.setattr(main, "time", types.SimpleNamespace(monotonic=loop.time))
+    # Retry until every line succeeds, so the makespan covers the whole job for either scheduler
+    monkeypatch.setattr(main, "MAX_RETRIES", 1000)
+
+    config = TTSConfig(multi_worker_enabled=True, workers_per_key=2)
+    processor = MultiThreadProcessor(list(keys), config, lambda *args: None, lambda *args: None,
+                                     lambda *args: None, lambda *args: None)
+    subtitles = [Subtitle(i, "", "", f"dòng {i}") for i in range(1, n_lines + 1)]
+    try:
+        loop.run_until_complete(processor.process_all(subtitles, Path("."), "sim"))
+    finally:
+        loop.close()
+    return loop.time(), sum(processor.results.values()), processor.scheduler
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_scheduler_shortens_makespan_with_throttled_keys(monkeypatch, seed):
+    kinds = ["exhausted", "flaky", "ok"]
+    baseline_span, baseline_ok, _ = simulate(monkeypatch, PinnedScheduler, kinds, seed=seed)
+    span, ok, scheduler = simulate(monkeypatch, KeyScheduler, kinds, seed=seed)
+
+    assert ok == baseline_ok == 120
+    # Pinned workers sit on the exhausted key until its quota returns at 120 s
+    assert baseline_span > 120
+    assert span < baseline_span - 10
+
+    # The exhausted key is parked instead of taking a third of the lines
+    exhausted = scheduler.keys["key-0000"]
+    assert exhausted.successes < 120 / 3
+    assert exhausted.throttled < 10
+
+
+def test_healthy_keys_share_the_work(monkeypatch):
+    span, ok, scheduler = simulate(monkeypatch, KeyScheduler, ["ok", "ok", "ok"])
+
+    assert ok == 120
+    # 6 slots x 3 s per call -> 20 rounds, with some slack for the token buckets
+    assert span < 1.3 * 120 / 6 * CALL_SECONDS
+    assert all(state.successes >= 30 for state in scheduler.keys.values())
+
+
+def test_simulation_is_deterministic(monkeypatch):
+    kinds = ["exhausted", "flaky", "ok"]
+    first = simulate(monkeypatch, KeyScheduler, kinds)[:2]
+    second = simulate(monkeypatch, KeyScheduler, kinds)[:2]
+    assert first == second
+
+
+def test_throttled_key_is_skipped_until_its_bucket_refills():
+    now = [0.0]
+    scheduler = KeyScheduler(["key-a", "key-b"], slots=1, rpm=60, burst=2, throttle_cooldown=5,
+                             clock=lambda: now[0])
+
+    async def run():
+        api_key, slot = await scheduler.acquire()
+        cooldown = await scheduler.release(api_key, slot, False, throttled=True)
+        picks = []
+        for _ in range(2):
+            lease = await scheduler.acquire()
+            picks.append(lease[0])
+            await scheduler.release(*lease, True, latency=1.0)
+        return api_key, cooldown, picks
+
+    throttled_key, cooldown, picks = asyncio.run(run())
+
+    assert cooldown == 5
+    assert throttled_key not in picks
+
+    state = scheduler.keys[throttled_key]
+    now[0] += cooldown - 1
+    scheduler._refill(state, now[0])
+    assert state.tokens < 1
+    now[0] += 1
+    scheduler._refill(state, now[0])
+    assert state.tokens >= 1
@@ -0,0 +1,172 @@
+"""merge_mp3_files on synthetic MPEG1/MPEG2 Layer III streams with tags, Xing frames and junk."""
+
+import random
+import struct
+
+import pytest
+
+pytest.importorskip("requests")  # capcutvoice/__init__ imports the TTS client
+
+from capcutvoice.mp3merge import TOC_SIZE, merge_mp3_files, parse_frame_header
+
+# (version bits, sample rate index) -> sample rate
+MPEG1_48K = (3, 1)
+MPEG1_44K = (3, 0)
+MPEG2_24K = (2, 1)
+STEREO, MONO = 0, 3
+
+
+def frame(rng, stream, bitrate_index, channel_mode=STEREO, payload=None):
+    """One Layer III frame (no CRC) with random payload bytes."""
+    version, sample_rate_index = stream
+    header = bytes([
+        0xFF,
+        0xE0 | (version << 3) | (1 << 1) | 1,
+        (bitrate_index << 4) | (sample_rate_index << 2),
+        channel_mode << 6,
+    ])
+    length = parse_frame_header(header, 0).length
+    if payload is None:
+        payload = bytes(rng.randrange(0xFF) for _ in range(length - 4))
+    return header + payload.ljust(length - 4, b"\0")
+
+
+def xing_frame(rng, stream, channel_mode=STEREO, tag=b"Xing"):
+    """A per-file Xing/Info frame as encoders write it (frame count, bytes, TOC)."""
+    side_info = (32 if channel_mode == STEREO else 17) if stream[0] == 3 else (17 if channel_mode == STEREO else 9)
+    payload = bytes(side_info) + tag + struct.pack(">III", 7, 1234, 56789) + bytes(range(TOC_SIZE))
+    return frame(rng, stream, 9, channel_mode, payload)
+
+
+def id3v2(size=57):
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x04\x00\x00" + syncsafe + b"\xff" * size  # 0xFF bytes inside the tag must not sync
+
+
+def id3v1():
+    return b"TAG" + b"title".ljust(125, b"\0")
+
+
+def ape_tag():
+    item = struct.pack("<II", 5, 0) + b"Title\0hello"
+    size = len(item) + 32
+
+    def block(flags):
+        return b"APETAGEX" + struct.pack("<IIII", 2000, size, 1, flags) + bytes(8)
+
+    return block(0xA0000000) + item + block(0x80000000)  # header + items + footer
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def read_xing(out, channel_mode=STEREO, mpeg1=True):
+    header = parse_frame_header(out, 0)
+    offset = 4 + ((32 if channel_mode == STEREO else 17) if mpeg1 else (17 if channel_mode == STEREO else 9))
+    tag = out[offset:offset + 4]
+    flags, frames, total_bytes = struct.unpack_from(">III", out, offset + 4)
+    toc = out[offset + 16:offset + 16 + TOC_SIZE]
+    return header, tag, flags, frames, total_bytes, toc
+
+
+def expected_toc(xing_length, frame_sizes):
+    total = xing_length + sum(frame_sizes)
+    starts = [xing_length]
+    for size in frame_sizes:
+        starts.append(starts[-1] + size)
+    return bytes(min(255, starts[i * len(frame_sizes) // TOC_SIZE] * 256 // total) for i in range(TOC_SIZE))
+
+
+def check_merge(out, audio_frames, channel_mode=STEREO, mpeg1=True):
+    header, tag, flags, frames, total_bytes, toc = read_xing(out, channel_mode, mpeg1)
+    audio = b"".join(audio_frames)
+
+    # Exactly one header frame, then the audio frames byte for byte
+    assert out[header.length:] == audio
+    assert out.count(b"Xing") + out.count(b"Info") == 1
+    assert b"ID3" not in out and b"TAG" not in out and b"APETAGEX" not in out
+
+    assert flags == 0x07
+    assert frames == len(audio_frames)
+    assert total_bytes == len(out)
+    assert list(toc) == sorted(toc)
+    assert toc == expected_toc(header.length, [len(f) for f in audio_frames])
+    return tag
+
+
+def test_vbr_merge_strips_tags_xing_frames_and_junk(tmp_path):
+    rng = random.Random(0)
+    a = [frame(rng, MPEG1_48K, 9) for _ in range(5)]  # 128 kbps
+    b = [frame(rng, MPEG1_48K, 9) for _ in range(3)]
+    c = [frame(rng, MPEG1_48K, i) for i in (10, 5, 14, 1, 9, 9, 3)]  # mixed bitrates
+    files = [
+        write(tmp_path, "a.mp3", id3v2() + xing_frame(rng, MPEG1_48K, tag=b"Info") + b"".join(a) + id3v1()),
+        write(tmp_path, "b.mp3", b"\x00junk\x12\xe0" + xing_frame(rng, MPEG1_48K) + b"".join(b) + ape_tag()),
+        write(tmp_path, "c.mp3", id3v2(10) + id3v2(20) + b"".join(c[:4]) + b"\xffgarbage" + b"".join(c[4:]) + ape_tag() + id3v1()),
+        write(tmp_path, "empty.mp3", id3v2() + id3v1()),
+    ]
+    output = tmp_path / "out.mp3"
+
+    result = merge_mp3_files(files, str(output))
+
+    out = output.read_bytes()
+    assert check_merge(out, a + b + c) == b"Xing"
+    assert result["frames"] == 15
+    assert result["bytes"] == len(out)
+    assert result["duration"] == pytest.approx(15 * 1152 / 48000)
+
+
+def test_cbr_merge_writes_info(tmp_path):
+    rng = random.Random(1)
+    a = [frame(rng, MPEG1_48K, 9) for _ in range(120)]
+    b = [frame(rng, MPEG1_48K, 9) for _ in range(81)]
+    files = [
+        write(tmp_path, "a.mp3", id3v2() + xing_frame(rng, MPEG1_48K, tag=b"Info") + b"".join(a)),
+        write(tmp_path, "b.mp3", xing_frame(rng, MPEG1_48K, tag=b"Info") + b"".join(b) + id3v1()),
+    ]
+    output = tmp_path / "out.mp3"
+
+    merge_mp3_files(files, str(output))
+
+    assert check_merge(output.read_bytes(), a + b) == b"Info"
+
+
+def test_mpeg2_mono_merge(tmp_path):
+    rng = random.Random(2)
+    a = [frame(rng, MPEG2_24K, 6, MONO) for _ in range(40)]  # 48 kbps, as Edge TTS sends
+    b = [frame(rng, MPEG2_24K, i, MONO) for i in (6, 8, 4, 6)]
+    files = [
+        write(tmp_path, "a.mp3", id3v2() + xing_frame(rng, MPEG2_24K, MONO) + b"".join(a)),
+        write(tmp_path, "b.mp3", b"".join(b) + id3v1()),
+    ]
+    output = tmp_path / "out.mp3"
+
+    result = merge_mp3_files(files, str(output))
+
+    out = output.read_bytes()
+    assert check_merge(out, a + b, MONO, mpeg1=False) == b"Xing"
+    header = parse_frame_header(out, 0)
+    assert (header.version, header.sample_rate, header.channel_mode) == (2, 24000, MONO)
+    assert result["duration"] == pytest.approx(44 * 576 / 24000)
+
+
+@pytest.mark.parametrize("other", [MPEG1_44K, MPEG2_24K])
+def test_mismatched_streams_raise(tmp_path, other):
+    rng = random.Random(3)
+    files = [
+        write(tmp_path, "a.mp3", b"".join(frame(rng, MPEG1_48K, 9) for _ in range(3))),
+        write(tmp_path, "b.mp3", b"".join(frame(rng, other, 9) for _ in range(3))),
+    ]
+
+    with pytest.raises(ValueError):
+        merge_mp3_files(files, str(tmp_path / "out.mp3"))
+
+
+def test_no_audio_raises(tmp_path):
+    files = [write(tmp_path, "a.mp3", id3v2() + b"not audio" + id3v1())]
+
+    with pytest.raises(ValueError):
+        merge_mp3_files(files, str(tmp_path / "out.mp3"))
@@ -0,0 +1,61 @@
+"""
+Golden-output tests for vntts.utils.normalize_text.
+
+tests/data/normalize_text_golden.jsonl holds inputs and the output of the
+normalizer before the regexes were precompiled and the unit rules merged into
+one pass. The inputs are the module's own examples, the reference texts of the
+bundled voices and seeded random mixes of numbers, units, currencies, dates,
+times and punctuation. Any difference is a behaviour change.
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "normalize_text_golden.jsonl")
+
+
+def _load_normalize_text():
+    # Loaded by path: importing the vntts package pulls in torch for the TTS engine
+    spec = importlib.util.spec_from_file_location(
+        "normalize_text", os.path.join(ROOT, "vntts", "utils", "normalize_text.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+with open(GOLDEN, encoding="utf-8") as f:
+    CASES = [json.loads(line) for line in f]
+
+
+@pytest.fixture(scope="module")
+def normalizer():
+    return _load_normalize_text().VietnameseTTSNormalizer()
+
+
+def test_matches_golden_outputs(normalizer):
+    mismatches = []
+    for case in CASES:
+        actual = normalizer.normalize(case["input"])
+        if actual != case["expected"]:
+            mismatches.append((case["input"], case["expected"], actual))
+    assert not mismatches, f"{len(mismatches)}/{len(CASES)} differ, first: {mismatches[0]}"
+
+
+def test_golden_covers_units(normalizer):
+    inputs = " ".join(case["input"].lower() for case in CASES)
+    missing = [unit for unit in normalizer.units if unit not in inputs]
+    assert not missing
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Giá 2.500.000đ", "giá hai triệu năm trăm nghìn đồng"),
+    ("Nhiệt độ -15°C", "nhiệt độ âm mười lăm độ xê"),
+    ("Tốc độ 120km/h", "tốc độ một trăm hai mươi ki lô mét trên h"),
+    ("Tôi đi lấy l nước về nhà", "tôi đi lấy l nước về nhà"),
+])
+def test_examples(normalizer, text, expected):
+    assert normalizer.normalize(text) == expected
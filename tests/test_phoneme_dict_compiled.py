@@ -0,0 +1,48 @@
+"""CompiledPhonemeDict: lookups match the JSON, and the lookup cache stays bounded."""
+
+import importlib.util
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by path: importing the vntts package pulls in torch for the TTS engine
+spec = importlib.util.spec_from_file_location(
+    "phoneme_dict_compiled", os.path.join(ROOT, "vntts", "utils", "phoneme_dict_compiled.py")
+)
+phoneme_dict_compiled = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(phoneme_dict_compiled)
+
+WORDS = {"a": "a1", "anh": "ɛɲ1", "chào": "tʃaːw2", "xin": "sin1", "đường": "ɗɯəŋ2", "ươn": "ɯən1"}
+
+
+def compiled(tmp_path, words=WORDS):
+    json_path = tmp_path / "phoneme_dict.json"
+    json_path.write_text(json.dumps(words, ensure_ascii=False), encoding="utf-8")
+    return phoneme_dict_compiled.load_compiled_phoneme_dict(str(json_path))
+
+
+def test_lookups_match_the_json(tmp_path):
+    d = compiled(tmp_path)
+    try:
+        assert dict(d) == WORDS
+        assert len(d) == len(WORDS)
+        for word, phones in WORDS.items():
+            assert word in d and d[word] == phones
+        for missing in ["", "b", "anhh", "zzz", "đ", 42, None]:
+            assert missing not in d
+            assert d.get(missing) is None
+    finally:
+        d.close()
+
+
+def test_lookup_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(phoneme_dict_compiled, "LOOKUP_CACHE_SIZE", 16)
+    d = compiled(tmp_path)
+    try:
+        for i in range(1000):
+            assert f"oov{i}" not in d
+        assert d["chào"] == WORDS["chào"]
+        assert d._lookup.cache_info().currsize <= 16
+    finally:
+        d.close()
@@ -0,0 +1,79 @@
+"""ReferenceCodeCache: the per-file hash memo is keyed by path and replaced when a file changes."""
+
+import importlib.util
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("torch")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by path: importing the vntts package pulls in the whole TTS engine
+spec = importlib.util.spec_from_file_location(
+    "reference_cache", os.path.join(ROOT, "vntts", "vieneu_tts", "reference_cache.py")
+)
+reference_cache = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(reference_cache)
+
+
+def write(path, data, mtime_ns):
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_edited_file_replaces_its_entry(tmp_path):
+    cache = reference_cache.ReferenceCodeCache(cache_dir=None)
+    wav = tmp_path / "voice.wav"
+    keys = set()
+    for i in range(20):
+        write(wav, f"take {i}".encode(), 1_000_000_000 * (i + 1))
+        keys.add(cache._cache_key(wav, "codec", 16000))
+
+    assert len(keys) == 20
+    assert list(cache._file_hashes) == [str(wav)]
+    assert cache._file_hashes[str(wav)][2] == reference_cache._hash_file(wav)
+
+
+def test_unchanged_file_is_hashed_once(tmp_path, monkeypatch):
+    cache = reference_cache.ReferenceCodeCache(cache_dir=None)
+    wav = tmp_path / "voice.wav"
+    write(wav, b"audio", 1_000_000_000)
+    calls = []
+    hash_file = reference_cache._hash_file
+    monkeypatch.setattr(reference_cache, "_hash_file", lambda path: calls.append(path) or hash_file(path))
+
+    relative = os.path.relpath(wav)
+    keys = {cache._cache_key(path, "codec", 16000) for path in (wav, str(wav), relative, wav)}
+
+    assert len(keys) == 1 and len(calls) == 1
+    assert cache._cache_key(wav, "codec", 24000) not in keys
+
+
+def test_concurrent_keys_agree(tmp_path):
+    cache = reference_cache.ReferenceCodeCache(cache_dir=None)
+    wavs = []
+    for i in range(8):
+        wavs.append(tmp_path / f"voice{i}.wav")
+        write(wavs[-1], bytes([i]) * 4096, 1_000_000_000)
+    expected = [cache._cache_key(wav, "codec", 16000) for wav in wavs]
+    cache._file_hashes.clear()
+    results, errors = [], []
+
+    def worker():
+        try:
+            for _ in range(50):
+                results.append([cache._cache_key(wav, "codec", 16000) for wav in wavs])
+        except Exception as e:  # pragma: no cover - surfaced by the assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert all(keys == expected for keys in results)
+    assert len(cache._file_hashes) == len(wavs)
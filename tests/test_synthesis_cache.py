@@ -0,0 +1,165 @@
+"""SynthesisCache: key composition, LRU eviction under max_bytes, the on-disk index and stats."""
+
+import os
+import unicodedata
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("google.genai")
+
+from main import SynthesisCache
+
+KEY_ARGS = dict(engine="edge", voice="vi-VN-HoaiMyNeural", text="Xin chào các bạn", model="", rate="+0%")
+
+
+def make_key(**overrides):
+    args = dict(KEY_ARGS, **overrides)
+    return SynthesisCache.make_key(args.pop("engine"), args.pop("voice"), args.pop("text"), **args)
+
+
+def set_mtime(cache, key, mtime):
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+@pytest.mark.parametrize("change", [
+    {"engine": "capcut"},
+    {"voice": "vi-VN-NamMinhNeural"},
+    {"model": "gemini-2.5-flash-preview-tts"},
+    {"rate": "+10%"},
+    {"pitch": "+2Hz"},
+    {"text": "Xin chào các bạn!"},
+])
+def test_key_changes_with_engine_voice_model_params_and_text(change):
+    assert make_key(**change) != make_key()
+
+
+@pytest.mark.parametrize("text", [
+    "  Xin chào   các bạn\n",
+    "Xin\tchào\ncác  bạn",
+    unicodedata.normalize("NFD", "Xin chào các bạn"),
+])
+def test_key_ignores_whitespace_and_unicode_normalization(text):
+    assert text != KEY_ARGS["text"]
+    assert make_key(text=text) == make_key()
+
+
+def test_key_ignores_param_order():
+    key = SynthesisCache.make_key("edge", "v", "text", rate="+0%", volume="+0%", pitch="+0Hz")
+    assert key == SynthesisCache.make_key("edge", "v", "text", pitch="+0Hz", volume="+0%", rate="+0%")
+
+
+def test_get_returns_what_put_stored(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=1000)
+    cache.put("a" * 64, b"audio")
+
+    assert "a" * 64 in cache
+    assert cache.get("a" * 64) == b"audio"
+    assert cache.get_file("a" * 64, str(tmp_path / "out" / "a.mp3"))
+    assert (tmp_path / "out" / "a.mp3").read_bytes() == b"audio"
+
+
+def test_lru_eviction_under_max_bytes(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=300)
+    keys = [f"{i:02d}" + "0" * 62 for i in range(3)]
+    for key in keys:
+        cache.put(key, bytes(100))
+
+    cache.get(keys[0])  # now the most recently used
+    cache.put("99" + "0" * 62, bytes(100))
+
+    assert keys[1] not in cache  # least recently used goes first
+    assert not os.path.exists(cache._path(keys[1]))
+    assert keys[0] in cache and keys[2] in cache
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 300
+
+    cache.put("98" + "0" * 62, bytes(250))
+    assert [key for key in keys + ["99" + "0" * 62] if key in cache] == []
+    assert cache.stats()["entries"] == 1
+
+
+def test_oversized_and_empty_puts_are_skipped(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=100)
+    cache.put("a" * 64, bytes(50))
+
+    cache.put("b" * 64, bytes(101))
+    cache.put("c" * 64, b"")
+
+    assert "b" * 64 not in cache and "c" * 64 not in cache
+    assert not os.path.exists(cache._path("b" * 64))
+    assert "a" * 64 in cache  # nothing was evicted to make room
+    assert cache.stats()["stores"] == 1 and cache.stats()["evictions"] == 0
+
+
+def test_replacing_an_entry_updates_its_size(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=1000)
+    cache.put("a" * 64, bytes(100))
+    cache.put("a" * 64, bytes(40))
+
+    assert cache.stats()["entries"] == 1 and cache.stats()["bytes"] == 40
+
+
+def test_index_is_rebuilt_from_mtimes_across_instances(tmp_path):
+    first = SynthesisCache(str(tmp_path), max_bytes=300)
+    keys = [f"{i:02d}" + "0" * 62 for i in range(3)]
+    for key in keys:
+        first.put(key, bytes(100))
+    # Recency as a previous run left it: keys[2] oldest, keys[0] newest
+    for key, mtime in zip(keys, (3000, 2000, 1000)):
+        set_mtime(first, key, mtime)
+
+    second = SynthesisCache(str(tmp_path), max_bytes=300)
+    assert second.stats()["entries"] == 0  # the index is loaded lazily
+    assert all(key in second for key in keys)
+    assert second.stats()["bytes"] == 300
+
+    second.put("99" + "0" * 62, bytes(100))
+    assert keys[2] not in second
+    assert keys[0] in second and keys[1] in second
+
+    # A hit refreshes the mtime, so the next instance sees it as recent
+    assert second.get(keys[1]) == bytes(100)
+    third = SynthesisCache(str(tmp_path), max_bytes=300)
+    third.put("98" + "0" * 62, bytes(100))
+    assert keys[0] not in third and keys[1] in third
+
+
+def test_tmp_leftovers_are_removed_when_the_index_loads(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=1000)
+    cache.put("ab" + "0" * 62, b"audio")
+    leftover = tmp_path / "ab" / ("ab" + "1" * 62 + ".123.456.tmp")
+    leftover.write_bytes(b"partial")
+
+    fresh = SynthesisCache(str(tmp_path), max_bytes=1000)
+    assert "ab" + "0" * 62 in fresh
+    assert not leftover.exists()
+    assert fresh.stats()["entries"] == 1 and fresh.stats()["bytes"] == len(b"audio")
+
+
+def test_missing_file_counts_as_a_miss_and_is_forgotten(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=1000)
+    cache.put("a" * 64, b"audio")
+    os.remove(cache._path("a" * 64))
+
+    assert cache.get("a" * 64) is None
+    assert "a" * 64 not in cache
+    assert cache.stats()["misses"] == 1 and cache.stats()["bytes"] == 0
+
+
+def test_stats_count_hits_misses_and_hit_rate(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=1000)
+    assert cache.stats()["hit_rate"] == 0.0
+
+    cache.put("a" * 64, b"audio")
+    cache.get("a" * 64)
+    cache.get("a" * 64)
+    cache.get("a" * 64)
+    cache.get("b" * 64)
+    assert not cache.get_file("c" * 64, str(tmp_path / "c.mp3"))
+    assert "a" * 64 in cache  # membership checks do not count
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (3, 2, 1)
+    assert stats["hit_rate"] == pytest.approx(0.6)
+    assert cache.describe().startswith("3 hit / 2 miss (60%)")
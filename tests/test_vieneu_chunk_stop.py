@@ -0,0 +1,72 @@
+"""StudioGUI._vieneu_iter_chunk_audio honours Stop while cached chunks are replayed."""
+
+import types
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("customtkinter")
+pytest.importorskip("google.genai")
+
+import main as studio
+
+
+class FakeTTS:
+    def __init__(self, max_batch_size=1):
+        self.max_batch_size = max_batch_size
+        self.calls = 0
+
+    def infer(self, text, ref_codes, ref_text):
+        self.calls += 1
+        return np.full(100 + len(text), len(text) / 100, dtype=np.float32)
+
+
+class FakeBatchTTS(FakeTTS):
+    def infer_batch(self, texts, ref_codes, ref_text, max_batch_size=None):
+        return [self.infer(text, ref_codes, ref_text) for text in texts]
+
+
+def fake_gui(tts):
+    return types.SimpleNamespace(
+        vieneu_tts_instance=tts,
+        vieneu_processing=True,
+        vieneu_model_id="test",
+        after=lambda delay, fn: None,
+        _vieneu_log=lambda msg: None,
+    )
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = studio.SynthesisCache(str(tmp_path), max_bytes=1 << 24)
+    monkeypatch.setattr(studio, "get_synthesis_cache", lambda: cache)
+    return cache
+
+
+def run(gui, texts, stop_after=None):
+    seen = []
+    for idx, wav in studio.StudioGUI._vieneu_iter_chunk_audio(gui, texts, np.arange(16), "ref"):
+        seen.append(idx)
+        if len(seen) == stop_after:
+            gui.vieneu_processing = False
+    return seen
+
+
+@pytest.mark.parametrize("tts_class", [FakeTTS, FakeBatchTTS])
+def test_stop_during_a_cached_prefix(cache, tts_class):
+    texts = [f"Câu số {i} " + "xin chào " * (i % 7) for i in range(100)]
+    run(fake_gui(tts_class(max_batch_size=4)), texts)  # fill the cache
+
+    tts = tts_class(max_batch_size=4)
+    assert run(fake_gui(tts), texts, stop_after=5) == list(range(5))
+    assert tts.calls == 0
+
+
+@pytest.mark.parametrize("tts_class", [FakeTTS, FakeBatchTTS])
+def test_cached_and_new_chunks_come_back_in_order(cache, tts_class):
+    texts = [f"Câu số {i} " + "xin chào " * (i % 7) for i in range(40)]
+    run(fake_gui(tts_class(max_batch_size=4)), texts[:20])
+
+    tts = tts_class(max_batch_size=4)
+    assert run(fake_gui(tts), texts) == list(range(40))
+    assert tts.calls == 20
@@ -0,0 +1,272 @@
+"""Tests for the model-free helpers of vntts.vieneu_tts (no weights are downloaded)."""
+
+import random
+import re
+import unicodedata
+
+import numpy as np
+import pytest
+
+for _module in ("torch", "librosa", "neucodec", "phonemizer"):
+    pytest.importorskip(_module)
+
+from vntts.vieneu_tts.vieneu_tts import _OverlapAddAccumulator, _linear_overlap_add
+
+
+@pytest.mark.parametrize(
+    "stride, lengths",
+    [
+        (480, [480 + 2 * 240] * 6),  # streaming layout: fixed frames with overlap on both sides
+        (480, [960] * 5 + [700]),  # shorter last frame
+        (7, [7] * 10),  # no overlap
+        (5, [23, 11, 17, 5, 30, 9]),  # frames reaching past several later offsets
+        (100, [100]),  # single frame
+    ],
+)
+def test_accumulator_matches_linear_overlap_add(stride, lengths):
+    rng = np.random.default_rng(len(lengths) * stride)
+    frames = [rng.standard_normal(n).astype(np.float32) for n in lengths]
+
+    accumulator = _OverlapAddAccumulator(stride)
+    chunks = [accumulator.push(frame, final=i == len(frames) - 1) for i, frame in enumerate(frames)]
+
+    np.testing.assert_array_equal(np.concatenate(chunks), _linear_overlap_add(frames, stride))
+
+
+def test_accumulator_only_emits_final_samples():
+    stride = 10
+    frames = [np.ones(30, dtype=np.float32)] * 4
+    accumulator = _OverlapAddAccumulator(stride)
+
+    emitted = [accumulator.push(frame).shape[-1] for frame in frames]
+
+    # Samples before the next frame's offset are final; the overlapping tail is held back
+    assert emitted == [stride] * 4
+    assert accumulator.push(frames[0], final=True).shape[-1] == 30
+
+
+class _FixedBatchAxisError(Exception):
+    """Stands in for onnxruntime's InvalidArgument/Fail, which are not RuntimeErrors."""
+
+
+class _ConvCodec:
+    """Fake decoder: each frame hears its neighbours, edge-padded at the ends like a conv stack."""
+
+    def __init__(self, hop_length, max_batch=None, radius=2):
+        self.hop_length = hop_length
+        self.max_batch = max_batch
+        self.radius = radius
+        self.batch_sizes = []
+
+    def decode_code(self, codes):
+        if self.max_batch is not None and codes.shape[0] > self.max_batch:
+            raise _FixedBatchAxisError(f"batch {codes.shape[0]} != {self.max_batch}")
+        self.batch_sizes.append(codes.shape[0])
+        width = 2 * self.radius + 1
+        padded = np.pad(codes.astype(np.float64), [(0, 0), (0, 0), (self.radius, self.radius)], mode="edge")
+        frames = np.stack([padded[..., i : i + codes.shape[-1]] for i in range(width)]).mean(axis=0)
+        return np.repeat(frames, self.hop_length, axis=-1).astype(np.float32)
+
+
+def _fast_tts_with_codec(codec):
+    from vntts.vieneu_tts.vieneu_tts import FastVieNeuTTS
+
+    tts = object.__new__(FastVieNeuTTS)
+    tts.hop_length = codec.hop_length
+    tts.codec = codec
+    tts._is_onnx_codec = True
+    return tts
+
+
+def _codes_string(ids):
+    return "".join(f"<|speech_{i}|>" for i in ids)
+
+
+def test_decode_batch_pads_mixed_lengths_into_buckets():
+    rng = np.random.default_rng(0)
+    lengths = [12, 30, 14, 7, 90, 33, 31, 200]
+    codes_list = [_codes_string(rng.integers(0, 65536, n)) for n in lengths]
+    codec = _ConvCodec(hop_length=4)
+    tts = _fast_tts_with_codec(codec)
+
+    batched = tts._decode_batch(codes_list, max_pad_frames=10)
+    # Buckets {7, 12, 14} and {30, 31, 33} share a forward; 90 and 200 are decoded alone
+    assert sorted(codec.batch_sizes) == [1, 1, 3, 3]
+
+    for n, codes, wav in zip(lengths, codes_list, batched):
+        assert wav.shape == (n * 4,)
+        np.testing.assert_array_equal(wav, tts._decode(codes))
+
+
+def test_decode_batch_pads_to_the_batch_maximum():
+    rng = np.random.default_rng(1)
+    codes_list = [_codes_string(rng.integers(0, 65536, n)) for n in (40, 17, 63, 25)]
+    codec = _ConvCodec(hop_length=4)
+    tts = _fast_tts_with_codec(codec)
+
+    batched = tts._decode_batch(codes_list, max_pad_frames=100)
+
+    assert codec.batch_sizes == [4]
+    for codes, wav in zip(codes_list, batched):
+        np.testing.assert_array_equal(wav, tts._decode(codes))
+
+
+def test_decode_batch_decodes_singletons_in_threads():
+    codes_list = [_codes_string(range(n)) for n in (5, 50, 100, 150)]
+    codec = _ConvCodec(hop_length=4)
+    tts = _fast_tts_with_codec(codec)
+
+    batched = tts._decode_batch(codes_list, max_pad_frames=10, max_workers=3)
+
+    assert codec.batch_sizes == [1, 1, 1, 1]
+    for codes, wav in zip(codes_list, batched):
+        np.testing.assert_array_equal(wav, tts._decode(codes))
+
+
+def test_decode_batch_falls_back_on_non_runtime_errors():
+    codes_list = [_codes_string(range(i, i + 10 + i)) for i in range(4)]
+    codec = _ConvCodec(hop_length=4, max_batch=1)
+    tts = _fast_tts_with_codec(codec)
+
+    batched = tts._decode_batch(codes_list, max_workers=2)
+
+    assert codec.batch_sizes == [1, 1, 1, 1]
+    for codes, wav in zip(codes_list, batched):
+        np.testing.assert_array_equal(wav, tts._decode(codes))
+
+
+# Qwen2's pre-tokenizer regex, with \p{L} and \p{N} spelled for the re module
+_PRETOKENIZE = re.compile(
+    r"(?i:'s|'t|'re|'ve|'m|'ll|'d)|(?:[^\r\n\w]|_)?[^\W\d_]+|\d| ?(?:[^\s\w]|_)+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+_SPECIAL_TOKENS = [
+    "<|TEXT_REPLACE|>", "<|SPEECH_REPLACE|>", "<|TEXT_PROMPT_START|>", "<|TEXT_PROMPT_END|>",
+    "<|SPEECH_GENERATION_START|>",
+]
+
+
+class _ToyBPETokenizer:
+    """
+    Tiny BPE tokenizer built like the backbone's: NFC, special tokens split out,
+    pre-tokenized with the Qwen2 regex, merges applied inside each pre-token.
+
+    The merge table deliberately includes pairs across a space (e.g. "1" + " "),
+    which a tokenizer without the pre-tokenizer would apply across the seam.
+    """
+
+    def __init__(self, merges):
+        self.merges = {pair: rank for rank, pair in enumerate(merges)}
+        self.vocab = {token: i for i, token in enumerate(_SPECIAL_TOKENS)}
+
+    def convert_tokens_to_ids(self, token):
+        return self.vocab[token]
+
+    def _bpe(self, piece):
+        symbols = list(piece)
+        while len(symbols) > 1:
+            pairs = [(self.merges.get(pair, len(self.merges)), i) for i, pair in enumerate(zip(symbols, symbols[1:]))]
+            rank, i = min(pairs)
+            if rank == len(self.merges):
+                break
+            symbols[i : i + 2] = [symbols[i] + symbols[i + 1]]
+        return symbols
+
+    def encode(self, text, add_special_tokens=True, pretokenize=True):
+        ids = []
+        for part in re.split("(" + "|".join(map(re.escape, _SPECIAL_TOKENS)) + ")", unicodedata.normalize("NFC", text)):
+            if part in self.vocab and part in _SPECIAL_TOKENS:
+                ids.append(self.vocab[part])
+                continue
+            for piece in (_PRETOKENIZE.findall(part) if pretokenize else [part] if part else []):
+                ids.extend(self.vocab.setdefault(token, len(self.vocab)) for token in self._bpe(piece))
+        return ids
+
+
+def _joint_chat_template(tokenizer, ref_codes, ref_phonemes, input_phonemes):
+    """VieNeuTTS._apply_chat_template before the reference prompt was cached (one joint encode)."""
+    input_ids = tokenizer.encode(ref_phonemes + " " + input_phonemes, add_special_tokens=False)
+    chat = """user: Convert the text to speech:<|TEXT_REPLACE|>\nassistant:<|SPEECH_REPLACE|>"""
+    ids = tokenizer.encode(chat)
+    text_replace_idx = ids.index(tokenizer.convert_tokens_to_ids("<|TEXT_REPLACE|>"))
+    ids = (
+        ids[:text_replace_idx]
+        + [tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_START|>")]
+        + input_ids
+        + [tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_END|>")]
+        + ids[text_replace_idx + 1 :]
+    )
+    speech_replace_idx = ids.index(tokenizer.convert_tokens_to_ids("<|SPEECH_REPLACE|>"))
+    codes = tokenizer.encode("".join(f"<|speech_{i}|>" for i in ref_codes), add_special_tokens=False)
+    return ids[:speech_replace_idx] + [tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_START|>")] + codes
+
+
+_PHONEME_PIECES = ["sin1", "tʃaːw2", "ɗɯəŋ2", "ŋ", "ɲ", "ˈa", "ː", "é", "1", "23", ".", ",", "!", "'s", "-", "_", "ʔ", "x"]
+_SEPARATORS = [" ", "  ", "", " \t", "\n"]
+_SEAM_CASES = [
+    ("sin1 tʃaːw2.", "ɗɯəŋ2 ɲaː1"),
+    ("sin1 tʃaːw2 ", "ɗɯəŋ2"),  # espeak leaves a trailing word separator
+    ("sin1  ", "  ɗɯəŋ2"),  # whitespace run across the seam
+    ("sin1", " ɗɯəŋ2"),
+    ("a1 ,", ", b2"),
+    ("x'", "s y"),
+    ("", "sin1"),
+    ("sin1", ""),
+    ("sin1 ", ""),
+    ("ˈa", "́e"),  # combining mark right after the seam
+    ("a1\n", "b2"),
+]
+
+
+def _toy_tokenizer():
+    merges = [
+        ("2", " "), ("s", "i"), ("si", "n"), ("sin", "1"), ("t", "ʃ"), ("a", "ː"), ("tʃ", "aː"), ("ɗ", "ɯ"), ("ə", "ŋ"),
+        (" ", "s"), (" ", "ɗɯ"), ("1", " "), (".", " "), (" ", " "), ("ŋ", "2"), (" ", "ɗ"),
+        (" ", "tʃaː"), ("aː", "w"), ("w", "2"), (",", " "), ("ː", " "), (" ", ","),
+    ]
+    return _ToyBPETokenizer(merges)
+
+
+def _vieneu_tts_with_tokenizer(tokenizer, monkeypatch):
+    from vntts.vieneu_tts import vieneu_tts
+
+    # Feed phoneme strings straight through, without espeak or the dictionary
+    monkeypatch.setattr(vieneu_tts, "phonemize_with_dict", lambda text: text)
+    tts = object.__new__(vieneu_tts.VieNeuTTS)
+    tts.tokenizer = tokenizer
+    tts._ref_prompt_cache = {}
+    return tts
+
+
+def test_toy_tokenizer_merges_across_the_seam_without_pretokenizing():
+    tokenizer = _toy_tokenizer()
+    ref, text = "tʃaːw2", "ɗɯəŋ2"
+    split = tokenizer.encode(ref, pretokenize=False) + tokenizer.encode(" " + text, pretokenize=False)
+    assert tokenizer.encode(ref + " " + text, pretokenize=False) != split
+
+
+@pytest.mark.parametrize("ref_phonemes, input_phonemes", _SEAM_CASES)
+def test_cached_chat_template_matches_joint_encoding(monkeypatch, ref_phonemes, input_phonemes):
+    tokenizer = _toy_tokenizer()
+    tts = _vieneu_tts_with_tokenizer(tokenizer, monkeypatch)
+    ref_codes = [5, 17, 65535]
+
+    ids = tts._apply_chat_template(ref_codes, ref_phonemes, input_phonemes)
+
+    assert ids == _joint_chat_template(tokenizer, ref_codes, ref_phonemes, input_phonemes)
+
+
+def test_cached_chat_template_matches_joint_encoding_on_random_phonemes(monkeypatch):
+    rng = random.Random(0)
+    tokenizer = _toy_tokenizer()
+    tts = _vieneu_tts_with_tokenizer(tokenizer, monkeypatch)
+
+    def phonemes():
+        return "".join(rng.choice(_PHONEME_PIECES) + rng.choice(_SEPARATORS) for _ in range(rng.randrange(4)))
+
+    refs = [phonemes() for _ in range(20)]
+    for _ in range(2000):
+        ref_phonemes, input_phonemes = rng.choice(refs), phonemes()
+        ids = tts._apply_chat_template([1, 2, 3], ref_phonemes, input_phonemes)
+        assert ids == _joint_chat_template(tokenizer, [1, 2, 3], ref_phonemes, input_phonemes), (
+            ref_phonemes, input_phonemes
+        )
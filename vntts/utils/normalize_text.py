@@ -1,5 +1,56 @@
 import re
 
+# Patterns are compiled once at import time; the normalizer only calls `.sub`.
+_I = re.IGNORECASE
+
+_RE_TEMP_NEG_C = re.compile(r'-(\d+(?:[.,]\d+)?)\s*°\s*c\b', _I)
+_RE_TEMP_NEG_F = re.compile(r'-(\d+(?:[.,]\d+)?)\s*°\s*f\b', _I)
+_RE_TEMP_C = re.compile(r'(\d+(?:[.,]\d+)?)\s*°\s*c\b', _I)
+_RE_TEMP_F = re.compile(r'(\d+(?:[.,]\d+)?)\s*°\s*f\b', _I)
+
+_RE_CURRENCY_DECIMAL = re.compile(r'(\d+)[.,](\d+)\s*([kmb])\b', _I)
+_RE_CURRENCY_K = re.compile(r'(\d+)\s*k\b', _I)
+_RE_CURRENCY_M = re.compile(r'(\d+)\s*m\b', _I)
+_RE_CURRENCY_B = re.compile(r'(\d+)\s*b\b', _I)
+_RE_CURRENCY_DONG = re.compile(r'(\d+(?:[.,]\d+)?)\s*đ\b')
+_RE_CURRENCY_VND = re.compile(r'(\d+(?:[.,]\d+)?)\s*vnd\b', _I)
+_RE_CURRENCY_DOLLAR_PREFIX = re.compile(r'\$\s*(\d+(?:[.,]\d+)?)')
+_RE_CURRENCY_DOLLAR_SUFFIX = re.compile(r'(\d+(?:[.,]\d+)?)\s*\$')
+
+_RE_PERCENTAGE = re.compile(r'(\d+(?:[.,]\d+)?)\s*%')
+
+_RE_UNIT_COMPOUND_NUMBER = re.compile(r'(\d+(?:[.,]\d+)?)\s*([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b')
+_RE_UNIT_COMPOUND = re.compile(r'\b([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b')
+
+_RE_TIME_HMS = re.compile(r'(\d{1,2}):(\d{2}):(\d{2})')
+_RE_TIME_HM = re.compile(r'(\d{1,2}):(\d{2})')
+_RE_TIME_H_M = re.compile(r'(\d{1,2})h(\d{2})')
+_RE_TIME_H = re.compile(r'(\d{1,2})h\b')
+
+_RE_DATE_PREFIXED = re.compile(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b')
+_RE_DATE_PREFIXED_SHORT = re.compile(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b')
+_RE_DATE_ISO = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+_RE_DATE = re.compile(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b')
+_RE_DATE_SHORT = re.compile(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b')
+
+_RE_PHONE_INTL = re.compile(r'(\+84|84)[\s\-\.]?\d[\d\s\-\.]{7,}')
+_RE_PHONE_LOCAL = re.compile(r'\b0\d[\d\s\-\.]{8,}')
+_RE_NON_DIGIT = re.compile(r'[^\d]')
+
+_RE_NUMBER_PERCENT = re.compile(r'(\d+(?:[,.]\d+)?)%')
+_RE_THOUSANDS = re.compile(r'(\d{1,3})(?:\.(\d{3}))+')
+_RE_DECIMAL_COMMA = re.compile(r'(\d+),(\d+)')
+_RE_DECIMAL_DOT = re.compile(r'(\d+)\.(\d{1,2})\b')
+_RE_INTEGER = re.compile(r'\b\d+\b')
+
+_RE_BRACKETS = re.compile(r'[\[\]\(\)\{\}]')
+_RE_DASH = re.compile(r'\s+[-–—]+\s+')
+_RE_ELLIPSIS = re.compile(r'\.{2,}')
+_RE_LONE_DOT = re.compile(r'\s+\.\s+')
+_RE_DISALLOWED = re.compile(r'[^\w\sàáảãạăắằẳẵặâấầẩẫậèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ.,!?;:@%]')
+_RE_WHITESPACE = re.compile(r'\s+')
+
+
 class VietnameseTTSNormalizer:
     """
     A text normalizer for Vietnamese Text-to-Speech systems.
@@ -43,6 +94,29 @@ class VietnameseTTSNormalizer:
         
         self.digits = ['không', 'một', 'hai', 'ba', 'bốn', 
                       'năm', 'sáu', 'bảy', 'tám', 'chín']
+        
+        # All units in one alternation, longest first, so a single scan gives
+        # the same result as one pass per unit in that order
+        sorted_units = sorted(self.units, key=len, reverse=True)
+        unit_alternation = '|'.join(map(re.escape, sorted_units))
+        self._unit_lookup = {unit.lower(): full_name for unit, full_name in self.units.items()}
+        self._unit_pattern = re.compile(r'(\d+(?:[.,]\d+)?)\s*(' + unit_alternation + r')\b', _I)
+        
+        # The single scan only differs from per-unit passes when the digit of a
+        # unit like "m3" is read as the number of the next unit ("5m3 dm").
+        # Such text is rare and takes the per-unit path instead.
+        digit_units = [unit for unit in sorted_units if any(c.isdigit() for c in unit)]
+        self._unit_chain_pattern = re.compile(
+            r'(?:' + '|'.join(map(re.escape, digit_units)) + r')\s*(?:' + unit_alternation + r')\b', _I
+        )
+        self._unit_pass_patterns = [
+            (re.compile(r'(\d+(?:[.,]\d+)?)\s*' + re.escape(unit) + r'\b', _I), rf'\1 {self.units[unit]}')
+            for unit in sorted_units
+        ]
+        symbol_units = [unit for unit in sorted_units if any(c in unit for c in '²³°')]
+        self._unit_symbol_pattern = re.compile(
+            r'\b(' + '|'.join(map(re.escape, symbol_units)) + r')\b', _I
+        )
     
     def normalize(self, text):
         """Main normalization pipeline."""
@@ -62,11 +136,11 @@ class VietnameseTTSNormalizer:
     
     def _normalize_temperature(self, text):
         """Convert temperature notation to words."""
-        text = re.sub(r'-(\d+(?:[.,]\d+)?)\s*°\s*c\b', r'âm \1 độ xê', text, flags=re.IGNORECASE)
-        text = re.sub(r'-(\d+(?:[.,]\d+)?)\s*°\s*f\b', r'âm \1 độ ép', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*°\s*c\b', r'\1 độ xê', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*°\s*f\b', r'\1 độ ép', text, flags=re.IGNORECASE)
-        text = re.sub(r'°', ' độ ', text)
+        text = _RE_TEMP_NEG_C.sub(r'âm \1 độ xê', text)
+        text = _RE_TEMP_NEG_F.sub(r'âm \1 độ ép', text)
+        text = _RE_TEMP_C.sub(r'\1 độ xê', text)
+        text = _RE_TEMP_F.sub(r'\1 độ ép', text)
+        text = text.replace('°', ' độ ')
         return text
     
     def _normalize_currency(self, text):
@@ -80,19 +154,19 @@ class VietnameseTTSNormalizer:
             unit_word = unit_map.get(unit.lower(), unit)
             return f"{whole} phẩy {decimal_words} {unit_word}"
         
-        text = re.sub(r'(\d+)[.,](\d+)\s*([kmb])\b', decimal_currency, text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*k\b', r'\1 nghìn', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*m\b', r'\1 triệu', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+)\s*b\b', r'\1 tỷ', text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*đ\b', r'\1 đồng', text)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*vnd\b', r'\1 đồng', text, flags=re.IGNORECASE)
-        text = re.sub(r'\$\s*(\d+(?:[.,]\d+)?)', r'\1 đô la', text)
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*\$', r'\1 đô la', text)
+        text = _RE_CURRENCY_DECIMAL.sub(decimal_currency, text)
+        text = _RE_CURRENCY_K.sub(r'\1 nghìn', text)
+        text = _RE_CURRENCY_M.sub(r'\1 triệu', text)
+        text = _RE_CURRENCY_B.sub(r'\1 tỷ', text)
+        text = _RE_CURRENCY_DONG.sub(r'\1 đồng', text)
+        text = _RE_CURRENCY_VND.sub(r'\1 đồng', text)
+        text = _RE_CURRENCY_DOLLAR_PREFIX.sub(r'\1 đô la', text)
+        text = _RE_CURRENCY_DOLLAR_SUFFIX.sub(r'\1 đô la', text)
         return text
     
     def _normalize_percentage(self, text):
         """Convert percentage to words."""
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*%', r'\1 phần trăm', text)
+        text = _RE_PERCENTAGE.sub(r'\1 phần trăm', text)
         return text
     
     def _normalize_units(self, text):
@@ -112,20 +186,19 @@ class VietnameseTTSNormalizer:
             full_unit2 = self.units.get(unit2, unit2)
             return f"{full_unit1} trên {full_unit2}"
         
-        text = re.sub(r'(\d+(?:[.,]\d+)?)\s*([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b', 
-                     expand_compound_with_number, text)
-        text = re.sub(r'\b([a-zA-Zμµ²³°]+)/([a-zA-Zμµ²³°0-9]+)\b', 
-                     expand_compound_without_number, text)
-        
-        sorted_units = sorted(self.units.items(), key=lambda x: len(x[0]), reverse=True)
-        for unit, full_name in sorted_units:
-            pattern = r'(\d+(?:[.,]\d+)?)\s*' + re.escape(unit) + r'\b'
-            text = re.sub(pattern, rf'\1 {full_name}', text, flags=re.IGNORECASE)
+        text = _RE_UNIT_COMPOUND_NUMBER.sub(expand_compound_with_number, text)
+        text = _RE_UNIT_COMPOUND.sub(expand_compound_without_number, text)
         
-        for unit, full_name in sorted_units:
-            if any(c in unit for c in '²³°'):
-                pattern = r'\b' + re.escape(unit) + r'\b'
-                text = re.sub(pattern, full_name, text, flags=re.IGNORECASE)
+        if self._unit_chain_pattern.search(text):
+            for pattern, replacement in self._unit_pass_patterns:
+                text = pattern.sub(replacement, text)
+        else:
+            text = self._unit_pattern.sub(
+                lambda m: f"{m.group(1)} {self._unit_lookup[m.group(2).lower()]}", text
+            )
+        text = self._unit_symbol_pattern.sub(
+            lambda m: self._unit_lookup[m.group(1).lower()], text
+        )
         
         return text
     
@@ -175,10 +248,10 @@ class VietnameseTTSNormalizer:
                 return f"{hour} giờ"
         
         # Apply patterns with validation
-        text = re.sub(r'(\d{1,2}):(\d{2}):(\d{2})', validate_and_convert_time, text)
-        text = re.sub(r'(\d{1,2}):(\d{2})', validate_and_convert_time, text)
-        text = re.sub(r'(\d{1,2})h(\d{2})', validate_and_convert_time, text)
-        text = re.sub(r'(\d{1,2})h\b', validate_and_convert_time, text)
+        text = _RE_TIME_HMS.sub(validate_and_convert_time, text)
+        text = _RE_TIME_HM.sub(validate_and_convert_time, text)
+        text = _RE_TIME_H_M.sub(validate_and_convert_time, text)
+        text = _RE_TIME_H.sub(validate_and_convert_time, text)
         
         return text
     
@@ -217,13 +290,11 @@ class VietnameseTTSNormalizer:
             return match.group(0)
         
         # Apply patterns with validation
-        text = re.sub(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b', 
-                    lambda m: date_to_text(m).replace('ngày ngày', 'ngày'), text)
-        text = re.sub(r'\bngày\s+(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b', 
-                    lambda m: date_short_year(m).replace('ngày ngày', 'ngày'), text)
-        text = re.sub(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b', date_iso_to_text, text)
-        text = re.sub(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})\b', date_to_text, text)
-        text = re.sub(r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})\b', date_short_year, text)
+        text = _RE_DATE_PREFIXED.sub(lambda m: date_to_text(m).replace('ngày ngày', 'ngày'), text)
+        text = _RE_DATE_PREFIXED_SHORT.sub(lambda m: date_short_year(m).replace('ngày ngày', 'ngày'), text)
+        text = _RE_DATE_ISO.sub(date_iso_to_text, text)
+        text = _RE_DATE.sub(date_to_text, text)
+        text = _RE_DATE_SHORT.sub(date_short_year, text)
         
         return text
     
@@ -231,7 +302,7 @@ class VietnameseTTSNormalizer:
         """Convert phone numbers to digit-by-digit reading."""
         def phone_to_text(match):
             phone = match.group(0)
-            phone = re.sub(r'[^\d]', '', phone)
+            phone = _RE_NON_DIGIT.sub('', phone)
             
             if phone.startswith('84') and len(phone) >= 10:
                 phone = '0' + phone[2:]
@@ -242,14 +313,14 @@ class VietnameseTTSNormalizer:
             
             return match.group(0)
         
-        text = re.sub(r'(\+84|84)[\s\-\.]?\d[\d\s\-\.]{7,}', phone_to_text, text)
-        text = re.sub(r'\b0\d[\d\s\-\.]{8,}', phone_to_text, text)
+        text = _RE_PHONE_INTL.sub(phone_to_text, text)
+        text = _RE_PHONE_LOCAL.sub(phone_to_text, text)
         return text
     
     def _normalize_numbers(self, text):
-        text = re.sub(r'(\d+(?:[,.]\d+)?)%', lambda m: f'{m.group(1)} phần trăm', text)
+        text = _RE_NUMBER_PERCENT.sub(lambda m: f'{m.group(1)} phần trăm', text)
         # 1. Xóa dấu thousand separator trước
-        text = re.sub(r'(\d{1,3})(?:\.(\d{3}))+', lambda m: m.group(0).replace('.', ''), text)
+        text = _RE_THOUSANDS.sub(lambda m: m.group(0).replace('.', ''), text)
     
         # 2. Chuyển số thập phân thành chữ
         def decimal_to_words(match):
@@ -260,9 +331,9 @@ class VietnameseTTSNormalizer:
             return f"{whole} {separator} {decimal_words}"
         
         # 2a. Dấu phẩy
-        text = re.sub(r'(\d+),(\d+)', decimal_to_words, text)
+        text = _RE_DECIMAL_COMMA.sub(decimal_to_words, text)
         # 2b. Dấu chấm (1-2 chữ số thập phân)
-        text = re.sub(r'(\d+)\.(\d{1,2})\b', decimal_to_words, text)
+        text = _RE_DECIMAL_DOT.sub(decimal_to_words, text)
         
         return text
     
@@ -350,7 +421,7 @@ class VietnameseTTSNormalizer:
             num = int(match.group(0))
             return self._convert_number_to_words(num)
         
-        text = re.sub(r'\b\d+\b', convert_number, text)
+        text = _RE_INTEGER.sub(convert_number, text)
         return text
     
     def _normalize_special_chars(self, text):
@@ -359,16 +430,16 @@ class VietnameseTTSNormalizer:
         text = text.replace('+', ' cộng ')
         text = text.replace('=', ' bằng ')
         text = text.replace('#', ' thăng ')
-        text = re.sub(r'[\[\]\(\)\{\}]', ' ', text)
-        text = re.sub(r'\s+[-–—]+\s+', ' ', text)
-        text = re.sub(r'\.{2,}', ' ', text)
-        text = re.sub(r'\s+\.\s+', ' ', text)
-        text = re.sub(r'[^\w\sàáảãạăắằẳẵặâấầẩẫậèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ.,!?;:@%]', ' ', text)
+        text = _RE_BRACKETS.sub(' ', text)
+        text = _RE_DASH.sub(' ', text)
+        text = _RE_ELLIPSIS.sub(' ', text)
+        text = _RE_LONE_DOT.sub(' ', text)
+        text = _RE_DISALLOWED.sub(' ', text)
         return text
     
     def _normalize_whitespace(self, text):
         """Normalize whitespace."""
-        text = re.sub(r'\s+', ' ', text)
+        text = _RE_WHITESPACE.sub(' ', text)
         text = text.strip()
         return text
 
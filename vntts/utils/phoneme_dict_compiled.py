@@ -0,0 +1,197 @@
+"""
+Memory-mapped phoneme dictionary.
+
+`phoneme_dict.json` is compiled into a binary file with keys sorted by their
+UTF-8 bytes and offset tables for keys and values. Opening it only maps the
+file; each lookup is a binary search over the mapped keys, so nothing is
+parsed up front.
+
+Layout (little-endian):
+    header   magic(8) count(u32) json_size(u64) json_mtime_ns(u64) json_sha1(20)
+    key_offsets[count + 1]   u32, into the key blob
+    value_offsets[count + 1] u32, into the value blob
+    key blob, value blob     UTF-8
+
+Build:
+    python vntts/utils/phoneme_dict_compiled.py [phoneme_dict.json] [phoneme_dict.bin]
+
+The loader also rebuilds the file automatically when it is missing or stale.
+"""
+
+import functools
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+MAGIC = b"PHDICT1\0"
+HEADER = struct.Struct("<8sIQQ20s")
+# Recent lookups kept per dictionary (hits and misses); a text repeats the same few thousand words
+LOOKUP_CACHE_SIZE = 8192
+
+
+def compiled_path_for(json_path: str) -> str:
+    """Path of the compiled dictionary next to `json_path`."""
+    return os.path.splitext(json_path)[0] + ".bin"
+
+
+def _json_signature(json_path: str) -> tuple[int, int]:
+    stat = os.stat(json_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _sha1_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _u32_array(values) -> bytes:
+    arr = array("I", values)
+    if arr.itemsize != 4:
+        arr = array("L", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def compile_phoneme_dict(json_path: str, out_path: str | None = None) -> str:
+    """
+    Compile a JSON phoneme dictionary into the memory-mappable format.
+
+    Args:
+        json_path: Source `phoneme_dict.json`
+        out_path: Output path (defaults to `compiled_path_for(json_path)`)
+
+    Returns:
+        Path of the written file
+    """
+    out_path = out_path or compiled_path_for(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    items = sorted((key.encode("utf-8"), value.encode("utf-8")) for key, value in data.items())
+    key_offsets = [0]
+    value_offsets = [0]
+    for key, value in items:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+
+    json_size, json_mtime_ns = _json_signature(json_path)
+    header = HEADER.pack(MAGIC, len(items), json_size, json_mtime_ns, _sha1_file(json_path))
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(_u32_array(key_offsets))
+        f.write(_u32_array(value_offsets))
+        f.write(b"".join(key for key, _ in items))
+        f.write(b"".join(value for _, value in items))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class CompiledPhonemeDict(Mapping):
+    """Read-only mapping over a compiled phoneme dictionary."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, self.json_size, self.json_mtime_ns, self.json_sha1 = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a compiled phoneme dictionary: {path}")
+
+        self._count = count
+        table_size = 4 * (count + 1)
+        key_table = HEADER.size
+        value_table = key_table + table_size
+        self._key_offsets = memoryview(self._mm)[key_table:value_table].cast("I")
+        self._value_offsets = memoryview(self._mm)[value_table:value_table + table_size].cast("I")
+        self._keys_start = value_table + table_size
+        self._values_start = self._keys_start + self._key_offsets[count]
+        self._lookup = functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._search)
+
+    def close(self):
+        self._lookup.cache_clear()
+        self._key_offsets.release()
+        self._value_offsets.release()
+        self._mm.close()
+
+    def is_fresh(self, json_path: str) -> bool:
+        """Check that this file was compiled from the current `json_path`."""
+        json_size, json_mtime_ns = _json_signature(json_path)
+        if json_size != self.json_size:
+            return False
+        if json_mtime_ns == self.json_mtime_ns:
+            return True
+        # mtime changes on copy/checkout; fall back to the content hash
+        return _sha1_file(json_path) == self.json_sha1
+
+    def _key_at(self, i: int) -> bytes:
+        start = self._keys_start
+        return self._mm[start + self._key_offsets[i]:start + self._key_offsets[i + 1]]
+
+    def _value_at(self, i: int) -> str:
+        start = self._values_start
+        return self._mm[start + self._value_offsets[i]:start + self._value_offsets[i + 1]].decode("utf-8")
+
+    def _search(self, word: str) -> str | None:
+        target = word.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._value_at(lo) if lo < self._count and self._key_at(lo) == target else None
+
+    def __getitem__(self, word: str) -> str:
+        value = self._lookup(word) if isinstance(word, str) else None
+        if value is None:
+            raise KeyError(word)
+        return value
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self._lookup(word) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._key_at(i).decode("utf-8")
+
+
+def load_compiled_phoneme_dict(json_path: str) -> CompiledPhonemeDict | None:
+    """
+    Open the compiled dictionary for `json_path`, rebuilding it when stale.
+
+    Returns None when no usable compiled file can be produced, in which case
+    the caller should fall back to the JSON.
+    """
+    if sys.byteorder != "little":
+        return None
+
+    bin_path = compiled_path_for(json_path)
+    try:
+        if os.path.exists(bin_path):
+            compiled = CompiledPhonemeDict(bin_path)
+            if compiled.is_fresh(json_path):
+                return compiled
+            compiled.close()
+        compile_phoneme_dict(json_path, bin_path)
+        return CompiledPhonemeDict(bin_path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Warning: Compiled phoneme dictionary unavailable, using JSON: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "phoneme_dict.json")
+    dst = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Compiled: {compile_phoneme_dict(src, dst)}")
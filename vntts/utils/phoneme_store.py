@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+
+# Configuration
+LEARNED_PHONEME_DB_PATH = os.getenv(
+    'LEARNED_PHONEME_DB_PATH',
+    os.path.join(os.path.expanduser("~"), ".cache", "vieneu_tts", "learned_phonemes.sqlite3")
+)
+
+
+class LearnedPhonemeStore:
+    """
+    Persistent store for phonemes learned from espeak.
+
+    Backed by SQLite in WAL mode so several worker processes can share it.
+    Lookups are served from an in-memory mirror; misses fall through to the
+    database to pick up words learned by other processes. New entries are
+    buffered and written in one transaction per `flush`.
+    """
+
+    def __init__(self, path: str | None = LEARNED_PHONEME_DB_PATH):
+        """
+        Args:
+            path: SQLite file path (None keeps the store in memory only)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = {}
+        self._pending: dict[str, str] = {}
+        self._conn = None
+
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS phonemes (word TEXT PRIMARY KEY, phones TEXT NOT NULL)"
+            )
+            self._conn.commit()
+            self._entries = dict(self._conn.execute("SELECT word, phones FROM phonemes"))
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: Learned phoneme store unavailable ({path}): {e}")
+            self._conn = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, words) -> dict:
+        """Look up words, returning only those that are known."""
+        found = {}
+        missing = []
+        with self._lock:
+            for word in words:
+                phones = self._entries.get(word)
+                if phones is not None:
+                    found[word] = phones
+                else:
+                    missing.append(word)
+
+            if missing and self._conn is not None:
+                try:
+                    for start in range(0, len(missing), 500):
+                        batch = missing[start:start + 500]
+                        placeholders = ",".join("?" * len(batch))
+                        rows = self._conn.execute(
+                            f"SELECT word, phones FROM phonemes WHERE word IN ({placeholders})", batch
+                        )
+                        for word, phones in rows:
+                            self._entries[word] = phones
+                            found[word] = phones
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not read learned phonemes: {e}")
+        return found
+
+    def add_many(self, items: dict):
+        """Remember new entries; they are persisted on the next `flush`."""
+        with self._lock:
+            self._entries.update(items)
+            self._pending.update(items)
+
+    def flush(self):
+        """Write buffered entries in a single transaction."""
+        with self._lock:
+            if not self._pending or self._conn is None:
+                self._pending.clear()
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO phonemes (word, phones) VALUES (?, ?)",
+                        self._pending.items()
+                    )
+                self._pending.clear()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not save learned phonemes: {e}")
+
+    def compact(self, base_dict=None):
+        """
+        Drop entries already covered by `base_dict` and checkpoint the WAL.
+
+        Called on startup so the store only holds words the base dictionary lacks.
+        """
+        with self._lock:
+            if base_dict is not None:
+                redundant = [word for word in self._entries if word in base_dict]
+                for word in redundant:
+                    del self._entries[word]
+                    self._pending.pop(word, None)
+            else:
+                redundant = []
+            if self._conn is None:
+                return
+            try:
+                if redundant:
+                    with self._conn:
+                        self._conn.executemany(
+                            "DELETE FROM phonemes WHERE word = ?", ((word,) for word in redundant)
+                        )
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print(f"Warning: Could not compact learned phonemes: {e}")
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,10 +1,13 @@
 import os
 import json
+import atexit
 import platform
 import glob
 from phonemizer import phonemize
 from phonemizer.backend.espeak.espeak import EspeakWrapper
 from .normalize_text import VietnameseTTSNormalizer
+from .phoneme_store import LearnedPhonemeStore
+from .phoneme_dict_compiled import load_compiled_phoneme_dict
 
 # Configuration
 PHONEME_DICT_PATH = os.getenv(
@@ -13,8 +16,16 @@ PHONEME_DICT_PATH = os.getenv(
 )
 
 def load_phoneme_dict(path=PHONEME_DICT_PATH):
-    """Load phoneme dictionary from JSON file."""
+    """Load phoneme dictionary, preferring the memory-mapped compiled copy.
+
+    The compiled file is rebuilt when it is missing or older than the JSON;
+    the JSON is parsed only when that is not possible.
+    """
     try:
+        if os.path.exists(path):
+            compiled = load_compiled_phoneme_dict(path)
+            if compiled is not None:
+                return compiled
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except FileNotFoundError:
@@ -100,6 +111,9 @@ try:
     setup_espeak_library()
     phoneme_dict = load_phoneme_dict()
     normalizer = VietnameseTTSNormalizer()
+    learned_phonemes = LearnedPhonemeStore()
+    learned_phonemes.compact(phoneme_dict)
+    atexit.register(learned_phonemes.close)
 except Exception as e:
     print(f"Initialization error: {e}")
     raise
@@ -116,34 +130,53 @@ def phonemize_text(text: str) -> str:
         language_switch="remove-flags"
     )
 
+def _phonemize_words(words: list) -> list:
+    """Phonemize a list of words with one espeak call."""
+    phones = phonemize(
+        words,
+        language='vi',
+        backend='espeak',
+        preserve_punctuation=True,
+        with_stress=True,
+        language_switch='remove-flags'
+    )
+    return [
+        'ɹ' + phone_word[1:] if word.lower().startswith('r') else phone_word
+        for word, phone_word in zip(words, phones)
+    ]
+
 def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict) -> str:
-    """Phonemize text with dictionary lookup."""
+    """Phonemize text with dictionary lookup.
+
+    Words missing from the dictionary are looked up in the persistent
+    learned-phoneme store. The rest are phonemized together in a single
+    batched espeak call and saved to the store.
+    """
     text = normalizer.normalize(text)
     words = text.split()
-    result = []
-    
-    for word in words:
-        if word in phoneme_dict:
-            phone_word = phoneme_dict[word]
-        else:
-            try:
-                phone_word = phonemize(
-                    word,
-                    language='vi',
-                    backend='espeak',
-                    preserve_punctuation=True,
-                    with_stress=True,
-                    language_switch='remove-flags'
-                )
-                
-                if word.lower().startswith('r'):
-                    phone_word = 'ɹ' + phone_word[1:]
-                
-                phoneme_dict[word] = phone_word
-            except Exception as e:
-                print(f"Warning: Could not phonemize '{word}': {e}")
-                phone_word = word
-        
-        result.append(phone_word)
-    
-    return ' '.join(result)
\ No newline at end of file
+
+    # First pass: collect unique out-of-vocabulary words
+    oov_words = list(dict.fromkeys(word for word in words if word not in phoneme_dict))
+    learned = learned_phonemes.get_many(oov_words) if oov_words else {}
+    oov_words = [word for word in oov_words if word not in learned]
+
+    # Second pass: phonemize them in one call (per word if the batch fails)
+    if oov_words:
+        new_phones = {}
+        try:
+            new_phones.update(zip(oov_words, _phonemize_words(oov_words)))
+        except Exception:
+            for word in oov_words:
+                try:
+                    new_phones[word] = _phonemize_words([word])[0]
+                except Exception as e:
+                    print(f"Warning: Could not phonemize '{word}': {e}")
+        if new_phones:
+            learned_phonemes.add_many(new_phones)
+            learned_phonemes.flush()
+            learned.update(new_phones)
+
+    return ' '.join(
+        phoneme_dict[word] if word in phoneme_dict else learned.get(word, word)
+        for word in words
+    )
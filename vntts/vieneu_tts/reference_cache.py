@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import torch
+
+# Configuration
+REF_CACHE_DIR = os.getenv(
+    'VIENEU_REF_CACHE_DIR',
+    os.path.join(os.path.expanduser("~"), ".cache", "vieneu_tts", "ref_codes")
+)
+REF_CACHE_MAX_MEMORY_MB = float(os.getenv('VIENEU_REF_CACHE_MAX_MEMORY_MB', "64"))
+
+
+def _hash_file(path: str | Path, block_size: int = 1 << 20) -> str:
+    """SHA-1 of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReferenceCodeCache:
+    """
+    Two-level cache for encoded reference audio.
+
+    - Memory: LRU bounded by `max_memory_bytes` of code tensors
+    - Disk: content-addressed `.pt` files keyed by (wav hash, codec id, sample rate)
+
+    A voice is encoded once and then loaded from disk on every later start,
+    so the codec encoder is skipped entirely after the first run.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = REF_CACHE_DIR,
+                 max_memory_bytes: int = int(REF_CACHE_MAX_MEMORY_MB * 1024 * 1024)):
+        """
+        Args:
+            cache_dir: Directory for persisted codes (None disables the disk store)
+            max_memory_bytes: Upper bound for in-memory code tensors
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_memory_bytes = max_memory_bytes
+
+        self._entries: OrderedDict[str, torch.Tensor] = OrderedDict()
+        self._memory_bytes = 0
+        # absolute path -> (size, mtime, content hash), so unchanged files are hashed once
+        self._file_hashes: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _cache_key(self, audio_path: str | Path, codec_id: str, sample_rate: int) -> str:
+        path = os.path.abspath(audio_path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._file_hashes.get(path)
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            file_hash = known[2]
+        else:
+            # Hash outside the lock; an edited file replaces its stale entry
+            file_hash = _hash_file(path)
+            with self._lock:
+                self._file_hashes[path] = (stat.st_size, stat.st_mtime_ns, file_hash)
+        return hashlib.sha1(f"{file_hash}:{codec_id}:{sample_rate}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pt"
+
+    def _remember(self, key: str, codes: torch.Tensor):
+        """Insert into the memory LRU, evicting least recently used entries over the cap."""
+        size = codes.element_size() * codes.nelement()
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old.element_size() * old.nelement()
+            self._entries[key] = codes
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted.element_size() * evicted.nelement()
+
+    def _load_from_disk(self, key: str) -> torch.Tensor | None:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            return torch.load(path, map_location="cpu", weights_only=True)
+        except (RuntimeError, EOFError, OSError) as e:
+            print(f"Warning: Corrupted reference cache entry {path.name}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, codes: torch.Tensor):
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            torch.save(codes, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not persist reference codes: {e}")
+
+    def get_or_encode(self, audio_path: str | Path, codec_id: str, sample_rate: int,
+                      encode_fn: Callable[[str | Path], torch.Tensor]) -> torch.Tensor:
+        """
+        Get reference codes from memory or disk, encoding only on a full miss.
+
+        Args:
+            audio_path: Reference audio file
+            codec_id: Codec repository used for encoding
+            sample_rate: Sample rate the audio is loaded at before encoding
+            encode_fn: Called with `audio_path` when the codes are not cached
+
+        Returns:
+            Reference codes as a CPU tensor
+        """
+        key = self._cache_key(audio_path, codec_id, sample_rate)
+
+        with self._lock:
+            codes = self._entries.get(key)
+            if codes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return codes
+
+        codes = self._load_from_disk(key)
+        if codes is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            codes = encode_fn(audio_path).detach().cpu()
+            self._save_to_disk(key, codes)
+
+        self._remember(key, codes)
+        return codes
+
+    def clear_memory(self):
+        """Drop in-memory entries (the disk store is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters and memory usage."""
+        return {
+            'entries': len(self._entries),
+            'memory_bytes': self._memory_bytes,
+            'max_memory_bytes': self.max_memory_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+        }
+
+
+# Process-wide cache shared by VieNeuTTS and FastVieNeuTTS
+shared_reference_cache = ReferenceCodeCache()
@@ -1,14 +1,19 @@
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Iterable
 import librosa
 import numpy as np
 import torch
 from neucodec import NeuCodec, DistillNeuCodec
 from ..utils.phonemize_text import phonemize_with_dict
+from .reference_cache import ReferenceCodeCache, shared_reference_cache
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 import re
 import gc
+import hashlib
+import time
+import queue
+import threading
 
 # ============================================================================
 # Constants
@@ -29,6 +34,12 @@ HƯỚNG DẪN CÀI ĐẶT llama-cpp-python:
 🔹 NẾU VẪN LỖI - Cài từ wheel có sẵn (khuyến nghị):
    pip install llama-cpp-python --extra-index-url https://abetlen.github.io/llama-cpp-python/whl/cpu"""
 
+# Reference audio is loaded at this rate before codec encoding
+ENCODER_SAMPLE_RATE = 16_000
+
+# Batched codec decode pads a sequence by at most this many codes (50 codes = 1 s)
+DECODE_MAX_PAD_FRAMES = 25
+
 # ============================================================================
 # Shared Utilities
 # ============================================================================
@@ -84,6 +95,104 @@ def _linear_overlap_add(frames: list[np.ndarray], stride: int) -> np.ndarray:
     return out / sum_weight
 
 
+class _OverlapAddAccumulator:
+    """
+    Incremental version of `_linear_overlap_add` for streaming.
+
+    Frames are pushed one at a time at offsets of `stride` samples. Samples
+    before the next frame's offset can no longer change, so they are emitted
+    and dropped; only the unfinished tail is kept in memory. Each push costs
+    O(frame length) instead of re-running overlap-add over the whole history,
+    and the emitted samples are identical to slicing `_linear_overlap_add`.
+    """
+
+    def __init__(self, stride: int):
+        self.stride = stride
+        self._n_frames = 0
+        self._start = 0  # absolute sample index of the first buffered sample
+        self._out: np.ndarray | None = None
+        self._sum_weight: np.ndarray | None = None
+        self._weights: dict[int, np.ndarray] = {}
+
+    def _weight(self, frame_length: int, dtype) -> np.ndarray:
+        weight = self._weights.get(frame_length)
+        if weight is None:
+            t = np.linspace(0, 1, frame_length + 2, dtype=dtype)[1:-1]
+            weight = np.abs(0.5 - (t - 0.5))
+            self._weights[frame_length] = weight
+        return weight
+
+    def push(self, frame: np.ndarray, final: bool = False) -> np.ndarray:
+        """
+        Add the next frame and return the samples that became final.
+
+        Args:
+            frame: Next frame, placed `stride` samples after the previous one
+            final: Flush the whole remaining tail (last frame of the stream)
+
+        Returns:
+            Newly finalized samples (may be empty)
+        """
+        frame_length = frame.shape[-1]
+        offset = self._n_frames * self.stride
+
+        if self._out is None:
+            self._out = np.zeros((*frame.shape[:-1], 0), dtype=frame.dtype)
+            self._sum_weight = np.zeros(0, dtype=frame.dtype)
+
+        # Grow the tail buffer to cover the new frame
+        buffer_end = self._start + self._sum_weight.shape[0]
+        frame_end = offset + frame_length
+        if frame_end > buffer_end:
+            pad = frame_end - buffer_end
+            self._out = np.concatenate(
+                [self._out, np.zeros((*self._out.shape[:-1], pad), dtype=self._out.dtype)], axis=-1
+            )
+            self._sum_weight = np.concatenate(
+                [self._sum_weight, np.zeros(pad, dtype=self._sum_weight.dtype)]
+            )
+            buffer_end = frame_end
+
+        weight = self._weight(frame_length, self._sum_weight.dtype)
+        local = offset - self._start
+        self._out[..., local : local + frame_length] += weight * frame
+        self._sum_weight[local : local + frame_length] += weight
+        self._n_frames += 1
+
+        emit_end = buffer_end if final else min(self._n_frames * self.stride, buffer_end)
+        n_emit = emit_end - self._start
+        if n_emit <= 0:
+            return np.zeros((*self._out.shape[:-1], 0), dtype=self._out.dtype)
+
+        assert self._sum_weight[:n_emit].min() > 0
+        emitted = self._out[..., :n_emit] / self._sum_weight[:n_emit]
+        self._out = self._out[..., n_emit:].copy()
+        self._sum_weight = self._sum_weight[n_emit:].copy()
+        self._start = emit_end
+        return emitted
+
+
+def _reference_cache_key(ref_codes, ref_text: str) -> str:
+    """Hash reference codes and text into a prompt cache key"""
+    if isinstance(ref_codes, torch.Tensor):
+        ref_codes = ref_codes.cpu().numpy()
+    codes = np.asarray(ref_codes, dtype=np.int64).reshape(-1)
+    digest = hashlib.sha1(codes.tobytes())
+    digest.update(ref_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _build_reference_prompt(ref_codes, ref_text: str) -> dict:
+    """Phonemize the reference text and render the reference codes as speech tokens"""
+    if isinstance(ref_codes, torch.Tensor):
+        ref_codes = ref_codes.cpu().numpy()
+    codes = np.asarray(ref_codes, dtype=np.int64).reshape(-1).tolist()
+    return {
+        'ref_phonemes': phonemize_with_dict(ref_text),
+        'codes_str': "".join([f"<|speech_{idx}|>" for idx in codes]),
+    }
+
+
 def _compile_codec_with_triton(codec):
     """Compile codec with Triton for faster decoding (Windows/Linux compatible)"""
     try:
@@ -132,6 +241,7 @@ class VieNeuTTS:
         backbone_device="cpu",
         codec_repo="neuphonic/neucodec",
         codec_device="cpu",
+        ref_cache: ReferenceCodeCache | None = None,
     ):
         """
         Initialize VieNeu-TTS.
@@ -141,6 +251,7 @@ class VieNeuTTS:
             backbone_device: Device for backbone ('cpu', 'cuda', 'gpu')
             codec_repo: Codec repository
             codec_device: Device for codec
+            ref_cache: Reference code cache (defaults to the process-wide shared cache)
         """
 
         # Constants
@@ -160,6 +271,15 @@ class VieNeuTTS:
         # HF tokenizer
         self.tokenizer = None
 
+        # Timing of the last completed `infer_stream` call
+        self.last_stream_stats = None
+
+        # Per-voice prompt prefix cache (see `_get_reference_prompt`)
+        self._ref_prompt_cache = {}
+
+        self.codec_repo = codec_repo
+        self.ref_cache = ref_cache if ref_cache is not None else shared_reference_cache
+
         # Load models
         self._load_backbone(backbone_repo, backbone_device)
         self._load_codec(codec_repo, codec_device)
@@ -219,8 +339,13 @@ class VieNeuTTS:
                 raise ValueError(f"Unsupported codec repository: {codec_repo}")
 
     def encode_reference(self, ref_audio_path: str | Path):
-        """Encode reference audio to codes"""
-        wav, _ = librosa.load(ref_audio_path, sr=16000, mono=True)
+        """Encode reference audio to codes (cached in memory and on disk)"""
+        return self.ref_cache.get_or_encode(
+            ref_audio_path, self.codec_repo, ENCODER_SAMPLE_RATE, self._encode_reference_uncached
+        )
+
+    def _encode_reference_uncached(self, ref_audio_path: str | Path):
+        wav, _ = librosa.load(ref_audio_path, sr=ENCODER_SAMPLE_RATE, mono=True)
         wav_tensor = torch.from_numpy(wav).float().unsqueeze(0).unsqueeze(0)  # [1, 1, T]
         with torch.no_grad():
             ref_codes = self.codec.encode_code(audio_or_path=wav_tensor).squeeze(0).squeeze(0)
@@ -265,7 +390,7 @@ class VieNeuTTS:
         if self._is_quantized_model:
             return self._infer_stream_ggml(ref_codes, ref_text, text)
         else:
-            raise NotImplementedError("Streaming is not implemented for the torch backend!")
+            return self._infer_stream_torch(ref_codes, ref_text, text)
 
     def _decode(self, codes: str):
         """Decode speech tokens to audio waveform."""
@@ -292,63 +417,155 @@ class VieNeuTTS:
         
         return recon[0, 0, :]
     
-    def _apply_chat_template(self, ref_codes: list[int], ref_text: str, input_text: str) -> list[int]:
-        input_text = phonemize_with_dict(ref_text) + " " + phonemize_with_dict(input_text)
+    def _get_reference_prompt(self, ref_codes, ref_text: str) -> dict:
+        """
+        Get the cached prompt parts that only depend on the reference voice.
+
+        Entries are keyed by the hash of the codes and `ref_text`, so the
+        reference is phonemized and tokenized once per voice instead of on
+        every chunk.
+        """
+        cache_key = _reference_cache_key(ref_codes, ref_text)
+        entry = self._ref_prompt_cache.get(cache_key)
+        if entry is None:
+            entry = _build_reference_prompt(ref_codes, ref_text)
+            if self.tokenizer is not None:
+                entry['prefix_ids'], entry['ref_ids'], entry['tail_ids'] = self._tokenize_reference_prompt(
+                    entry['ref_phonemes'], entry['codes_str']
+                )
+                entry['head_ids'] = entry['prefix_ids'] + entry['ref_ids']
+            self._ref_prompt_cache[cache_key] = entry
+        return entry
+
+    def _tokenize_reference_prompt(self, ref_phonemes: str, codes_str: str) -> tuple[list[int], list[int], list[int]]:
+        """Tokenize the chat template around the input text for one reference voice.
 
+        Returns the ids before the text prompt, of the reference phonemes, and
+        after the text prompt.
+        """
         speech_replace = self.tokenizer.convert_tokens_to_ids("<|SPEECH_REPLACE|>")
         speech_gen_start = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_START|>")
         text_replace = self.tokenizer.convert_tokens_to_ids("<|TEXT_REPLACE|>")
         text_prompt_start = self.tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_START|>")
         text_prompt_end = self.tokenizer.convert_tokens_to_ids("<|TEXT_PROMPT_END|>")
 
-        input_ids = self.tokenizer.encode(input_text, add_special_tokens=False)
         chat = """user: Convert the text to speech:<|TEXT_REPLACE|>\nassistant:<|SPEECH_REPLACE|>"""
         ids = self.tokenizer.encode(chat)
-
         text_replace_idx = ids.index(text_replace)
-        ids = (
-            ids[:text_replace_idx]
-            + [text_prompt_start]
-            + input_ids
-            + [text_prompt_end]
-            + ids[text_replace_idx + 1 :]  # noqa
-        )
-
         speech_replace_idx = ids.index(speech_replace)
-        codes_str = "".join([f"<|speech_{i}|>" for i in ref_codes])
+
+        ref_ids = self.tokenizer.encode(ref_phonemes, add_special_tokens=False)
         codes = self.tokenizer.encode(codes_str, add_special_tokens=False)
-        ids = ids[:speech_replace_idx] + [speech_gen_start] + list(codes)
 
-        return ids
+        prefix_ids = ids[:text_replace_idx] + [text_prompt_start]
+        tail_ids = (
+            [text_prompt_end]
+            + ids[text_replace_idx + 1 : speech_replace_idx]  # noqa
+            + [speech_gen_start]
+            + list(codes)
+        )
+        return prefix_ids, ref_ids, tail_ids
+
+    def _apply_chat_template(self, ref_codes: list[int], ref_text: str, input_text: str) -> list[int]:
+        reference = self._get_reference_prompt(ref_codes, ref_text)
+        input_phonemes = phonemize_with_dict(input_text)
+
+        # Encoding " <input>" on its own gives the ids a joint encoding of
+        # "<ref> <input>" would: the byte-level BPE pre-tokenizer (Qwen2 regex)
+        # never lets a pre-token run from the reference into the joining space,
+        # which always starts the input's first pre-token, and BPE merges stay
+        # inside pre-tokens. The exception is a whitespace run across the seam
+        # (the reference ends with whitespace and the input starts with it or
+        # is empty), which `\s+(?!\S)` splits differently: encode it jointly.
+        if reference['ref_phonemes'][-1:].isspace() and not input_phonemes[:1].strip():
+            text_ids = self.tokenizer.encode(
+                reference['ref_phonemes'] + " " + input_phonemes, add_special_tokens=False
+            )
+            return reference['prefix_ids'] + text_ids + reference['tail_ids']
+
+        input_ids = self.tokenizer.encode(" " + input_phonemes, add_special_tokens=False)
+        return reference['head_ids'] + input_ids + reference['tail_ids']
+
+    def _torch_generate_kwargs(self) -> dict:
+        """Sampling settings shared by the batch and streaming torch paths."""
+        return dict(
+            max_length=self.max_context,
+            eos_token_id=self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>"),
+            do_sample=True,
+            temperature=1.0,
+            top_k=50,
+            use_cache=True,
+            min_new_tokens=50,
+        )
 
     def _infer_torch(self, prompt_ids: list[int]) -> str:
         prompt_tensor = torch.tensor(prompt_ids).unsqueeze(0).to(self.backbone.device)
-        speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
         with torch.no_grad():
-            output_tokens = self.backbone.generate(
-                prompt_tensor,
-                max_length=self.max_context,
-                eos_token_id=speech_end_id,
-                do_sample=True,
-                temperature=1.0,
-                top_k=50,
-                use_cache=True,
-                min_new_tokens=50,
-            )
+            output_tokens = self.backbone.generate(prompt_tensor, **self._torch_generate_kwargs())
         input_length = prompt_tensor.shape[-1]
         output_str = self.tokenizer.decode(
             output_tokens[0, input_length:].cpu().numpy().tolist(), add_special_tokens=False
         )
         return output_str
 
+    def _generate_tokens_torch(self, prompt_ids: list[int]) -> Generator[str, None, None]:
+        """
+        Run `generate` in a background thread and yield speech tokens as they are sampled.
+
+        Closing the generator early stops generation at the next step.
+        """
+        from transformers import StoppingCriteria, StoppingCriteriaList
+
+        prompt_tensor = torch.tensor(prompt_ids).unsqueeze(0).to(self.backbone.device)
+        generate_kwargs = self._torch_generate_kwargs()
+        speech_end_id = generate_kwargs["eos_token_id"]
+
+        token_queue: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+
+        class _StopWhenCancelled(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return torch.full(
+                    (input_ids.shape[0],), cancelled.is_set(), dtype=torch.bool, device=input_ids.device
+                )
+
+        def run_generate():
+            try:
+                with torch.no_grad():
+                    self.backbone.generate(
+                        prompt_tensor,
+                        streamer=_TokenQueueStreamer(token_queue),
+                        stopping_criteria=StoppingCriteriaList([_StopWhenCancelled()]),
+                        **generate_kwargs,
+                    )
+            except Exception as e:
+                token_queue.put(e)
+            finally:
+                token_queue.put(None)
+
+        thread = threading.Thread(target=run_generate, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = token_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if item == speech_end_id:
+                    continue
+                yield self.tokenizer.convert_ids_to_tokens(item)
+        finally:
+            cancelled.set()
+            thread.join()
+
     def _infer_ggml(self, ref_codes: list[int], ref_text: str, input_text: str) -> str:
-        ref_text = phonemize_with_dict(ref_text)
+        reference = self._get_reference_prompt(ref_codes, ref_text)
         input_text = phonemize_with_dict(input_text)
 
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
         prompt = (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{reference['ref_phonemes']} {input_text}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{reference['codes_str']}"
         )
         output = self.backbone(
             prompt,
@@ -361,29 +578,50 @@ class VieNeuTTS:
         return output_str
 
     def _infer_stream_ggml(self, ref_codes: torch.Tensor, ref_text: str, input_text: str) -> Generator[np.ndarray, None, None]:
-        ref_text = phonemize_with_dict(ref_text)
+        start_time = time.perf_counter()
+        reference = self._get_reference_prompt(ref_codes, ref_text)
         input_text = phonemize_with_dict(input_text)
 
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
         prompt = (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{reference['ref_phonemes']} {input_text}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{reference['codes_str']}"
+        )
+
+        tokens = (
+            item["choices"][0]["text"]
+            for item in self.backbone(
+                prompt,
+                max_tokens=self.max_context,
+                temperature=1.0,
+                top_k=50,
+                stop=["<|SPEECH_GENERATION_END|>"],
+                stream=True
+            )
         )
+        yield from self._stream_decode(tokens, ref_codes, start_time)
 
-        audio_cache: list[np.ndarray] = []
+    def _infer_stream_torch(self, ref_codes: torch.Tensor, ref_text: str, input_text: str) -> Generator[np.ndarray, None, None]:
+        start_time = time.perf_counter()
+        prompt_ids = self._apply_chat_template(ref_codes, ref_text, input_text)
+        yield from self._stream_decode(self._generate_tokens_torch(prompt_ids), ref_codes, start_time)
+
+    def _stream_decode(self, tokens: Iterable[str], ref_codes, start_time: float) -> Generator[np.ndarray, None, None]:
+        """
+        Decode a stream of speech tokens into audio chunks.
+
+        Windowing is shared by all backends. Time-to-first-audio and RTF
+        (processing time / audio duration) are stored in `last_stream_stats`
+        once the stream is exhausted.
+        """
+        self.last_stream_stats = None
+        time_to_first_audio = None
+        n_samples = 0
+
+        overlap_add = _OverlapAddAccumulator(stride=self.streaming_stride_samples)
         token_cache: list[str] = [f"<|speech_{idx}|>" for idx in ref_codes]
-        n_decoded_samples: int = 0
         n_decoded_tokens: int = len(ref_codes)
 
-        for item in self.backbone(
-            prompt,
-            max_tokens=self.max_context,
-            temperature=1.0,
-            top_k=50,
-            stop=["<|SPEECH_GENERATION_END|>"],
-            stream=True
-        ):
-            output_str = item["choices"][0]["text"]
+        for output_str in tokens:
             token_cache.append(output_str)
 
             if len(token_cache[n_decoded_tokens:]) >= self.streaming_frames_per_chunk + self.streaming_lookforward:
@@ -411,18 +649,13 @@ class VieNeuTTS:
                 curr_codes = token_cache[tokens_start:tokens_end]
                 recon = self._decode("".join(curr_codes))
                 recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
 
                 # postprocess
-                processed_recon = _linear_overlap_add(
-                    audio_cache, stride=self.streaming_stride_samples
-                )
-                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                processed_recon = processed_recon[
-                    n_decoded_samples:new_samples_end
-                ]
-                n_decoded_samples = new_samples_end
+                processed_recon = overlap_add.push(recon)
                 n_decoded_tokens += self.streaming_frames_per_chunk
+                if time_to_first_audio is None:
+                    time_to_first_audio = time.perf_counter() - start_time
+                n_samples += processed_recon.shape[-1]
                 yield processed_recon
 
         # final decoding handled separately as non-constant chunk size
@@ -442,12 +675,41 @@ class VieNeuTTS:
             curr_codes = token_cache[tokens_start:]
             recon = self._decode("".join(curr_codes))
             recon = recon[sample_start:]
-            audio_cache.append(recon)
 
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
+            processed_recon = overlap_add.push(recon, final=True)
+            if time_to_first_audio is None:
+                time_to_first_audio = time.perf_counter() - start_time
+            n_samples += processed_recon.shape[-1]
             yield processed_recon
 
+        elapsed = time.perf_counter() - start_time
+        audio_duration = n_samples / self.sample_rate
+        self.last_stream_stats = {
+            'time_to_first_audio': time_to_first_audio,
+            'audio_duration': audio_duration,
+            'processing_time': elapsed,
+            'rtf': elapsed / audio_duration if audio_duration > 0 else None,
+        }
+
+
+class _TokenQueueStreamer:
+    """Minimal `transformers` streamer that forwards sampled token ids to a queue."""
+
+    def __init__(self, token_queue: queue.Queue):
+        self.token_queue = token_queue
+        self._prompt_skipped = False
+
+    def put(self, value):
+        # The first call carries the prompt ids
+        if not self._prompt_skipped:
+            self._prompt_skipped = True
+            return
+        for token_id in value.reshape(-1).tolist():
+            self.token_queue.put(token_id)
+
+    def end(self):
+        pass
+
 
 # ============================================================================
 # FastVieNeuTTS - GPU-optimized implementation
@@ -471,6 +733,7 @@ class FastVieNeuTTS:
         quant_policy=0,
         enable_triton=True,
         max_batch_size=8,
+        ref_cache: ReferenceCodeCache | None = None,
     ):
         """
         Initialize FastVieNeuTTS with LMDeploy backend and optimizations.
@@ -486,6 +749,7 @@ class FastVieNeuTTS:
             quant_policy: KV cache quantization (0=off, 8=int8, 4=int4)
             enable_triton: Enable Triton compilation for codec
             max_batch_size: Maximum batch size for inference (prevent GPU overload)
+            ref_cache: Reference code cache (defaults to the process-wide shared cache)
         """
         
         if backbone_device != "cuda" and not backbone_device.startswith("cuda:"):
@@ -503,7 +767,9 @@ class FastVieNeuTTS:
         
         self.max_batch_size = max_batch_size
         
-        self._ref_cache = {}
+        self.codec_repo = codec_repo
+        self.ref_cache = ref_cache if ref_cache is not None else shared_reference_cache
+        self._ref_prompt_cache = {}
         
         self.stored_dict = defaultdict(dict)
         
@@ -602,8 +868,13 @@ class FastVieNeuTTS:
             print(f"   ⚠️ Warmup failed (non-critical): {e}")
     
     def encode_reference(self, ref_audio_path: str | Path):
-        """Encode reference audio to codes"""
-        wav, _ = librosa.load(ref_audio_path, sr=16000, mono=True)
+        """Encode reference audio to codes (cached in memory and on disk)"""
+        return self.ref_cache.get_or_encode(
+            ref_audio_path, self.codec_repo, ENCODER_SAMPLE_RATE, self._encode_reference_uncached
+        )
+    
+    def _encode_reference_uncached(self, ref_audio_path: str | Path):
+        wav, _ = librosa.load(ref_audio_path, sr=ENCODER_SAMPLE_RATE, mono=True)
         wav_tensor = torch.from_numpy(wav).float().unsqueeze(0).unsqueeze(0)
         with torch.no_grad():
             ref_codes = self.codec.encode_code(audio_or_path=wav_tensor).squeeze(0).squeeze(0)
@@ -616,21 +887,14 @@ class FastVieNeuTTS:
         Args:
             voice_name: Unique identifier for this voice
             audio_path: Path to reference audio
-            ref_text: Optional reference text (stored with codes)
+            ref_text: Optional reference text (unused, kept for compatibility)
             
         Returns:
             ref_codes: Encoded reference codes
         """
-        cache_key = f"{voice_name}_{audio_path}"
-        
-        if cache_key not in self._ref_cache:
-            ref_codes = self.encode_reference(audio_path)
-            self._ref_cache[cache_key] = {
-                'codes': ref_codes,
-                'ref_text': ref_text
-            }
-        
-        return self._ref_cache[cache_key]['codes']
+        # Codes are content-addressed by the audio itself, so voice_name and
+        # ref_text are not part of the key
+        return self.encode_reference(audio_path)
     
     def add_speaker(self, user_id: int, audio_file: str, ref_text: str):
         """
@@ -658,35 +922,95 @@ class FastVieNeuTTS:
     
     def _decode(self, codes: str):
         """Decode speech tokens to audio waveform"""
+        return self._decode_ids(self._extract_speech_ids(codes))
+    
+    def _decode_ids(self, speech_ids: list[int]) -> np.ndarray:
+        """Decode one sequence of speech token IDs to audio waveform"""
+        recon = self._codec_decode(np.asarray(speech_ids)[np.newaxis, np.newaxis, :])
+        return recon[0, 0, :]
+    
+    @staticmethod
+    def _extract_speech_ids(codes: str) -> list[int]:
+        """Extract speech token IDs from generated text"""
         speech_ids = [int(num) for num in re.findall(r"<\|speech_(\d+)\|>", codes)]
         
         if len(speech_ids) == 0:
             raise ValueError("No valid speech tokens found in output")
         
+        return speech_ids
+    
+    def _codec_decode(self, codes: np.ndarray) -> np.ndarray:
+        """Run the codec decoder on a [B, 1, T] code array and return [B, 1, samples]"""
         if self._is_onnx_codec:
-            codes = np.array(speech_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
-            recon = self.codec.decode_code(codes)
-        else:
-            with torch.no_grad():
-                codes = torch.tensor(speech_ids, dtype=torch.long)[None, None, :].to(
-                    self.codec.device
-                )
-                recon = self.codec.decode_code(codes).cpu().numpy()
-        
-        return recon[0, 0, :]
+            return self.codec.decode_code(codes.astype(np.int32))
+        with torch.no_grad():
+            codes = torch.from_numpy(codes.astype(np.int64)).to(self.codec.device)
+            return self.codec.decode_code(codes).cpu().numpy()
     
-    def _decode_batch(self, codes_list: list[str], max_workers: int = None):
+    def _decode_batch(self, codes_list: list[str], max_pad_frames: int = DECODE_MAX_PAD_FRAMES, max_workers: int = None):
         """
-        Decode multiple code strings in parallel.
+        Decode multiple code strings with padded, batched codec forwards.
+        
+        Sequences are sorted by length and cut into buckets whose longest
+        member is at most `max_pad_frames` codes longer than the shortest.
+        Each bucket is right-padded to its longest member by repeating the
+        last code, decoded in one forward pass, and every output is trimmed
+        back to `len(ids) * hop_length` samples. The decoder has no length
+        mask, so only the last frames of a padded sequence can hear the
+        padding; the bound keeps that to a fraction of a second of trailing
+        audio. Buckets of one sequence are decoded in parallel threads.
         
         Args:
             codes_list: List of code strings to decode
-            max_workers: Number of parallel workers (auto-tuned if None)
+            max_pad_frames: Maximum padding per sequence within a bucket
+            max_workers: Number of parallel workers for unbatched sequences (auto-tuned if None)
             
         Returns:
-            List of decoded audio arrays
+            List of decoded audio arrays, in input order
         """
-        # Auto-tune workers based on GPU memory and batch size
+        speech_ids_list = [self._extract_speech_ids(codes) for codes in codes_list]
+        results = [None] * len(speech_ids_list)
+        
+        buckets = []
+        for idx in sorted(range(len(speech_ids_list)), key=lambda idx: len(speech_ids_list[idx])):
+            if buckets and len(speech_ids_list[idx]) - len(speech_ids_list[buckets[-1][0]]) <= max_pad_frames:
+                buckets[-1].append(idx)
+            else:
+                buckets.append([idx])
+        
+        singles = []
+        for bucket in buckets:
+            if len(bucket) == 1 or not self._decode_bucket(bucket, speech_ids_list, results):
+                singles.extend(bucket)
+        
+        if singles:
+            self._decode_singles(singles, speech_ids_list, results, max_workers)
+        
+        return results
+    
+    def _decode_bucket(self, bucket: list[int], speech_ids_list: list[list[int]], results: list) -> bool:
+        """Decode one bucket of `_decode_batch` in a single padded forward; False if the codec refused"""
+        max_len = len(speech_ids_list[bucket[-1]])
+        codes = np.stack([
+            np.pad(np.asarray(speech_ids_list[idx]), (0, max_len - len(speech_ids_list[idx])), mode="edge")
+            for idx in bucket
+        ])[:, np.newaxis, :]
+        
+        try:
+            recon = self._codec_decode(codes)
+        except Exception as e:
+            # e.g. OOM, or an ONNX decoder exported with a fixed batch axis
+            # (onnxruntime raises its own InvalidArgument/Fail types)
+            print(f"   ⚠️ Batched decode failed, decoding one by one: {type(e).__name__}: {e}")
+            return False
+        
+        for row, idx in enumerate(bucket):
+            results[idx] = recon[row, 0, : len(speech_ids_list[idx]) * self.hop_length]
+        return True
+    
+    def _decode_singles(self, indices: list[int], speech_ids_list: list[list[int]], results: list, max_workers: int = None):
+        """Decode the sequences `_decode_batch` could not batch, in parallel threads"""
+        # Auto-tune workers based on GPU memory
         if max_workers is None:
             if torch.cuda.is_available():
                 gpu_mem_gb = torch.cuda.get_device_properties(0).total_memory / 1e9
@@ -695,26 +1019,30 @@ class FastVieNeuTTS:
             else:
                 max_workers = 2
         
-        # For small batches, use sequential to avoid overhead
-        if len(codes_list) <= 2:
-            return [self._decode(codes) for codes in codes_list]
+        # For a couple of sequences, use sequential to avoid overhead
+        if len(indices) <= 2 or max_workers <= 1:
+            for idx in indices:
+                results[idx] = self._decode_ids(speech_ids_list[idx])
+            return
         
-        # Parallel decoding with controlled workers
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(self._decode, codes) for codes in codes_list]
-            results = [f.result() for f in futures]
-        return results
+            futures = {idx: executor.submit(self._decode_ids, speech_ids_list[idx]) for idx in indices}
+            for idx, future in futures.items():
+                results[idx] = future.result()
     
     def _format_prompt(self, ref_codes: list[int], ref_text: str, input_text: str) -> str:
         """Format prompt for LMDeploy"""
-        ref_text_phones = phonemize_with_dict(ref_text)
-        input_text_phones = phonemize_with_dict(input_text)
+        cache_key = _reference_cache_key(ref_codes, ref_text)
+        reference = self._ref_prompt_cache.get(cache_key)
+        if reference is None:
+            reference = _build_reference_prompt(ref_codes, ref_text)
+            self._ref_prompt_cache[cache_key] = reference
         
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
+        input_text_phones = phonemize_with_dict(input_text)
         
         prompt = (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text_phones} {input_text_phones}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{reference['ref_phonemes']} {input_text_phones}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{reference['codes_str']}"
         )
         
         return prompt
@@ -783,15 +1111,9 @@ class FastVieNeuTTS:
             # Batch generation with LMDeploy
             responses = self.backbone(prompts, gen_config=self.gen_config, do_preprocess=False)
             
-            # Decode outputs (with smart parallelization)
+            # Decode outputs with batched codec forwards
             batch_codes = [response.text for response in responses]
-            
-            # Auto-tune parallel workers based on batch size
-            if len(batch_codes) > 3:
-                batch_wavs = self._decode_batch(batch_codes)
-            else:
-                # Sequential for small batches (less overhead)
-                batch_wavs = [self._decode(codes) for codes in batch_codes]
+            batch_wavs = self._decode_batch(batch_codes)
             
             all_wavs.extend(batch_wavs)
             
@@ -821,19 +1143,20 @@ class FastVieNeuTTS:
         
         prompt = self._format_prompt(ref_codes, ref_text, text)
         
-        audio_cache = []
+        overlap_add = _OverlapAddAccumulator(stride=self.streaming_stride_samples)
         token_cache = [f"<|speech_{idx}|>" for idx in ref_codes]
-        n_decoded_samples = 0
+        n_generated_chars = 0
         n_decoded_tokens = len(ref_codes)
         
         for response in self.backbone.stream_infer([prompt], gen_config=self.gen_config, do_preprocess=False):
             output_str = response.text
             
             # Extract new tokens
-            new_tokens = output_str[len("".join(token_cache[len(ref_codes):])):] if len(token_cache) > len(ref_codes) else output_str
+            new_tokens = output_str[n_generated_chars:]
             
             if new_tokens:
                 token_cache.append(new_tokens)
+                n_generated_chars += len(new_tokens)
             
             # Check if we have enough tokens to decode a chunk
             if len(token_cache[n_decoded_tokens:]) >= self.streaming_frames_per_chunk + self.streaming_lookforward:
@@ -858,15 +1181,9 @@ class FastVieNeuTTS:
                 curr_codes = token_cache[tokens_start:tokens_end]
                 recon = self._decode("".join(curr_codes))
                 recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
                 
                 # Overlap-add processing
-                processed_recon = _linear_overlap_add(
-                    audio_cache, stride=self.streaming_stride_samples
-                )
-                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                processed_recon = processed_recon[n_decoded_samples:new_samples_end]
-                n_decoded_samples = new_samples_end
+                processed_recon = overlap_add.push(recon)
                 n_decoded_tokens += self.streaming_frames_per_chunk
                 
                 yield processed_recon
@@ -885,10 +1202,8 @@ class FastVieNeuTTS:
             curr_codes = token_cache[tokens_start:]
             recon = self._decode("".join(curr_codes))
             recon = recon[sample_start:]
-            audio_cache.append(recon)
             
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
+            processed_recon = overlap_add.push(recon, final=True)
             yield processed_recon
     
     def cleanup_memory(self):
@@ -907,7 +1222,7 @@ class FastVieNeuTTS:
         """
         return {
             'triton_enabled': self._triton_enabled,
-            'cached_references': len(self._ref_cache),
+            'cached_references': len(self.ref_cache),
             'active_sessions': len(self.stored_dict),
             'kv_quant': self.gen_config.__dict__.get('quant_policy', 0),
             'prefix_caching': True,  # Always enabled in our config